@@ -0,0 +1,244 @@
+"""
+기간 일괄 수집(backfill) 엔진
+
+긴 조회 기간을 월 단위 구간(shard)으로 나누어 한 프로세스 안의 작업자 풀에서 동시에 조회합니다.
+모든 구간이 하나의 수집기(토큰, 커넥션 풀, 요청 제한기)를 함께 사용하고,
+결과는 마지막에 한 번만 병합하여 구글 시트에 저장합니다.
+run_resumable_backfill은 구간마다 저장하고 진행 기록(backfill_journal.py)을 남겨
+중단된 수집을 이어서 실행할 수 있게 합니다.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
+from krx_calendar import trading_days
+try:
+    from config import BACKFILL_WORKERS, BACKFILL_SHARD_MONTHS
+except ImportError:
+    BACKFILL_WORKERS = 3        # 동시에 조회할 구간 수
+    BACKFILL_SHARD_MONTHS = 1   # 구간 하나의 크기 (개월)
+
+
+def month_shards(start_date, end_date, months=BACKFILL_SHARD_MONTHS):
+    """
+    조회 기간을 월 단위 구간으로 나누기
+
+    Args:
+        start_date: 조회 시작일 (YYYYMMDD)
+        end_date: 조회 종료일 (YYYYMMDD)
+        months: 구간 하나의 크기 (개월)
+
+    Returns:
+        list: (구간 시작일, 구간 종료일) 튜플 리스트 (YYYYMMDD, 오름차순)
+    """
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    if start > end:
+        return []
+
+    shards = []
+    current = start
+    while current <= end:
+        shard_end = min(end, current + pd.offsets.MonthBegin(max(1, months)) - pd.Timedelta(days=1))
+        shards.append((current.strftime("%Y%m%d"), shard_end.strftime("%Y%m%d")))
+        current = shard_end + pd.Timedelta(days=1)
+    return shards
+
+
+def _collect_shard(collector, shard):
+    """구간 하나 조회 후 결과와 통계 반환"""
+    strt_dt, end_dt = shard
+    started = time.monotonic()
+
+    try:
+        df = collector.get_realized_profit_range(strt_dt, end_dt)
+        error = None if df is not None else "데이터 수집 실패"
+    except Exception as e:
+        df = None
+        error = str(e)
+
+    stats = {
+        '시작일': strt_dt,
+        '종료일': end_dt,
+        '상태': '성공' if error is None else '실패',
+        '건수': 0 if df is None else len(df),
+        '소요시간': time.monotonic() - started,
+        '오류': error,
+    }
+    return df, stats
+
+
+def _save_to_sheet(manager, df, ledger=None, fetched_dates=None):
+    """시트에 Upsert (원장이 있으면 조회한 날짜를 원장에서 교체한 뒤 원장 내용으로 시트 갱신)"""
+    if ledger is not None:
+        return manager.upsert_via_ledger(df, ledger, fetched_dates=fetched_dates)
+    return manager.upsert_data(df)
+
+
+def run_backfill(collector, start_date, end_date, manager=None, workers=BACKFILL_WORKERS,
+                 shard_months=BACKFILL_SHARD_MONTHS, ledger=None):
+    """
+    기간 일괄 수집 실행
+
+    Args:
+        collector: 키움 수집기 (모든 구간이 함께 사용)
+        start_date: 조회 시작일 (YYYYMMDD)
+        end_date: 조회 종료일 (YYYYMMDD)
+        manager: 시트가 열린 GoogleSheetManager (None이면 시트 저장 생략)
+        workers: 동시에 조회할 구간 수
+        shard_months: 구간 하나의 크기 (개월)
+        ledger: TradeLedger (지정하면 원장을 거쳐 시트에 저장)
+
+    Returns:
+        tuple: (병합된 DataFrame, 구간별 통계 리스트), 인증 실패 시 (None, [])
+    """
+    shards = month_shards(start_date, end_date, shard_months)
+    if not shards:
+        print(f"ℹ️ 조회할 구간이 없습니다. ({start_date} ~ {end_date})")
+        return pd.DataFrame(), []
+
+    # 토큰은 작업자에게 나누어 주기 전에 한 번만 확인
+    if not collector._check_token_validity():
+        print("❌ 토큰 인증 실패")
+        return None, []
+
+    print(f"🚚 {len(shards)}개 구간 일괄 수집 시작 (동시 {max(1, workers)}개)")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_collect_shard, collector, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            df, stats = future.result()
+            results[futures[future]] = (df, stats)
+
+            if stats['상태'] == '성공':
+                print(f"✅ {stats['시작일']} ~ {stats['종료일']}: {stats['건수']}건 "
+                      f"({stats['소요시간']:.1f}초)")
+            else:
+                print(f"❌ {stats['시작일']} ~ {stats['종료일']}: {stats['오류']}")
+
+    shard_stats = [results[shard][1] for shard in shards]
+    chunks = [results[shard][0] for shard in shards if results[shard][0] is not None]
+    merged = collector._concat_chunks(chunks)
+
+    # 결과는 한 번만 저장 (실패한 구간의 날짜는 시트에 기존 데이터가 유지됨)
+    if manager is not None and not merged.empty:
+        fetched = [day for stats in shard_stats if stats['상태'] == '성공'
+                   for day in trading_days(stats['시작일'], stats['종료일'])]
+        if not _save_to_sheet(manager, merged, ledger, fetched):
+            print("❌ 구글 시트 저장 실패")
+
+    return merged, shard_stats
+
+
+def pending_runs(days, done):
+    """
+    진행 기록에 없는 거래일을 연속 구간 단위로 묶기
+
+    Args:
+        days: 거래일 목록 (YYYYMMDD, 오름차순)
+        done: 이미 수집된 날짜 집합
+
+    Returns:
+        list: 연속된 미수집 거래일 리스트의 리스트 (기록된 날짜는 어느 구간에도 포함되지 않음)
+    """
+    runs = []
+    current = []
+    for day in days:
+        if day in done:
+            if current:
+                runs.append(current)
+                current = []
+        else:
+            current.append(day)
+    if current:
+        runs.append(current)
+    return runs
+
+
+def run_resumable_backfill(collector, start_date, end_date, manager, journal,
+                           shard_months=BACKFILL_SHARD_MONTHS, on_flush=None, ledger=None):
+    """
+    중단 후 이어서 실행할 수 있는 일괄 수집 (구간 순서대로 조회)
+
+    구간마다 조회 → 시트 저장 → 진행 기록 순서로 처리하므로,
+    중간에 실패하더라도 다시 실행하면 기록된 날짜는 건너뛰고 이어서 수집합니다.
+    구간 안에서도 기록되지 않은 연속 거래일 묶음만 조회하므로 기록된 날짜는 다시 요청하지 않습니다.
+
+    Args:
+        collector: 키움 수집기
+        start_date: 조회 시작일 (YYYYMMDD)
+        end_date: 조회 종료일 (YYYYMMDD)
+        manager: 시트가 열린 GoogleSheetManager
+        journal: BackfillJournal
+        shard_months: 저장 단위 구간 크기 (개월)
+        on_flush: 구간 저장 후 호출할 콜백 (구간 DataFrame, 구간 통계)
+        ledger: TradeLedger (지정하면 원장을 거쳐 시트에 저장)
+
+    Returns:
+        list: 구간별 통계 리스트 (저장 실패 시 해당 구간에서 중단)
+    """
+    done = journal.completed(collector.account_number)
+    shard_stats = []
+
+    for strt_dt, end_dt in month_shards(start_date, end_date, shard_months):
+        days = trading_days(strt_dt, end_dt)
+        pending = [day for day in days if day not in done]
+        stats = {
+            '시작일': strt_dt,
+            '종료일': end_dt,
+            '상태': '건너뜀',
+            '건수': 0,
+            '소요시간': 0.0,
+            '오류': None,
+        }
+        shard_stats.append(stats)
+
+        if not pending:
+            print(f"⏭️ {strt_dt} ~ {end_dt}: 이미 수집된 구간")
+            continue
+
+        started = time.monotonic()
+        frames = []
+        for run in pending_runs(days, done):
+            run_df = collector.get_realized_profit_range(run[0], run[-1])
+            if run_df is None:
+                frames = None
+                break
+            frames.append(run_df)
+        if frames is None:
+            stats.update({'상태': '실패', '오류': "데이터 수집 실패"})
+            break
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+        # 시트 저장이 끝난 뒤에만 진행 기록 (저장 실패 시 다음 실행에서 다시 수집)
+        if not df.empty and not _save_to_sheet(manager, df, ledger, pending):
+            stats.update({'상태': '실패', '오류': "구글 시트 저장 실패"})
+            break
+        journal.record(collector.account_number, pending, df)
+
+        stats.update({'상태': '성공', '건수': len(df), '소요시간': time.monotonic() - started})
+        print(f"💾 {strt_dt} ~ {end_dt}: {len(df)}건 저장 및 진행 기록 완료")
+
+        if on_flush:
+            on_flush(df, stats)
+
+    return shard_stats
+
+
+def print_backfill_summary(shard_stats):
+    """구간별 수집 결과 요약 출력"""
+    succeeded = [stats for stats in shard_stats if stats['상태'] == '성공']
+    failed = [stats for stats in shard_stats if stats['상태'] == '실패']
+    skipped = [stats for stats in shard_stats if stats['상태'] == '건너뜀']
+
+    print(f"\n{'='*60}")
+    print(f"🎉 일괄 수집 완료 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+    print(f"- 성공 구간: {len(succeeded)}개 / 전체 {len(shard_stats)}개")
+    if skipped:
+        print(f"- 이전 실행에서 완료된 구간: {len(skipped)}개")
+    print(f"- 총 수집 건수: {sum(stats['건수'] for stats in succeeded)}건")
+    for stats in failed:
+        print(f"- ⚠️ 실패 구간: {stats['시작일']} ~ {stats['종료일']} ({stats['오류']})")
+    print(f"{'='*60}")
@@ -0,0 +1,125 @@
+"""
+일괄 수집 진행 기록(journal) 모듈
+
+수집과 시트 저장이 끝난 (계좌, 날짜)를 건수와 내용 해시와 함께 JSONL 파일에 한 줄씩 추가합니다.
+긴 기간 수집이 중간에 실패해도 다시 실행할 때(--resume) 기록된 날짜는 건너뛰고
+남은 날짜부터 이어서 수집할 수 있습니다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from file_lock import FileLock
+try:
+    from config import BACKFILL_JOURNAL_FILE
+except ImportError:
+    BACKFILL_JOURNAL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".backfill_journal.jsonl")
+try:
+    from config import RESPONSE_CACHE_MUTABLE_DAYS
+except ImportError:
+    RESPONSE_CACHE_MUTABLE_DAYS = 7     # 최근 N일은 정정 가능성이 있어 항상 다시 조회
+
+
+def day_digest(df):
+    """
+    하루치 데이터의 내용 해시
+
+    Args:
+        df: 하루치 실현손익 DataFrame
+
+    Returns:
+        str: SHA-256 해시 (16진수)
+    """
+    payload = df.to_json(orient='records', date_format='iso', force_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BackfillJournal:
+    """완료된 수집 날짜 기록 (추가 전용 JSONL 파일)"""
+
+    def __init__(self, path=BACKFILL_JOURNAL_FILE, mutable_days=RESPONSE_CACHE_MUTABLE_DAYS):
+        """
+        초기화
+
+        Args:
+            path: 기록 파일 경로
+            mutable_days: 기록이 있어도 다시 수집할 최근 일수 (오늘 포함)
+        """
+        self.path = path
+        self.mutable_days = mutable_days
+        self.lock = FileLock(f"{path}.lock")
+
+    def _read_entries(self):
+        """기록 전체 읽기 (마지막 줄이 쓰다 만 줄이면 무시)"""
+        entries = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def completed(self, account):
+        """
+        완료된 날짜 조회 (최근 N일은 제외)
+
+        Args:
+            account: 계좌번호
+
+        Returns:
+            dict: 날짜(YYYYMMDD)별 기록 (rows, sha256, recorded_at)
+        """
+        cutoff = (datetime.now() - timedelta(days=self.mutable_days)).strftime("%Y%m%d")
+        done = {}
+        for entry in self._read_entries():
+            if entry.get("account") == (account or "") and entry.get("date", "") <= cutoff:
+                done[entry["date"]] = entry
+        return done
+
+    def record(self, account, days, df):
+        """
+        날짜별 완료 기록 추가 (시트 저장이 끝난 뒤 호출)
+
+        Args:
+            account: 계좌번호
+            days: 완료된 날짜 목록 (YYYYMMDD, 거래가 없는 날 포함)
+            df: 해당 기간의 실현손익 DataFrame
+        """
+        by_day = {}
+        if df is not None and not df.empty and '날짜' in df.columns:
+            keys = df['날짜'].dt.strftime("%Y%m%d")
+            by_day = {day: group for day, group in df.groupby(keys, sort=False)}
+
+        now = datetime.now().strftime("%Y%m%d%H%M%S")
+        lines = []
+        for day in days:
+            day_df = by_day.get(day)
+            lines.append(json.dumps({
+                "account": account or "",
+                "date": day,
+                "rows": 0 if day_df is None else len(day_df),
+                "sha256": None if day_df is None else day_digest(day_df),
+                "recorded_at": now,
+            }, ensure_ascii=False))
+
+        if not lines:
+            return
+
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        """기록 전체 삭제"""
+        with self.lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
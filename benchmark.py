@@ -0,0 +1,251 @@
+"""
+성능 측정 스크립트
+
+사용법:
+    python benchmark.py http --requests 500
+    python benchmark.py http --url https://api.kiwoom.com/oauth2/token  # TLS 포함 측정
+    python benchmark.py parse --rows 1000000
+    python benchmark.py read --rows 100000
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import requests
+from gspread.worksheet import Worksheet
+
+from google_sheet_manager import GoogleSheetManager, _to_sheet_rows
+from http_pool import PooledSession
+from kiwoom_collector import KiwoomRestCollector
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """keep-alive를 지원하는 최소 JSON 응답 핸들러"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        payload = json.dumps({"return_code": 0}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _measure(post, url, n_requests):
+    """n_requests번 POST 요청 후 초당 요청 수 반환 (응답 코드는 확인하지 않음)"""
+    started = time.perf_counter()
+    for _ in range(n_requests):
+        post(url, json={"ping": 1})
+    return n_requests / (time.perf_counter() - started)
+
+
+def bench_http(args):
+    """요청마다 새 연결(requests.post) vs 커넥션 풀 세션 비교"""
+    server = None
+    url = args.url
+    if not url:
+        # 대상 URL이 없으면 로컬 keep-alive 서버로 측정 (TLS 핸드셰이크 비용 제외)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/dostk/acnt"
+
+    try:
+        before = _measure(lambda u, **kw: requests.post(u, timeout=10, **kw), url, args.requests)
+
+        session = PooledSession()
+        after = _measure(session.post, url, args.requests)
+        session.close()
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"📊 HTTP 요청 {args.requests}회 ({url})")
+    print(f"- requests.post (요청마다 새 연결): {before:,.0f} req/s")
+    print(f"- PooledSession (keep-alive 재사용): {after:,.0f} req/s")
+    print(f"- 개선율: {after / before:.2f}x")
+
+
+def _synthetic_ka10073(n_rows, seed=0):
+    """ka10073 응답 형식(콤마/부호가 포함된 문자열)의 합성 데이터"""
+    rng = np.random.default_rng(seed)
+    names = np.array(['삼성전자', 'SK하이닉스', 'NAVER', '카카오', 'LG에너지솔루션', '현대차', '셀트리온'])
+    codes = np.array(['A005930', 'A000660', 'A035420', 'A035720', 'A373220', 'A005380', 'A068270'])
+    stock = rng.integers(0, len(names), n_rows)
+    dates = pd.bdate_range('2020-01-01', periods=1500).strftime('%Y%m%d').to_numpy()
+    buy = rng.integers(1_000, 500_000, n_rows)
+    sell = (buy * rng.uniform(0.8, 1.2, n_rows)).astype(np.int64)
+    qty = rng.integers(0, 300, n_rows)
+    profit = (sell - buy) * qty
+
+    def fmt(values, sign=False):
+        return pd.Series(values).map(lambda v: f"{v:+,}" if sign else f"{v:,}").to_numpy()
+
+    return pd.DataFrame({
+        'dt': dates[rng.integers(0, len(dates), n_rows)],
+        'stk_nm': names[stock],
+        'stk_cd': codes[stock],
+        'buy_uv': fmt(buy),
+        'cntr_pric': fmt(sell),
+        'cntr_qty': fmt(qty),
+        'tdy_sel_pl': fmt(profit, sign=True),
+        'pl_rt': pd.Series((sell - buy) / buy * 100).map(lambda v: f"{v:+.2f}").to_numpy(),
+        'tdy_trde_cmsn': fmt(buy * qty // 6000),
+        'tdy_trde_tax': fmt(sell * qty // 500),
+    })
+
+
+def _legacy_clean_dataframe(df):
+    """이전 방식: 컬럼별 str.replace 후 원소마다 pd.to_numeric (비교용)"""
+    column_mapping = {
+        'dt': '날짜', 'stk_nm': '종목명', 'stk_cd': '종목코드',
+        'buy_uv': '매수평균가', 'cntr_pric': '매도평균가', 'cntr_qty': '매도수량',
+        'tdy_sel_pl': '실현손익', 'pl_rt': '수익률', 'tdy_trde_cmsn': '수수료', 'tdy_trde_tax': '제세금'
+    }
+    df = df[[col for col in column_mapping if col in df.columns]].copy()
+    df.rename(columns=column_mapping, inplace=True)
+    df['날짜'] = pd.to_datetime(df['날짜'], format='%Y%m%d', errors='coerce')
+    for col in ['매수평균가', '매도평균가', '매도수량', '실현손익', '수수료', '제세금']:
+        df[col] = df[col].astype(str).str.replace(',', '').apply(pd.to_numeric, errors='coerce')
+    df['수익률'] = df['수익률'].astype(str).str.replace('+', '').str.replace('%', '')
+    df['수익률'] = pd.to_numeric(df['수익률'], errors='coerce')
+    df['매수수량'] = df['매도수량']
+    df['매수금액'] = df['매수평균가'] * df['매수수량']
+    df['매도금액'] = df['매도평균가'] * df['매도수량']
+    df['수수료_제세금'] = df['수수료'].fillna(0) + df['제세금'].fillna(0)
+    return df
+
+
+def bench_parse(args):
+    """_clean_dataframe 이전 방식 vs 스키마 기반 일괄 변환 비교"""
+    print(f"📝 합성 데이터 {args.rows:,}건 생성 중...")
+    raw = _synthetic_ka10073(args.rows)
+    collector = KiwoomRestCollector("", "", response_cache=False)
+
+    started = time.perf_counter()
+    before_df = _legacy_clean_dataframe(raw)
+    before = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after_df = collector._clean_dataframe(raw)
+    after = time.perf_counter() - started
+
+    print(f"📊 _clean_dataframe {args.rows:,}건")
+    print(f"- 이전 방식: {before:.2f}초 ({before_df.memory_usage(deep=True).sum() / 1e6:,.0f} MB)")
+    print(f"- 스키마 기반: {after:.2f}초 ({after_df.memory_usage(deep=True).sum() / 1e6:,.0f} MB)")
+    print(f"- 개선율: {before / after:.1f}x")
+
+
+class _StubWorksheet(Worksheet):
+    """네트워크 요청 없이 미리 만든 셀 값을 돌려주는 워크시트 (read 비교용)"""
+
+    col_count = 0
+
+    def __init__(self, header, rows):
+        self._header = header
+        self._columns = [list(column) for column in zip(*rows)]
+        self.col_count = len(header)
+
+        # 시트 표시 값 (FORMATTED_VALUE): 실현손익 컬럼은 #,##0 서식
+        profit_idx = header.index('실현손익')
+        self._formatted = [header] + [
+            [f"{value:,}" if i == profit_idx else str(value) for i, value in enumerate(row)] for row in rows
+        ]
+
+    def get(self, range_name=None, **kwargs):
+        if range_name == "1:1":
+            return [self._header]
+        return self._formatted
+
+    def batch_get(self, ranges, **kwargs):
+        # 컬럼 단위(major_dimension=COLUMNS) 원래 값 (UNFORMATTED_VALUE)
+        columns = self._columns
+        if len(ranges) == 2 and ranges[0].startswith("A1:"):
+            return [[[name] for name in self._header], columns]
+        letters = [range_name.split(":")[0].rstrip("0123456789") for range_name in ranges]
+        return [[columns[_column_index(letter)]] for letter in letters]
+
+
+def _column_index(letters):
+    """A1 표기 열 문자 → 0부터 시작하는 열 번호"""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def _legacy_read_data(worksheet):
+    """이전 방식: get_all_records → DataFrame → 날짜 변환 (대시보드에서 한 번 더 변환)"""
+    df = pd.DataFrame(worksheet.get_all_records())
+    df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
+    df['날짜'] = pd.to_datetime(df['날짜'])
+    return df
+
+
+def bench_read(args):
+    """read_data 이전 방식(get_all_records) vs 컬럼 단위 원래 값 변환 비교"""
+    print(f"📝 시트 데이터 {args.rows:,}건 생성 중...")
+    collector = KiwoomRestCollector("", "", response_cache=False)
+    df = collector._clean_dataframe(_synthetic_ka10073(args.rows))
+    header, rows = _to_sheet_rows(df)
+
+    manager = GoogleSheetManager.__new__(GoogleSheetManager)
+    manager.worksheet = _StubWorksheet(header, rows)
+
+    started = time.perf_counter()
+    before_df = _legacy_read_data(manager.worksheet)
+    before = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after_df = manager.read_data()
+    after = time.perf_counter() - started
+
+    started = time.perf_counter()
+    projected_df = manager.read_data(columns=['날짜', '종목명', '실현손익'])
+    projected = time.perf_counter() - started
+
+    print(f"📊 read_data {len(df):,}건 (네트워크 제외, 변환 비용만)")
+    print(f"- 이전 방식: {before:.2f}초 ({before_df.memory_usage(deep=True).sum() / 1e6:,.1f} MB, "
+          f"실현손익 {before_df['실현손익'].dtype})")
+    print(f"- 컬럼 단위 변환: {after:.2f}초 ({after_df.memory_usage(deep=True).sum() / 1e6:,.1f} MB, "
+          f"실현손익 {after_df['실현손익'].dtype})")
+    print(f"- 3개 컬럼만: {projected:.2f}초 ({projected_df.memory_usage(deep=True).sum() / 1e6:,.1f} MB)")
+    print(f"- 개선율: {before / after:.1f}x")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='성능 측정')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    http_parser = subparsers.add_parser('http', help='커넥션 풀 세션 처리량 비교')
+    http_parser.add_argument('--requests', type=int, default=500, help='요청 횟수')
+    http_parser.add_argument('--url', type=str, default=None, help='측정 대상 URL (기본: 로컬 서버)')
+    http_parser.set_defaults(func=bench_http)
+
+    parse_parser = subparsers.add_parser('parse', help='_clean_dataframe 변환 속도 비교')
+    parse_parser.add_argument('--rows', type=int, default=1_000_000, help='합성 데이터 건수')
+    parse_parser.set_defaults(func=bench_parse)
+
+    read_parser = subparsers.add_parser('read', help='구글 시트 read_data 변환 속도 비교')
+    read_parser.add_argument('--rows', type=int, default=100_000, help='시트 데이터 건수')
+    read_parser.set_defaults(func=bench_read)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
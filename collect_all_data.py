@@ -1,11 +1,28 @@
 """
 기간별 데이터 수집 스크립트
 2023년 12월부터 2026년 1월까지 월별로 나눠서 조회
+
+월별 구간은 한 프로세스 안에서 동시에 조회하며 (backfill.py),
+인증과 구글 시트 저장은 전체 기간에 대해 한 번만 수행합니다.
 """
 
-import subprocess
+import argparse
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from backfill import run_backfill, print_backfill_summary, BACKFILL_WORKERS
+from google_sheet_manager import GoogleSheetManager
+from http_pool import close_shared_session
+from kiwoom_collector import KiwoomRestCollector
+from ledger import TradeLedger
+try:
+    from config import GOOGLE_SHEET_NAME, WORKSHEET_NAME
+    from config import KIWOOM_APP_KEY, KIWOOM_APP_SECRET, KIWOOM_ACCOUNT
+except ImportError:
+    GOOGLE_SHEET_NAME = "키움_실현손익_데이터"
+    WORKSHEET_NAME = "실현손익"
+    KIWOOM_APP_KEY = ""
+    KIWOOM_APP_SECRET = ""
+    KIWOOM_ACCOUNT = ""
+
 
 def get_month_range(year, month):
     """해당 월의 시작일과 종료일 반환"""
@@ -14,69 +31,52 @@ def get_month_range(year, month):
         end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
     else:
         end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-    
+
     return start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d")
 
-def collect_data_by_month(start_year, start_month, end_year, end_month):
-    """월별로 데이터 수집"""
-    current = datetime(start_year, start_month, 1)
-    end = datetime(end_year, end_month, 1)
-    
-    total_collected = 0
-    
-    while current <= end:
-        year = current.year
-        month = current.month
-        
-        start_dt, end_dt = get_month_range(year, month)
-        
-        print(f"\n{'='*60}")
-        print(f"📅 {year}년 {month}월 데이터 수집 중...")
-        print(f"기간: {start_dt} ~ {end_dt}")
-        print(f"{'='*60}")
-        
-        # run_pipeline.py 실행
-        cmd = [
-            "python", "run_pipeline.py",
-            "--credentials", "credentials.json",
-            "--start-date", start_dt,
-            "--end-date", end_dt
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            # 결과 출력
-            print(result.stdout)
-            
-            # 수집 건수 확인
-            if "건의 데이터 조회 완료" in result.stdout:
-                # 예: "✅ 151건의 데이터 조회 완료"
-                for line in result.stdout.split('\n'):
-                    if "건의 데이터 조회 완료" in line:
-                        count = int(line.split('✅')[1].split('건')[0].strip())
-                        total_collected += count
-                        print(f"✅ {year}년 {month}월: {count}건 수집")
-                        break
-            
-        except subprocess.TimeoutExpired:
-            print(f"⚠️ {year}년 {month}월 조회 시간 초과")
-        except Exception as e:
-            print(f"❌ {year}년 {month}월 조회 오류: {e}")
-        
-        # 다음 달로 이동
-        current += relativedelta(months=1)
-    
+def collect_data_by_month(start_year, start_month, end_year, end_month,
+                          credentials_file="credentials.json", workers=BACKFILL_WORKERS):
+    """
+    월별로 데이터 수집
+
+    Returns:
+        list: 구간별 수집 통계 (backfill.run_backfill 참고)
+    """
+    start_dt, _ = get_month_range(start_year, start_month)
+    _, end_dt = get_month_range(end_year, end_month)
+
     print(f"\n{'='*60}")
-    print(f"🎉 전체 수집 완료!")
-    print(f"총 수집 건수: {total_collected}건")
+    print(f"📅 {start_year}년 {start_month}월 ~ {end_year}년 {end_month}월 데이터 수집")
+    print(f"기간: {start_dt} ~ {end_dt}")
     print(f"{'='*60}")
 
+    try:
+        manager = GoogleSheetManager(credentials_file=credentials_file)
+        if not manager.open_sheet(GOOGLE_SHEET_NAME, WORKSHEET_NAME):
+            print("❌ 구글 시트를 열 수 없습니다.")
+            return []
+
+        collector = KiwoomRestCollector(KIWOOM_APP_KEY, KIWOOM_APP_SECRET, KIWOOM_ACCOUNT)
+        with TradeLedger() as ledger:
+            _, shard_stats = run_backfill(collector, start_dt, end_dt, manager=manager,
+                                          workers=workers, ledger=ledger)
+
+        print_backfill_summary(shard_stats)
+        return shard_stats
+
+    except FileNotFoundError:
+        print(f"❌ 인증 파일을 찾을 수 없습니다: {credentials_file}")
+        return []
+    finally:
+        close_shared_session()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='키움 실현손익 기간 일괄 수집')
+    parser.add_argument('--credentials', type=str, default='credentials.json',
+                        help='구글 서비스 계정 JSON 파일 경로')
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS,
+                        help='동시에 조회할 월 구간 수')
+    args = parser.parse_args()
+
     # 2023년 12월 ~ 2026년 1월
-    collect_data_by_month(2023, 12, 2026, 1)
+    collect_data_by_month(2023, 12, 2026, 1, credentials_file=args.credentials, workers=args.workers)
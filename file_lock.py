@@ -0,0 +1,114 @@
+"""
+파일 잠금 및 원자적 쓰기 유틸리티
+
+여러 프로세스(스케줄러 실행, 대시보드 동기화 등)가 같은 캐시 파일을
+동시에 읽고 쓸 수 있도록 lock 파일 기반 잠금과 원자적 파일 교체를 제공합니다.
+Windows/Mac/Linux 모두 동작하도록 OS별 잠금 API 대신 O_EXCL 파일 생성을 사용합니다.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+
+class FileLock:
+    """lock 파일 생성 방식의 프로세스 간 잠금 (같은 객체 안에서는 재진입 가능)"""
+
+    def __init__(self, path, timeout=10.0, stale_after=60.0, poll_interval=0.05):
+        """
+        초기화
+
+        Args:
+            path: lock 파일 경로
+            timeout: 잠금 대기 최대 시간 (초)
+            stale_after: 이 시간보다 오래된 lock 파일은 비정상 종료로 보고 제거 (초)
+            poll_interval: 잠금 재시도 간격 (초)
+        """
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    def acquire(self):
+        """잠금 획득 (timeout 초과 시 TimeoutError)"""
+        self._thread_lock.acquire()
+        if self._depth > 0:
+            self._depth += 1
+            return
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                self._depth = 1
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+
+                if time.monotonic() >= deadline:
+                    self._thread_lock.release()
+                    raise TimeoutError(f"잠금 대기 시간 초과: {self.path}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """잠금 해제"""
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def atomic_write(path, data, mode=0o600):
+    """
+    임시 파일에 쓴 뒤 교체하여 다른 프로세스가 쓰다 만 파일을 읽지 않도록 저장
+
+    Args:
+        path: 저장할 파일 경로
+        data: 저장할 내용 (bytes 또는 str)
+        mode: 파일 권한
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, mode)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -5,35 +5,363 @@ gspread를 이용한 구글 시트 읽기/쓰기 및 Upsert 기능 제공
 """
 
 import gspread
+from gspread.utils import ValueRenderOption, rowcol_to_a1
 from google.oauth2.service_account import Credentials
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import streamlit as st
+import bisect
+import collections
+import functools
 import json
+import numbers
+import time
+import metrics
+from trade_index import TradeIndex, has_trade_key, normalize_codes, trade_keys
+
+
+def _for_sheet(df):
+    """시트 저장용 변환 (category, Int64 컬럼은 빈 문자열을 채울 수 없으므로 일반 컬럼으로 변환 후 NaN/NA 처리)"""
+    object_cols = [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+        or (isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in 'iufb')
+    ]
+    return df.astype({col: object for col in object_cols}).fillna('')
+
+
+def _to_sheet_rows(df):
+    """DataFrame을 시트에 쓰는 값 그대로의 (헤더, 행 리스트)로 변환"""
+    df = _for_sheet(df)
+    if '날짜' in df.columns:
+        df['날짜'] = pd.to_datetime(df['날짜']).dt.strftime('%Y-%m-%d')
+    return df.columns.tolist(), df.astype(object).values.tolist()
+
+
+def _pad(row, width):
+    """시트에서 읽은 행의 빈 끝 셀 채우기"""
+    return list(row[:width]) + [''] * (width - len(row))
+
+
+def _is_blank(row):
+    """값이 하나도 없는 행이면 True"""
+    return all(cell == '' for cell in row)
+
+
+def _sheet_rows(values, width):
+    """
+    시트 값의 데이터 행 전체 (빈 행 포함, 위치가 실제 시트 행 번호 - 2와 같음)
+
+    변경분 요청의 행 번호를 계산할 때 쓰므로 빈 행을 빼면 그 아래 행의 위치가 어긋납니다.
+    """
+    return [_pad(row, width) for row in values[1:]]
+
+
+def _values_frame(values):
+    """
+    시트에서 읽은 값(첫 행은 헤더)을 DataFrame으로 변환 (날짜는 Timestamp)
+
+    Returns:
+        DataFrame: 기존 행 (헤더가 없으면 None)
+    """
+    if not values or not any(values[0]):
+        return None
+    header = values[0]
+    old_rows = [row for row in _sheet_rows(values, len(header)) if not _is_blank(row)]
+    existing = pd.DataFrame(old_rows, columns=header)
+    if '날짜' in existing.columns:
+        existing['날짜'] = existing['날짜'].map(_sheet_date)
+    return existing
+
+
+def _merge_with_existing(values, new_df, key_column=None):
+    """
+    컬럼 구성이 다른 기존 시트 행과 새 데이터를 합치기 (두 컬럼 구성의 합집합)
+
+    Args:
+        values: 시트에서 읽은 값 (첫 행은 헤더, 비어 있을 수 있음)
+        new_df: 새 데이터
+        key_column: None이면 거래 고유 키, 컬럼명이면 그 값이 새 데이터에 있는 기존 행을 교체
+                    (키 컬럼이 양쪽에 없으면 교체 없이 합침)
+
+    Returns:
+        DataFrame: 날짜 내림차순으로 정렬된 병합 결과 (기존 행은 빠지지 않음)
+    """
+    new_df = new_df.reset_index(drop=True)
+    existing = _values_frame(values)
+    if existing is None:
+        return new_df
+
+    if key_column is None:
+        if has_trade_key(existing.columns) and has_trade_key(new_df.columns):
+            new_keys = set(trade_keys(new_df))
+            existing = existing[[key not in new_keys for key in trade_keys(existing)]]
+    elif key_column in existing.columns and key_column in new_df.columns:
+        new_values = new_df[key_column]
+        if key_column == '날짜':
+            new_values = pd.to_datetime(new_values)
+        existing = existing[~existing[key_column].isin(new_values)]
+
+    merged = pd.concat([existing, new_df], ignore_index=True)
+    if '날짜' in merged.columns:
+        merged['날짜'] = pd.to_datetime(merged['날짜'])
+        merged = merged.sort_values('날짜', ascending=False, kind='stable', ignore_index=True)
+    return merged
+
+
+@functools.lru_cache(maxsize=8192)
+def _sheet_date(value):
+    """시트의 날짜 셀 값(문자열 또는 날짜 일련번호)을 Timestamp로 변환 (날짜 종류가 적으므로 캐시)"""
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return pd.Timestamp('1899-12-30') + pd.Timedelta(days=float(value))
+    date = pd.to_datetime(value, errors='coerce')
+    return pd.Timestamp.min if pd.isna(date) else date
+
+
+def _decode_column(name, values, n_rows):
+    """
+    시트에서 읽은 컬럼 하나(서식 없는 값)를 타입이 정해진 Series로 변환
+
+    Args:
+        name: 컬럼명
+        values: 셀 값 리스트 (끝의 빈 셀은 생략될 수 있음)
+        n_rows: 전체 행 수
+
+    Returns:
+        Series: 날짜 → datetime64, 종목명/종목코드 → category, 숫자 → int64/float64, 그 외 → 문자열
+    """
+    values = list(values) + [''] * (n_rows - len(values))
+
+    if name == '날짜':
+        # 문자열(YYYY-MM-DD)로 저장되지만 날짜 일련번호로 입력된 셀도 처리
+        dates = pd.to_datetime(pd.Series(values, dtype=object), format='%Y-%m-%d', errors='coerce')
+        if any(isinstance(value, numbers.Number) for value in values):
+            serial = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+            dates = dates.fillna(pd.Timestamp('1899-12-30') + pd.to_timedelta(serial, unit='D'))
+        return dates
+
+    if name in ('종목명', '종목코드'):
+        # 고유값만 변환한 뒤 펼침 (행 수가 많아도 종목 수만큼만 처리)
+        categorical = pd.Categorical([str(value) for value in values])
+        categories = pd.Series(categorical.categories, dtype=object)
+        if name == '종목코드':
+            categories = normalize_codes(categories)
+        return pd.Series(categories.to_numpy()[categorical.codes]).astype('category')
+
+    # 숫자만 있는 컬럼은 numpy가 바로 int64/float64로 변환
+    array = np.asarray(values)
+    if array.dtype.kind in 'iu':
+        return pd.Series(array.astype('int64'))
+    if array.dtype.kind == 'f':
+        return pd.Series(array.astype('float64'))
+
+    numeric = pd.to_numeric(pd.Series(values, dtype=object).replace('', None), errors='coerce')
+    if numeric.notna().sum() < sum(value != '' for value in values):
+        return pd.Series([str(value) for value in values])   # 숫자가 아닌 값이 섞인 컬럼
+    return numeric.astype('float64')
+
+
+def _cell_key(value):
+    """셀 비교용 값 (5와 5.0, numpy 숫자와 파이썬 숫자를 같게 취급)"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, numbers.Number):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    return '' if value is None else str(value)
+
+
+def _cell_data(value):
+    """Sheets API CellData 변환"""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, numbers.Number):
+        return {"userEnteredValue": {"numberValue": _cell_key(value)}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _update_cells(sheet_id, row_index, rows):
+    """row_index 행부터 rows 값을 쓰는 updateCells 요청"""
+    return {"updateCells": {
+        "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": 0},
+        "rows": [{"values": [_cell_data(value) for value in row]} for row in rows],
+        "fields": "userEnteredValue",
+    }}
+
+
+def _row_ids(header, rows):
+    """
+    변경분 비교에서 기존 행과 새 행을 짝짓는 행 식별 키
+
+    거래 키 컬럼이 있으면 거래 고유 키, 없으면 행 전체 값을 쓰고, 빈 행은 None (어느 행과도 짝지어지지 않음)
+
+    Args:
+        header: 헤더
+        rows: 헤더 길이로 맞춘 행 리스트
+
+    Returns:
+        list: 행별 식별 키
+    """
+    ids = [None] * len(rows)
+    filled = [i for i, row in enumerate(rows) if not _is_blank(row)]
+    if has_trade_key(header):
+        frame = pd.DataFrame([rows[i] for i in filled], columns=header)
+        frame['날짜'] = frame['날짜'].map(_sheet_date)
+        keys = trade_keys(frame)
+    else:
+        keys = [tuple(_cell_key(value) for value in rows[i]) for i in filled]
+    for i, key in zip(filled, keys):
+        ids[i] = key
+    return ids
+
+
+def _row_opcodes(old_ids, new_ids, old_cells, new_cells):
+    """
+    기존 행을 새 행으로 바꾸는 변경 구간 (difflib get_opcodes 형식)
+
+    식별 키가 같은 행을 짝지은 뒤 순서가 유지되는 가장 긴 짝(최장 증가 부분열)을 고정점으로 삼습니다.
+    고정점 사이 구간과 값이 바뀐 고정점은 교체 구간으로 묶으므로 행 수 n에 대해 O(n log n)입니다.
+
+    Returns:
+        list: (태그, i1, i2, j1, j2) 리스트 ('equal' 외에는 모두 'replace')
+    """
+    positions = {}
+    for i, key in enumerate(old_ids):
+        if key is not None:
+            positions.setdefault(key, collections.deque()).append(i)
+
+    pairs = []
+    for j, key in enumerate(new_ids):
+        queue = positions.get(key)
+        if queue:
+            pairs.append((queue.popleft(), j))
+
+    # 새 행 순서로 나열한 짝 중 기존 행 위치가 증가하는 가장 긴 부분열
+    tails = []
+    tail_pairs = []
+    previous = [None] * len(pairs)
+    for n, (i, _) in enumerate(pairs):
+        k = bisect.bisect_left(tails, i)
+        previous[n] = tail_pairs[k - 1] if k else None
+        if k == len(tails):
+            tails.append(i)
+            tail_pairs.append(n)
+        else:
+            tails[k] = i
+            tail_pairs[k] = n
+    anchors = []
+    n = tail_pairs[-1] if tail_pairs else None
+    while n is not None:
+        anchors.append(pairs[n])
+        n = previous[n]
+    anchors.reverse()
+
+    opcodes = []
+    i0 = j0 = 0
+    for i, j in anchors:
+        if old_cells[i] != new_cells[j]:
+            continue    # 값이 바뀐 고정점은 앞뒤 구간과 함께 교체
+        if i0 < i or j0 < j:
+            opcodes.append(('replace', i0, i, j0, j))
+        opcodes.append(('equal', i, i + 1, j, j + 1))
+        i0, j0 = i + 1, j + 1
+    if i0 < len(old_cells) or j0 < len(new_cells):
+        opcodes.append(('replace', i0, len(old_cells), j0, len(new_cells)))
+    return opcodes
+
+
+def _row_diff_requests(sheet_id, old_rows, new_rows, date_idx=None, old_ids=None, new_ids=None):
+    """
+    기존 행을 새 행으로 바꾸는 행 단위 요청 목록 (1행은 헤더)
+
+    Args:
+        sheet_id: 워크시트 ID
+        old_rows: 시트에 있는 데이터 행 (빈 행 포함, 시트 순서 그대로)
+        new_rows: 시트에 있어야 할 데이터 행
+        date_idx: 날짜 컬럼 위치 (지정하면 변경된 행의 연도를 통계에 포함)
+        old_ids: 기존 행 식별 키 (_row_ids, None이면 행 전체 값)
+        new_ids: 새 행 식별 키
+
+    Returns:
+        tuple: (batch_update 요청 리스트, {'추가', '수정', '삭제', '셀', '연도'} 통계)
+    """
+    old_keys = [tuple(_cell_key(value) for value in row) for row in old_rows]
+    new_keys = [tuple(_cell_key(value) for value in row) for row in new_rows]
+    if old_ids is None:
+        old_ids = [None if _is_blank(row) else key for row, key in zip(old_rows, old_keys)]
+    if new_ids is None:
+        new_ids = new_keys
+    opcodes = _row_opcodes(old_ids, new_ids, old_keys, new_keys)
+
+    requests = []
+    stats = {'추가': 0, '수정': 0, '삭제': 0, '셀': 0, '연도': set()}
+
+    # 아래쪽 변경부터 적용해야 위쪽 요청의 행 번호가 바뀌지 않음
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == 'equal':
+            continue
+
+        if date_idx is not None:
+            for row in old_rows[i1:i2] + new_rows[j1:j2]:
+                date = _sheet_date(row[date_idx])
+                if date is not pd.Timestamp.min:
+                    stats['연도'].add(date.year)
+
+        common = min(i2 - i1, j2 - j1)
+        if common:
+            requests.append(_update_cells(sheet_id, i1 + 1, new_rows[j1:j1 + common]))
+            stats['수정'] += common
+
+        start = i1 + common + 1
+        if j2 - j1 > common:
+            count = j2 - j1 - common
+            requests.append({"insertDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": start + count},
+                "inheritFromBefore": start > 1,
+            }})
+            requests.append(_update_cells(sheet_id, start, new_rows[j1 + common:j2]))
+            stats['추가'] += count
+        elif i2 - i1 > common:
+            requests.append({"deleteDimension": {
+                "range": {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": i2 + 1},
+            }})
+            stats['삭제'] += i2 - i1 - common
+
+    stats['셀'] = sum(
+        len(row["values"]) for request in requests if "updateCells" in request
+        for row in request["updateCells"]["rows"]
+    )
+    return requests, stats
 
 
 class GoogleSheetManager:
     """구글 시트 관리 클래스"""
     
-    def __init__(self, credentials_dict=None, credentials_file=None):
+    def __init__(self, credentials_dict=None, credentials_file=None, client=None):
         """
         초기화
         
         Args:
             credentials_dict: 서비스 계정 인증 정보 딕셔너리 (Streamlit Secrets용)
             credentials_file: 서비스 계정 JSON 파일 경로 (로컬 테스트용)
+            client: 이미 인증된 gspread 클라이언트 (주어지면 인증을 건너뛰고 재사용)
         """
-        self.gc = None
+        self.gc = client
         self.sheet = None
         self.worksheet = None
         
-        # 인증
+        # 인증 (공유 클라이언트가 주어지면 생략)
+        if client is not None:
+            return
         if credentials_dict:
             self._authenticate_from_dict(credentials_dict)
         elif credentials_file:
             self._authenticate_from_file(credentials_file)
         else:
-            raise ValueError("credentials_dict 또는 credentials_file 중 하나는 필수입니다.")
+            raise ValueError("credentials_dict, credentials_file, client 중 하나는 필수입니다.")
     
     def _authenticate_from_dict(self, credentials_dict):
         """딕셔너리로부터 인증 (Streamlit Cloud용)"""
@@ -104,10 +432,36 @@ class GoogleSheetManager:
             print(f"❌ 시트 열기 실패: {e}")
             return False
     
-    def read_data(self):
+    def get_revision(self):
+        """
+        스프레드시트 마지막 수정 시각 (Drive modifiedTime, 전체 데이터를 읽지 않고 변경 여부 확인용)
+        
+        Returns:
+            str: RFC 3339 시각 문자열 (확인 실패 시 None)
+        """
+        if not self.sheet:
+            return None
+        
+        try:
+            with metrics.SHEETS_SECONDS.time(operation="revision"):
+                return self.sheet.get_lastUpdateTime()
+        except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation="revision")
+            print(f"⚠️ 시트 수정 시각 확인 실패: {e}")
+            return None
+    
+    def read_data(self, columns=None, start_row=None, end_row=None):
         """
         구글 시트에서 데이터 읽기
         
+        서식이 적용되지 않은 원래 값을 컬럼 단위로 받아 바로 타입이 정해진 컬럼으로 변환합니다.
+        (날짜 → datetime, 종목명/종목코드 → category, 숫자 → int64/float64)
+        
+        Args:
+            columns: 읽을 컬럼 목록 (None이면 전체, 지정하면 해당 컬럼만 요청)
+            start_row: 읽기 시작할 데이터 행 번호 (1부터, 헤더 제외, None이면 처음부터)
+            end_row: 마지막 데이터 행 번호 (포함, None이면 끝까지)
+        
         Returns:
             DataFrame: 읽어온 데이터
         """
@@ -116,26 +470,104 @@ class GoogleSheetManager:
             return None
         
         try:
-            # 모든 데이터 가져오기
-            data = self.worksheet.get_all_records()
+            first = (start_row or 1) + 1
+            last = str(end_row + 1) if end_row else ''
+            options = {
+                "major_dimension": "COLUMNS",
+                "value_render_option": ValueRenderOption.unformatted,
+            }
+            
+            with metrics.SHEETS_SECONDS.time(operation="read"):
+                if columns is None:
+                    last_col = rowcol_to_a1(1, self.worksheet.col_count).rstrip('0123456789')
+                    header_range, data_range = self.worksheet.batch_get(
+                        [f"A1:{last_col}1", f"A{first}:{last_col}{last}"], **options
+                    )
+                    names = [column[0] if column else '' for column in header_range]
+                    data = list(data_range)[:len(names)]
+                else:
+                    # 필요한 컬럼만 요청 (헤더로 컬럼 위치 확인 후 한 번에 조회)
+                    header = self.worksheet.get("1:1", value_render_option=ValueRenderOption.unformatted)
+                    header = header[0] if header else []
+                    missing = [col for col in columns if col not in header]
+                    if missing:
+                        raise KeyError(f"시트에 없는 컬럼: {missing}")
+                    names = list(columns)
+                    letters = [rowcol_to_a1(1, header.index(col) + 1).rstrip('0123456789') for col in names]
+                    ranges = self.worksheet.batch_get(
+                        [f"{letter}{first}:{letter}{last}" for letter in letters], **options
+                    )
+                    data = [value_range[0] if value_range else [] for value_range in ranges]
             
-            if not data:
+            n_rows = max((len(column) for column in data), default=0)
+            if n_rows == 0:
                 print("⚠️ 시트에 데이터가 없습니다.")
                 return pd.DataFrame()
             
-            df = pd.DataFrame(data)
-            
-            # 날짜 컬럼 변환
-            if '날짜' in df.columns:
-                df['날짜'] = pd.to_datetime(df['날짜'], errors='coerce')
+            data += [[]] * (len(names) - len(data))
+            df = pd.DataFrame({name: _decode_column(name, column, n_rows) for name, column in zip(names, data)})
+            metrics.SHEETS_ROWS.inc(len(df), operation="read")
+            metrics.SHEETS_CELLS.inc(df.size, operation="read")
             
             print(f"✅ {len(df)}건의 데이터 읽기 완료")
             return df
             
         except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation="read")
             print(f"❌ 데이터 읽기 실패: {e}")
             return None
     
+    def read_since(self, since):
+        """
+        최근 행만 읽기 (대시보드 증분 갱신용)
+        
+        시트는 날짜 내림차순으로 저장되므로 날짜 컬럼만 먼저 읽어 since 이후 행이
+        맨 위에서부터 몇 줄인지 확인한 뒤 그 행들만 전체 컬럼으로 요청합니다.
+        
+        Args:
+            since: 이 날짜 이상인 행만 읽음
+        
+        Returns:
+            tuple: (최근 행 DataFrame, 헤더 컬럼 목록, 시트 전체 데이터 행 수)
+                   (날짜 컬럼이 없거나 내림차순이 아니거나 읽기 실패 시 None)
+        """
+        if not self.worksheet:
+            print("❌ 워크시트가 열려있지 않습니다.")
+            return None
+        
+        try:
+            with metrics.SHEETS_SECONDS.time(operation="read_since"):
+                header = self.worksheet.get("1:1", value_render_option=ValueRenderOption.unformatted)
+                header = header[0] if header else []
+                if '날짜' not in header:
+                    return None
+                letter = rowcol_to_a1(1, header.index('날짜') + 1).rstrip('0123456789')
+                date_range, = self.worksheet.batch_get(
+                    [f"{letter}2:{letter}"],
+                    major_dimension="COLUMNS",
+                    value_render_option=ValueRenderOption.unformatted,
+                )
+                values = date_range[0] if date_range else []
+            
+            dates = _decode_column('날짜', values, len(values))
+            if dates.isna().any() or not dates.is_monotonic_decreasing:
+                print("ℹ️ 시트가 날짜 내림차순이 아니어서 증분으로 읽을 수 없습니다.")
+                return None
+            
+            count = int((dates >= pd.Timestamp(since)).sum())
+            if count == 0:
+                return pd.DataFrame(), header, len(values)
+            
+            recent = self.read_data(start_row=1, end_row=count)
+            if recent is None:
+                return None
+            return recent, header, len(values)
+            
+        except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation="read_since")
+            print(f"❌ 최근 데이터 읽기 실패: {e}")
+            return None
+    
     def write_data(self, df, mode='replace'):
         """
         구글 시트에 데이터 쓰기
@@ -148,6 +580,7 @@ class GoogleSheetManager:
             print("❌ 워크시트가 열려있지 않습니다.")
             return False
         
+        started = time.perf_counter()
         try:
             # 날짜 형식 변환
             df_copy = df.copy()
@@ -178,168 +611,401 @@ class GoogleSheetManager:
                 self.worksheet.append_rows(df_copy.values.tolist())
                 print(f"✅ {len(df)}건의 데이터 추가 완료")
             
+            metrics.SHEETS_SECONDS.observe(time.perf_counter() - started, operation=f"write_{mode}")
+            metrics.SHEETS_ROWS.inc(len(df_copy), operation=f"write_{mode}")
+            metrics.SHEETS_CELLS.inc(df_copy.size, operation=f"write_{mode}")
             return True
             
         except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation=f"write_{mode}")
             print(f"❌ 데이터 쓰기 실패: {e}")
             return False
     
-    def upsert_data(self, new_df, key_column='날짜'):
+    def upsert_data(self, new_df, key_column=None):
         """
-        날짜 기준으로 데이터 Upsert (업데이트 또는 삽입)
+        데이터 Upsert (업데이트 또는 삽입)
         
         Args:
             new_df: 새로운 데이터 DataFrame
-            key_column: 중복 확인 기준 컬럼
+            key_column: None이면 거래 고유 키(날짜, 종목코드, 매도평균가, 매도수량, 순번)가 같은 행만 교체,
+                        컬럼명을 지정하면 그 값이 같은 기존 행을 모두 교체 (예: '날짜' → 해당 날짜 전체 교체)
         """
         if not self.worksheet:
             print("❌ 워크시트가 열려있지 않습니다.")
             return False
         
         try:
-            # NaN 값 처리 (JSON 호환성 문제 해결)
-            new_df = new_df.fillna('')
-            
-            # 기존 데이터 읽기
-            existing_df = self.read_data()
-            
-            if existing_df is None or existing_df.empty:
-                # 기존 데이터가 없으면 그냥 쓰기
-                return self.write_data(new_df, mode='replace')
-            
-            # 날짜 형식 통일
-            if key_column in existing_df.columns:
-                existing_df[key_column] = pd.to_datetime(existing_df[key_column])
-            if key_column in new_df.columns:
-                new_df[key_column] = pd.to_datetime(new_df[key_column])
-            
-            # 기존 데이터에서 중복 제거 후 새 데이터와 병합
-            existing_df = existing_df[~existing_df[key_column].isin(new_df[key_column])]
-            merged_df = pd.concat([existing_df, new_df], ignore_index=True)
-            
-            # 날짜 기준 정렬
-            merged_df = merged_df.sort_values(by=key_column, ascending=False)
-            
-            # 전체 교체
-            result = self.write_data(merged_df, mode='replace')
-            
-            if result:
-                print(f"✅ Upsert 완료: 기존 {len(existing_df)}건 + 신규 {len(new_df)}건 = 총 {len(merged_df)}건")
-                # 연도별 요약 시트 업데이트 실행
-                self.update_yearly_summaries(merged_df)
-            
-            return result
-            
+            header, new_rows = _to_sheet_rows(new_df)
+            if key_column is None and not has_trade_key(header):
+                # 거래 키 컬럼이 없는 데이터 (테스트용 샘플 등)는 날짜 기준
+                key_column = '날짜'
+
+            # 기존 데이터 읽기 (서식 없는 원래 값, 변경분 비교용)
+            values = self._read_values()
+
+            if not values or values[0] != header or (key_column is not None and key_column not in header):
+                # 기존 데이터가 없거나 컬럼 구성이 다르면 기존 행과 합쳐 전체 다시 쓰기
+                merged_df = _merge_with_existing(values, new_df, key_column)
+                result = self.write_data(_for_sheet(merged_df), mode='replace')
+                if result:
+                    print(f"✅ Upsert 완료: 기존 {len(merged_df) - len(new_df)}건 유지 + 신규 {len(new_df)}건 (컬럼 구성 변경으로 전체 다시 쓰기)")
+                    self.update_yearly_summaries(merged_df)
+                return result
+
+            sort_column = key_column or '날짜'
+            sort_idx = header.index(sort_column)
+            key_of = _sheet_date if sort_column == '날짜' else (lambda value: value)
+            sheet_rows = _sheet_rows(values, len(header))
+            old_rows = [row for row in sheet_rows if not _is_blank(row)]
+
+            if key_column is None:
+                # 기존 행 해시 인덱스로 같은 거래만 제자리 교체, 새 거래는 추가
+                old_df = pd.DataFrame(old_rows, columns=header)
+                old_df['날짜'] = old_df['날짜'].map(_sheet_date)
+                index = TradeIndex.from_frame(old_df)
+                merged_rows = list(old_rows)
+                replaced, inserted = index.upsert_rows(merged_rows, new_rows, trade_keys(new_df))
+                summary = f"교체 {replaced}건 + 추가 {inserted}건"
+            else:
+                # 새 데이터에 있는 키의 기존 행은 모두 제거 후 병합
+                new_keys = {key_of(row[sort_idx]) for row in new_rows}
+                merged_rows = [row for row in old_rows if key_of(row[sort_idx]) not in new_keys] + new_rows
+                summary = f"기존 {len(merged_rows) - len(new_rows)}건 유지 + 신규 {len(new_rows)}건"
+
+            # 날짜(키) 기준 내림차순 (같은 값은 기존 순서 유지)
+            merged_rows.sort(key=lambda row: key_of(row[sort_idx]), reverse=True)
+
+            stats = self._apply_row_diff(header, sheet_rows, merged_rows)
+            if stats is None:
+                return False
+
+            print(f"✅ Upsert 완료: {summary} = 총 {len(merged_rows)}건")
+
+            # 연도별 요약 시트 업데이트 실행 (행이 바뀐 연도만)
+            merged_df = pd.DataFrame(merged_rows, columns=header)
+            merged_df[sort_column] = [key_of(value) for value in merged_df[sort_column]]
+            self.update_yearly_summaries(merged_df, years=stats['연도'])
+            return True
+
         except Exception as e:
             print(f"❌ Upsert 실패: {e}")
             return False
 
-    def update_yearly_summaries(self, df):
-        """연도별 요약 시트 생성 및 업데이트"""
-        if df is None or df.empty:
+    def _read_values(self):
+        """시트 전체 값을 서식 없이 읽기 (숫자는 숫자, 문자열은 문자열로)"""
+        with metrics.SHEETS_SECONDS.time(operation="read_values"):
+            values = self.worksheet.get_all_values(value_render_option=ValueRenderOption.unformatted)
+        metrics.SHEETS_ROWS.inc(max(0, len(values) - 1), operation="read_values")
+        metrics.SHEETS_CELLS.inc(sum(len(row) for row in values), operation="read_values")
+        return values
+
+    def write_diff(self, df, values=None):
+        """
+        시트를 df와 같은 내용으로 만들되, 달라진 행만 기록
+
+        Args:
+            df: 시트에 있어야 할 전체 데이터 (표시 순서대로)
+            values: 이미 읽어 둔 시트 값 (None이면 새로 읽음)
+
+        Returns:
+            dict: 추가/수정/삭제 행 수, 기록한 셀 수, 행이 바뀐 연도 (전체를 다시 쓴 경우 연도는 None, 실패 시 None)
+        """
+        if not self.worksheet:
+            print("❌ 워크시트가 열려있지 않습니다.")
+            return None
+
+        try:
+            header, rows = _to_sheet_rows(df)
+            if values is None:
+                values = self._read_values()
+            if not values or values[0] != header:
+                # 컬럼 구성이 다르면 df에 없는 기존 행을 남긴 채 전체 다시 쓰기
+                merged_df = _merge_with_existing(values, df)
+                if not self.write_data(_for_sheet(merged_df), mode='replace'):
+                    return None
+                return {'추가': len(rows), '수정': 0, '삭제': 0, '셀': merged_df.size, '연도': None}
+
+            return self._apply_row_diff(header, _sheet_rows(values, len(header)), rows)
+
+        except Exception as e:
+            print(f"❌ 데이터 쓰기 실패: {e}")
+            return None
+
+    def _apply_row_diff(self, header, old_rows, new_rows):
+        """
+        기존 행과 새 행을 비교해 추가/수정/삭제분만 batch_update 한 번으로 반영
+
+        Args:
+            header: 헤더
+            old_rows: 시트의 데이터 행 전체 (_sheet_rows, 빈 행은 삭제됨)
+            new_rows: 시트에 있어야 할 데이터 행
+
+        Returns:
+            dict: 추가/수정/삭제 행 수, 기록한 셀 수, 행이 바뀐 연도 (실패 시 None)
+        """
+        started = time.perf_counter()
+        try:
+            date_idx = header.index('날짜') if '날짜' in header else None
+            requests, stats = _row_diff_requests(
+                self.worksheet.id, old_rows, new_rows, date_idx,
+                _row_ids(header, old_rows), _row_ids(header, new_rows),
+            )
+            if requests:
+                self.sheet.batch_update({"requests": requests})
+
+            metrics.SHEETS_SECONDS.observe(time.perf_counter() - started, operation="write_diff")
+            metrics.SHEETS_ROWS.inc(stats['추가'] + stats['수정'], operation="write_diff")
+            metrics.SHEETS_CELLS.inc(stats['셀'], operation="write_diff")
+
+            if requests:
+                print(f"✅ 변경분 저장: 추가 {stats['추가']}행, 수정 {stats['수정']}행, "
+                      f"삭제 {stats['삭제']}행 (셀 {stats['셀']}개)")
+            else:
+                print("✅ 변경된 행이 없습니다.")
+            return stats
+
+        except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation="write_diff")
+            print(f"❌ 변경분 저장 실패: {e}")
+            return None
+
+    def upsert_via_ledger(self, new_df, ledger, fetched_dates=None):
+        """
+        SQLite 원장에 Upsert한 뒤 원장 내용을 시트에 반영
+
+        하루 전체를 다시 조회한 날짜는 원장에서 그 날짜를 통째로 교체하므로
+        정정되거나 취소된 거래의 옛 행이 남지 않습니다.
+        대시보드와 PC 파이프라인이 각자 원장을 가지고 같은 시트에 쓰므로,
+        원장이 조회하지 않은 날짜에 대해서는 시트에만 있는 거래(다른 쪽에서 추가한 행)를 원장에 합친 뒤
+        원장 내용을 시트에 반영합니다.
+
+        Args:
+            new_df: 새로운 데이터 DataFrame
+            ledger: TradeLedger 인스턴스
+            fetched_dates: 하루 전체를 조회한 날짜 목록 (거래가 없는 날 포함, None이면 new_df에 있는 날짜)
+        """
+        if not self.worksheet:
+            print("❌ 워크시트가 열려있지 않습니다.")
+            return False
+
+        try:
+            values = self._read_values()
+
+            count = ledger.upsert(new_df, replace_dates=True if fetched_dates is None else fetched_dates)
+            print(f"💾 원장 저장: {count}건 (전체 {ledger.count()}건)")
+
+            self._merge_sheet_into_ledger(values, ledger)
+            return self.sync_from_ledger(ledger, values=values)
+
+        except Exception as e:
+            print(f"❌ 원장 Upsert 실패: {e}")
+            return False
+
+    def _merge_sheet_into_ledger(self, values, ledger):
+        """
+        시트에만 있는 거래를 원장에 추가
+
+        원장에 이미 있는 거래 키는 그대로 두고, 원장이 하루 전체를 조회한 날짜의 행은
+        합치지 않습니다 (원장에서 지운 옛 거래가 시트에서 되살아나지 않도록).
+
+        Args:
+            values: 시트에서 읽은 값
+            ledger: TradeLedger 인스턴스
+
+        Returns:
+            int: 원장에 추가한 행 수
+        """
+        sheet_df = _values_frame(values)
+        if sheet_df is None or sheet_df.empty:
+            return 0
+        if not has_trade_key(sheet_df.columns):
+            print("⚠️ 시트에 거래 키 컬럼이 없어 원장에 합치지 않습니다.")
+            return 0
+
+        fetched = ledger.fetched_dates()
+        if fetched:
+            sheet_df = sheet_df[~pd.to_datetime(sheet_df['날짜']).dt.strftime('%Y-%m-%d').isin(fetched)]
+
+        # 시트는 원장을 뒤집어 쓴 최신순이므로 원장 순서로 되돌린 뒤 순번을 매김
+        sheet_df = sheet_df.iloc[::-1].sort_values('날짜', kind='stable', ignore_index=True)
+        added = ledger.insert_missing(sheet_df)
+        if added:
+            print(f"📥 시트에만 있던 거래 {added}건을 원장에 추가")
+        return added
+
+    def sync_from_ledger(self, ledger, values=None):
+        """
+        원장 전체를 시트에 반영 (시트는 원장의 사본)
+
+        원장이 조회하지 않은 날짜의 시트에만 있는 거래는 먼저 원장에 합치므로 다른 곳에서 추가한 행을 지우지 않습니다.
+
+        Args:
+            ledger: TradeLedger 인스턴스
+            values: 이미 읽고 원장에 합친 시트 값 (None이면 새로 읽어 합침)
+        """
+        if values is None:
+            values = self._read_values()
+            self._merge_sheet_into_ledger(values, ledger)
+
+        df = ledger.read()
+        if df.empty:
+            print("⚠️ 원장에 데이터가 없습니다.")
+            return False
+
+        # 시트 표시는 최신순, 달라진 행만 기록
+        df = df.iloc[::-1].reset_index(drop=True)
+        stats = self.write_diff(df, values=values)
+        if stats is None:
+            return False
+        self.update_yearly_summaries(df, years=stats['연도'])
+        return True
+
+    def update_yearly_summaries(self, df, years=None):
+        """
+        연도별 요약 시트 생성 및 업데이트
+
+        모든 연도의 시트 생성, 기존 값 삭제, 값 쓰기, 서식 적용을 batch_update 한 번으로 처리하므로
+        연도 수와 관계없이 API 호출은 시트 목록 조회 1회 + 쓰기 1회입니다.
+
+        Args:
+            df: 전체 실현손익 데이터
+            years: 다시 쓸 연도 (None이면 전체, 시트가 없는 연도는 항상 포함)
+                   (행이 모두 삭제된 연도는 시트의 기존 값을 비움, None이면 데이터가 없는 연도 시트를 모두 비움)
+        """
+        if years is not None and not years:
+            print("ℹ️ 바뀐 연도가 없어 연도별 시트는 그대로 둡니다.")
+            return
+        if (df is None or df.empty) and years is None:
             return
             
+        started = time.perf_counter()
         try:
-            df_copy = df.copy()
-            df_copy['날짜'] = pd.to_datetime(df_copy['날짜'])
-            
-            # 실현손익 컬럼 숫자형으로 변환 (빈 문자열 등 처리)
-            if '실현손익' in df_copy.columns:
-                df_copy['실현손익'] = pd.to_numeric(df_copy['실현손익'], errors='coerce').fillna(0)
-            
-            df_copy['연도'] = df_copy['날짜'].dt.year
-            df_copy['월'] = df_copy['날짜'].dt.month
-            df_copy['분기'] = df_copy['날짜'].dt.quarter
-            
-            # 연도별로 처리
-            for year in sorted(df_copy['연도'].unique(), reverse=True):
-                year_df = df_copy[df_copy['연도'] == year].copy()
+            # 전체 행을 한 번만 집계 (일별 합계), 월/분기/연간 합계는 일별 합계에서 계산
+            if df is None or df.empty:
+                daily = pd.Series(dtype='float64', index=pd.DatetimeIndex([]))
+            else:
+                profit = pd.to_numeric(df['실현손익'], errors='coerce').fillna(0)
+                daily = profit.groupby(pd.to_datetime(df['날짜']).dt.normalize().to_numpy()).sum()
+            year_dailies = dict(iter(daily.groupby(daily.index.year, sort=False)))
+
+            # 기존 워크시트 (제목 → 속성)
+            existing = {ws.title: ws for ws in self.sheet.worksheets()}
+            next_sheet_id = max([ws.id for ws in existing.values()] + [0]) + 1
+
+            if years is None:
+                targets = set(year_dailies) | {int(title) for title in existing if title.isdigit() and len(title) == 4}
+            else:
+                targets = set(years) | {year for year in year_dailies if str(year) not in existing}
+            targets = sorted(targets, reverse=True)
+
+            requests = []
+            cells = 0
+            cleared = []
+            for year in targets:
                 ws_name = str(year)
-                
-                # 워크시트 열기 또는 생성
-                try:
-                    ws = self.sheet.worksheet(ws_name)
-                    ws.clear()
-                except gspread.WorksheetNotFound:
-                    ws = self.sheet.add_worksheet(title=ws_name, rows=1000, cols=10)
-                
-                # --- [1] 상단 요약 테이블 생성 ---
-                # 월별 합계
-                monthly = year_df.groupby('월')['실현손익'].sum().reset_index()
-                # 분기별 합계
-                quarterly = year_df.groupby('분기')['실현손익'].sum().reset_index()
-                
-                # 연간 합계
-                yearly_total = year_df['실현손익'].sum()
-
-                # 요약 정보 계산
-                monthly_summary = year_df.groupby('월').agg({
-                    '실현손익': 'sum',
-                    '수수료_제세금': 'sum',
-                    '매수금액': 'sum',
-                    '매도금액': 'sum',
-                    '수익률': 'mean' # 수익률은 평균으로 계산 (가중평균이 더 정확하겠지만 일단 단순 평균)
-                }).reset_index()
-                
-                # int64 -> int, float64 -> float 변환 (JSON 직렬화 문제 해결)
-                monthly_summary = monthly_summary.astype(object)
-                for col in monthly_summary.columns:
-                     monthly_summary[col] = monthly_summary[col].apply(lambda x: x.item() if hasattr(x, 'item') else x)
-                
-                # 월별 요약 저장
-                summary_data = [
-                    [f"📊 {year}년 성과 요약", "", "", ""],
-                    ["구분", "기간/월", "실현손익", "비고"],
-                    ["연간합계", "전체", yearly_total, ""],
-                ]
-                
-                # 분기 데이터 추가
-                for _, row in quarterly.iterrows():
-                    summary_data.append(["분기합계", f"{int(row['분기'])}분기", row['실현손익'], ""])
-                
-                # 월별 데이터 추가 (가로로 가독성 좋게 하거나 세로로 나열)
-                for _, row in monthly.iterrows():
-                    summary_data.append(["월별합계", f"{int(row['월'])}월", row['실현손익'], ""])
-                
-                summary_data.append(["", "", "", ""]) # 빈 줄
-                
-                # --- [2] 하단 일별 상세 데이터 생성 ---
-                daily_stats = year_df.groupby(year_df['날짜'].dt.date)['실현손익'].sum().reset_index()
-                daily_stats.columns = ['날짜', '당일손익']
-                daily_stats = daily_stats.sort_values('날짜') # 누적 계산을 위해 오름차순
-                daily_stats['누적손익'] = daily_stats['당일손익'].cumsum()
-                daily_stats = daily_stats.sort_values('날짜', ascending=False) # 시트 표시를 위해 최신순
-                
-                detail_header = ["📅 일별 상세 내역", "", ""]
-                detail_columns = ["날짜", "당일손익", "누적손익"]
-                detail_rows = daily_stats.values.tolist()
-                
-                # 날짜 포맷 변경
-                for r in detail_rows:
-                    r[0] = r[0].strftime('%Y-%m-%d')
-                
-                # 전체 데이터 조합
-                final_data = summary_data + [detail_header, detail_columns] + detail_rows
-                
-                # 시트에 업데이트
-                ws.update('A1', final_data)
-                
-                # --- [3] 서식 적용 (천 단위 구분 기호) ---
-                # 요약 테이블 금액 (C열)
-                summary_end_row = len(summary_data)
-                ws.format(f"C3:C{summary_end_row}", {"numberFormat": {"type": "NUMBER", "pattern": "#,##0"}})
-                
-                # 일별 상세 내역 금액 (B, C열)
-                detail_start_row = summary_end_row + 3 # Header 2줄 + 빈 줄 1줄 다음
-                detail_end_row = detail_start_row + len(detail_rows) - 1
-                ws.format(f"B{detail_start_row}:C{detail_end_row}", {"numberFormat": {"type": "NUMBER", "pattern": "#,##0"}})
-                
-                print(f"✅ 연도별 시트 업데이트 완료: {ws_name}")
+                ws = existing.get(ws_name)
+                year_daily = year_dailies.get(year)
+                if year_daily is None:
+                    # 행이 모두 삭제된 연도는 이전 합계가 남지 않도록 기존 값을 비움
+                    if ws is not None:
+                        requests.append({"updateCells": {"range": {"sheetId": ws.id}, "fields": "userEnteredValue"}})
+                        cleared.append(year)
+                    continue
+
+                final_data, summary_end_row, detail_count = _yearly_summary_rows(year, year_daily)
+
+                # 워크시트가 없으면 생성, 있으면 기존 값 삭제
+                if ws is None:
+                    sheet_id = next_sheet_id
+                    next_sheet_id += 1
+                    requests.append({"addSheet": {"properties": {
+                        "sheetId": sheet_id, "title": ws_name,
+                        "gridProperties": {"rowCount": max(1000, len(final_data)), "columnCount": 10},
+                    }}})
+                else:
+                    sheet_id = ws.id
+                    requests.append({"updateCells": {"range": {"sheetId": sheet_id}, "fields": "userEnteredValue"}})
+                    if ws.row_count < len(final_data):
+                        requests.append({"appendDimension": {
+                            "sheetId": sheet_id, "dimension": "ROWS", "length": len(final_data) - ws.row_count,
+                        }})
+
+                requests.append(_update_cells(sheet_id, 0, final_data))
+                cells += sum(len(row) for row in final_data)
+
+                # 서식 적용 (천 단위 구분 기호): 요약 테이블 금액(C열), 일별 상세 내역 금액(B, C열)
+                detail_start_row = summary_end_row + 3  # Header 2줄 + 빈 줄 1줄 다음
+                requests.append(_number_format(sheet_id, 2, summary_end_row, 2, 3))
+                if detail_count:
+                    requests.append(_number_format(
+                        sheet_id, detail_start_row - 1, detail_start_row - 1 + detail_count, 1, 3
+                    ))
+
+            if requests:
+                self.sheet.batch_update({"requests": requests})
+            metrics.SHEETS_CELLS.inc(cells, operation="yearly_summary")
+            print(f"✅ 연도별 시트 업데이트 완료: {', '.join(str(year) for year in targets if year in year_dailies)}")
+            if cleared:
+                print(f"🧹 거래가 없어진 연도 시트 비움: {', '.join(str(year) for year in cleared)}")
+            
+            metrics.SHEETS_SECONDS.observe(time.perf_counter() - started, operation="yearly_summary")
 
         except Exception as e:
+            metrics.SHEETS_ERRORS.inc(operation="yearly_summary")
             print(f"❌ 연도별 요약 업데이트 실패: {e}")
 
 
+def _number_format(sheet_id, start_row, end_row, start_col, end_col):
+    """천 단위 구분 기호 서식 요청 (행/열 번호는 0부터, 끝은 포함하지 않음)"""
+    return {"repeatCell": {
+        "range": {
+            "sheetId": sheet_id,
+            "startRowIndex": start_row, "endRowIndex": end_row,
+            "startColumnIndex": start_col, "endColumnIndex": end_col,
+        },
+        "cell": {"userEnteredFormat": {"numberFormat": {"type": "NUMBER", "pattern": "#,##0"}}},
+        "fields": "userEnteredFormat.numberFormat",
+    }}
+
+
+def _yearly_summary_rows(year, daily):
+    """
+    연도 시트에 쓸 값 (상단 요약 + 하단 일별 상세)
+
+    Args:
+        year: 연도
+        daily: 해당 연도의 일별 실현손익 합계 (날짜 인덱스 Series)
+
+    Returns:
+        tuple: (행 리스트, 요약 테이블 마지막 행 번호, 일별 상세 행 수)
+    """
+    daily = daily.sort_index()
+
+    # --- [1] 상단 요약 테이블 생성 ---
+    monthly = daily.groupby(daily.index.month).sum()
+    quarterly = daily.groupby(daily.index.quarter).sum()
+    yearly_total = daily.sum()
+
+    summary_data = [
+        [f"📊 {year}년 성과 요약", "", "", ""],
+        ["구분", "기간/월", "실현손익", "비고"],
+        ["연간합계", "전체", yearly_total, ""],
+    ]
+    summary_data += [["분기합계", f"{quarter}분기", value, ""] for quarter, value in quarterly.items()]
+    summary_data += [["월별합계", f"{month}월", value, ""] for month, value in monthly.items()]
+    summary_data.append(["", "", "", ""]) # 빈 줄
+
+    # --- [2] 하단 일별 상세 데이터 생성 (누적은 오름차순으로 계산, 표시는 최신순) ---
+    cumulative = daily.cumsum()
+    detail_rows = [
+        [day.strftime('%Y-%m-%d'), value, total]
+        for day, value, total in zip(daily.index[::-1], daily.to_numpy()[::-1], cumulative.to_numpy()[::-1])
+    ]
+
+    final_data = summary_data + [["📅 일별 상세 내역", "", ""], ["날짜", "당일손익", "누적손익"]] + detail_rows
+    return final_data, len(summary_data), len(detail_rows)
+
+
 def main():
     """메인 실행 함수 (테스트용)"""
     import sys
@@ -0,0 +1,79 @@
+"""
+HTTP 커넥션 풀 모듈
+
+키움 REST API(인증, 연속조회)와 텔레그램 호출이 하나의 requests.Session을 공유하여
+매 요청마다 새 TLS 연결을 맺지 않고 keep-alive 연결을 재사용하도록 합니다.
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+try:
+    from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK
+    from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_KEEP_ALIVE
+except ImportError:
+    # config.py에 설정이 없는 경우 기본값 사용
+    HTTP_POOL_CONNECTIONS = 4   # 캐시할 호스트별 커넥션 풀 개수
+    HTTP_POOL_MAXSIZE = 8       # 호스트당 최대 연결 수
+    HTTP_POOL_BLOCK = True      # 호스트당 연결 수 초과 시 대기 (False면 임시 연결 생성)
+    HTTP_CONNECT_TIMEOUT = 5    # 연결 타임아웃 (초)
+    HTTP_READ_TIMEOUT = 10      # 응답 타임아웃 (초)
+    HTTP_KEEP_ALIVE = True
+
+
+class PooledSession(requests.Session):
+    """커넥션 풀과 기본 타임아웃이 설정된 requests 세션"""
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 pool_block=HTTP_POOL_BLOCK, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 keep_alive=HTTP_KEEP_ALIVE):
+        """
+        초기화
+
+        Args:
+            pool_connections: 캐시할 호스트별 커넥션 풀 개수
+            pool_maxsize: 호스트당 최대 연결 수
+            pool_block: 호스트당 연결 수를 초과하면 빈 연결이 생길 때까지 대기
+            timeout: 기본 타임아웃 (초 또는 (연결, 응답) 튜플)
+            keep_alive: False면 매 요청 후 연결 종료
+        """
+        super().__init__()
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
+    def request(self, method, url, **kwargs):
+        """타임아웃이 지정되지 않은 요청에 기본 타임아웃 적용"""
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """프로세스 전체에서 공유하는 세션 반환 (최초 호출 시 생성)"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = PooledSession()
+        return _shared_session
+
+
+def close_shared_session():
+    """공유 세션 종료 (열린 연결 정리)"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
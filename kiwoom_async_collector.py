@@ -0,0 +1,160 @@
+"""
+키움증권 REST API 비동기 수집 모듈
+
+조회 기간을 여러 날짜 구간으로 나누어 동시에 요청합니다.
+각 구간의 연속조회(cont-yn/next-key)는 순서대로 진행되며,
+결과는 날짜순으로 병합된 하나의 DataFrame으로 반환됩니다.
+"""
+
+import asyncio
+import pandas as pd
+from kiwoom_collector import KiwoomRestCollector
+from krx_calendar import trading_days
+try:
+    from config import ASYNC_CONCURRENCY, ASYNC_WINDOW_DAYS
+except ImportError:
+    ASYNC_CONCURRENCY = 4   # 동시에 조회할 구간 수
+    ASYNC_WINDOW_DAYS = 5   # 구간 하나의 크기 (거래일)
+
+
+class AsyncKiwoomCollector(KiwoomRestCollector):
+    """날짜 구간을 동시에 조회하는 키움 REST API 수집 클래스"""
+
+    def __init__(self, app_key, app_secret, account_number=None, session=None, rate_limiter=None,
+                 token_store=None, response_cache=None, base_url=None,
+                 concurrency=ASYNC_CONCURRENCY, window_days=ASYNC_WINDOW_DAYS):
+        """
+        초기화
+
+        Args:
+            app_key: 키움 REST API App Key
+            app_secret: 키움 REST API App Secret
+            account_number: 계좌번호 (선택)
+            session: 요청에 사용할 세션 (None이면 프로세스 공유 커넥션 풀 사용)
+            rate_limiter: 요청 제한기 (None이면 프로세스 공유 제한기 사용)
+            token_store: 토큰 캐시 (None이면 기본 파일 캐시 사용)
+            response_cache: 거래일별 응답 캐시 (None이면 기본 캐시, False면 사용 안 함)
+            base_url: API 주소 (None이면 설정값 사용, 로컬 모의 서버 테스트용)
+            concurrency: 동시에 조회할 최대 구간 수
+            window_days: 구간 하나의 크기 (거래일)
+        """
+        super().__init__(
+            app_key, app_secret, account_number, session=session, rate_limiter=rate_limiter,
+            token_store=token_store, response_cache=response_cache, base_url=base_url
+        )
+        self.concurrency = max(1, concurrency)
+        self.window_days = max(1, window_days)
+
+    def get_realized_profit_range(self, start_date, end_date, progress_callback=None):
+        """
+        기간별 실현손익 요청 (동기 호출용 래퍼)
+
+        Args:
+            start_date: 조회 시작일 (YYYYMMDD)
+            end_date: 조회 종료일 (YYYYMMDD)
+            progress_callback: 진행 상황 콜백 (처리한 거래일 수, 전체 거래일 수)
+
+        Returns:
+            DataFrame: 날짜순으로 정렬된 실현손익 데이터 (실패 시 None)
+        """
+        return asyncio.run(
+            self.get_realized_profit_range_async(start_date, end_date, progress_callback)
+        )
+
+    async def get_realized_profit_range_async(self, start_date, end_date, progress_callback=None):
+        """
+        기간별 실현손익 비동기 요청 (ka10073)
+
+        Args:
+            start_date: 조회 시작일 (YYYYMMDD)
+            end_date: 조회 종료일 (YYYYMMDD)
+            progress_callback: 진행 상황 콜백 (처리한 거래일 수, 전체 거래일 수)
+
+        Returns:
+            DataFrame: 날짜순으로 정렬된 실현손익 데이터 (실패 시 None)
+        """
+        # 주말/휴장일은 조회하지 않음
+        days = trading_days(start_date, end_date)
+        if not days:
+            print(f"ℹ️ 조회 기간에 거래일이 없습니다. ({start_date} ~ {end_date})")
+            return pd.DataFrame()
+
+        # 정산이 끝난 날짜는 캐시에서 조회
+        cached = await asyncio.to_thread(self._load_cached_days, start_date, end_date)
+        runs = self._missing_runs(days, cached)
+        if not runs:
+            return self._build_dataframe(cached)
+
+        # 토큰은 구간 분배 전에 한 번만 확인
+        if not await asyncio.to_thread(self._check_token_validity):
+            print("❌ 토큰 인증 실패")
+            return None
+
+        try:
+            windows = [
+                run[i:i + self.window_days]
+                for run in runs
+                for i in range(0, len(run), self.window_days)
+            ]
+
+            print(f"⚡ {len(windows)}개 구간 동시 조회 (최대 {self.concurrency}개)")
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            processed_days = len(days) - sum(len(run) for run in runs)
+
+            async def fetch(window):
+                nonlocal processed_days
+                result = await self._fetch_window(semaphore, window)
+                processed_days += len(window)
+                if progress_callback:
+                    progress_callback(processed_days, len(days))
+                return result
+
+            results = await asyncio.gather(*(fetch(window) for window in windows))
+
+            if any(result is None for result in results):
+                return None
+
+            records_by_date = dict(cached)
+            for result in results:
+                for day, records in result.items():
+                    records_by_date.setdefault(day, []).extend(records)
+
+            self._print_rate_stats()
+            return self._build_dataframe(records_by_date)
+
+        except Exception as e:
+            print(f"❌ 데이터 조회 실패: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    async def _fetch_window(self, semaphore, window):
+        """
+        구간 하나 조회 (연속조회는 구간 안에서 순서대로 진행)
+
+        Args:
+            semaphore: 동시 조회 수 제한용 세마포어
+            window: 구간에 속한 거래일 목록 (YYYYMMDD, 오름차순)
+
+        Returns:
+            dict: 일자(YYYYMMDD)별 레코드 리스트, 실패 시 None
+        """
+        strt_dt, end_dt = window[0], window[-1]
+
+        async with semaphore:
+            records, _ = await asyncio.to_thread(self._request_ka10073, strt_dt, end_dt)
+
+        if records is None:
+            return None
+
+        # dt 필드가 없으면 다일 구간에서 날짜를 알 수 없으므로 일별로 다시 조회
+        if strt_dt != end_dt and any(not rec.get("dt") for rec in records):
+            results = await asyncio.gather(*(self._fetch_window(semaphore, [day]) for day in window))
+            if any(result is None for result in results):
+                return None
+            return {day: records for result in results for day, records in result.items()}
+
+        records_by_date = self._split_by_date(records, window)
+        await asyncio.to_thread(self._store_cached_days, records_by_date)
+        return records_by_date
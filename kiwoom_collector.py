@@ -5,10 +5,19 @@
 필수 패키지: requests, pandas
 """
 
-import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+from http_pool import get_shared_session
+from rate_limiter import get_shared_rate_limiter
+from token_store import TokenStore
+from krx_calendar import trading_days
+from response_cache import ResponseCache
+import metrics
 try:
     from config import KIWOOM_REST_API_BASE_URL
 except ImportError:
@@ -16,10 +25,43 @@ except ImportError:
     KIWOOM_REST_API_BASE_URL = "https://api.kiwoom.com"
 
 
+# ka10073 응답 컬럼 스키마: API 필드 → (컬럼명, 변환 타입)
+# - date: YYYYMMDD → datetime64
+# - int: 콤마/부호 제거 후 Int64 (금액, 수량, 값이 없으면 <NA>)
+# - rate: 부호/% 제거 후 float64 (수익률)
+# - code: 'A' 접두어 제거 후 category (종목코드)
+# - category: category (종목명)
+# 매수수량, 매수금액, 매도금액, 수수료_제세금은 _clean_dataframe에서 계산
+KA10073_SCHEMA = {
+    'dt': ('날짜', 'date'),
+    'stk_nm': ('종목명', 'category'),
+    'stk_cd': ('종목코드', 'code'),
+    'buy_uv': ('매수평균가', 'int'),     # 매수단가
+    'cntr_pric': ('매도평균가', 'int'),  # 체결가(매도단가)
+    'cntr_qty': ('매도수량', 'int'),     # 체결량
+    'tdy_sel_pl': ('실현손익', 'int'),
+    'pl_rt': ('수익률', 'rate'),
+    'tdy_trde_cmsn': ('수수료', 'int'),
+    'tdy_trde_tax': ('제세금', 'int'),
+}
+
+
 class KiwoomRestCollector:
     """키움 REST API 데이터 수집 클래스"""
     
-    def __init__(self, app_key, app_secret, account_number=None):
+    # 기간 조회 구간 크기 (거래일) 및 조절 기준
+    RANGE_WINDOW_DAYS = 21      # 첫 구간 크기 (약 1개월)
+    RANGE_MIN_WINDOW_DAYS = 1
+    RANGE_MAX_WINDOW_DAYS = 63
+    RANGE_TARGET_PAGES = 4      # 구간당 페이지 수가 이보다 많으면 구간을 줄임
+    
+    # 요청 제한 응답 시 재시도 횟수 및 대기 시간 (지수 백오프 + 지터, 초)
+    MAX_RETRIES = 3
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    def __init__(self, app_key, app_secret, account_number=None, session=None, rate_limiter=None,
+                 token_store=None, response_cache=None, base_url=None):
         """
         초기화
         
@@ -27,13 +69,22 @@ class KiwoomRestCollector:
             app_key: 키움 REST API App Key
             app_secret: 키움 REST API App Secret
             account_number: 계좌번호 (선택)
+            session: 요청에 사용할 세션 (None이면 프로세스 공유 커넥션 풀 사용)
+            rate_limiter: 요청 제한기 (None이면 프로세스 공유 제한기 사용)
+            token_store: 토큰 캐시 (None이면 기본 파일 캐시 사용)
+            response_cache: 거래일별 응답 캐시 (None이면 기본 캐시, False면 사용 안 함)
+            base_url: API 주소 (None이면 설정값 사용, 로컬 모의 서버 테스트용)
         """
-        self.base_url = KIWOOM_REST_API_BASE_URL
+        self.base_url = (base_url or KIWOOM_REST_API_BASE_URL).rstrip("/")
         self.app_key = app_key
         self.app_secret = app_secret
         self.account_number = account_number
         self.access_token = None
         self.token_expires_at = None
+        self.session = session or get_shared_session()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.token_store = token_store or TokenStore()
+        self.response_cache = ResponseCache() if response_cache is None else response_cache
         
     def authenticate(self):
         """
@@ -57,7 +108,8 @@ class KiwoomRestCollector:
                 "secretkey": self.app_secret
             }
             
-            response = requests.post(url, json=body, headers=headers, timeout=10)
+            with metrics.KIWOOM_AUTH_SECONDS.time():
+                response = self._post(url, body, headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -78,6 +130,14 @@ class KiwoomRestCollector:
                 
                 print("✅ 인증 성공")
                 print(f"📅 토큰 만료 시간: {self.token_expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                # 다른 프로세스와 토큰 공유
+                try:
+                    self.token_store.save(
+                        self.app_key, self.access_token, self.token_expires_at, self.base_url
+                    )
+                except Exception as e:
+                    print(f"⚠️ 토큰 캐시 저장 실패: {e}")
                 return True
             else:
                 print(f"❌ 인증 실패: {response.status_code}")
@@ -88,17 +148,127 @@ class KiwoomRestCollector:
             print(f"❌ 인증 오류: {e}")
             return False
     
-    def _check_token_validity(self):
-        """토큰 유효성 확인 및 갱신"""
+    def _post(self, url, body, headers):
+        """
+        요청 제한기를 거쳐 POST 요청
+        
+        429/5xx 또는 요청 한도 초과 응답을 받으면 속도를 낮추고 잠시 기다린 뒤 재시도하고
+        (Retry-After 헤더가 있으면 그 시간, 없으면 지수 백오프 + 지터),
+        그 외 return_code 오류도 속도를 낮추는 신호로 사용합니다.
+        
+        Returns:
+            Response: 마지막 응답
+        """
+        # 지표 라벨 (토큰 발급 요청에는 api-id 헤더가 없음)
+        api_id = headers.get("api-id") or ("au10001" if url.endswith("/oauth2/token") else url.rsplit("/", 1)[-1])
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            with metrics.KIWOOM_RATE_LIMIT_WAIT_SECONDS.time(api=api_id):
+                self.rate_limiter.acquire()
+            with metrics.KIWOOM_REQUEST_SECONDS.time(api=api_id):
+                response = self.session.post(url, json=body, headers=headers)
+            
+            metrics.KIWOOM_REQUESTS.inc(api=api_id, status=response.status_code)
+            metrics.KIWOOM_RESPONSE_BYTES.inc(len(response.content or b""), api=api_id)
+            
+            throttled = response.status_code == 429 or response.status_code >= 500
+            return_code = 0
+            if response.status_code == 200:
+                try:
+                    data = response.json()
+                    return_code = data.get("return_code", 0) or 0
+                    return_msg = str(data.get("return_msg", ""))
+                    throttled = return_code != 0 and ("1700" in return_msg or "초과" in return_msg)
+                except ValueError:
+                    pass
+            
+            if throttled:
+                self.rate_limiter.on_throttle()
+                if attempt < self.MAX_RETRIES:
+                    metrics.KIWOOM_RETRIES.inc(api=api_id)
+                    delay = self._retry_delay(attempt, response)
+                    print(f"⏳ 요청 제한 응답 ({response.status_code}), "
+                          f"{self.rate_limiter.rate:.1f} req/s로 낮춰 {delay:.1f}초 후 재시도합니다.")
+                    time.sleep(delay)
+                    continue
+            elif return_code != 0:
+                self.rate_limiter.on_throttle()
+            elif response.status_code == 200:
+                # 인증/요청 오류(4xx)는 요청 속도와 무관하므로 제한기를 올리지 않음
+                self.rate_limiter.on_success()
+            
+            return response
+        
+        return response
+    
+    def _retry_delay(self, attempt, response):
+        """
+        재시도 전 대기 시간
+        
+        Args:
+            attempt: 지금까지 실패한 시도 번호 (0부터)
+            response: 요청 제한 응답
+        
+        Returns:
+            float: 대기 시간 (초, Retry-After가 있으면 그 값, 없으면 지수 백오프에 지터 적용)
+        """
+        retry_after = (response.headers or {}).get("Retry-After")
+        if retry_after:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                try:
+                    seconds = (parsedate_to_datetime(retry_after) - datetime.now().astimezone()).total_seconds()
+                except (TypeError, ValueError):
+                    seconds = None
+            if seconds is not None:
+                return min(max(seconds, 0.0), self.RETRY_MAX_DELAY)
+        
+        delay = min(self.RETRY_BASE_DELAY * (2 ** attempt), self.RETRY_MAX_DELAY)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _token_expiring(self):
+        """토큰이 없거나 만료 5분 전이면 True"""
         if not self.access_token or not self.token_expires_at:
-            return self.authenticate()
+            return True
+        return datetime.now() >= self.token_expires_at - timedelta(minutes=5)
+    
+    def _load_cached_token(self):
+        """토큰 캐시에 저장된 토큰 불러오기"""
+        try:
+            token, expires_at = self.token_store.load(self.app_key, self.base_url)
+        except Exception as e:
+            print(f"⚠️ 토큰 캐시 읽기 실패: {e}")
+            return
         
-        # 만료 5분 전에 갱신
-        if datetime.now() >= self.token_expires_at - timedelta(minutes=5):
-            print("🔄 토큰 갱신 중...")
-            return self.authenticate()
+        if token:
+            self.access_token = token
+            self.token_expires_at = expires_at
+    
+    def _check_token_validity(self):
+        """토큰 유효성 확인 및 갱신 (토큰 캐시 우선)"""
+        if not self._token_expiring():
+            return True
         
-        return True
+        # 다른 프로세스가 이미 발급받은 토큰이 있으면 재사용
+        self._load_cached_token()
+        if not self._token_expiring():
+            print(f"♻️ 캐시된 토큰 사용 (만료: {self.token_expires_at.strftime('%Y-%m-%d %H:%M:%S')})")
+            return True
+        
+        try:
+            # 여러 프로세스가 동시에 발급받지 않도록 잠금 후 한 번 더 확인
+            with self.token_store.lock:
+                self._load_cached_token()
+                if not self._token_expiring():
+                    return True
+                
+                if self.access_token:
+                    print("🔄 토큰 갱신 중...")
+                return self.authenticate()
+        except TimeoutError as e:
+            print(f"⚠️ {e}")
+            return self.authenticate()
     
     def get_realized_profit(self, base_date=None):
         """
@@ -111,160 +281,428 @@ class KiwoomRestCollector:
         Returns:
             DataFrame: 실현손익 데이터
         """
-        if not self._check_token_validity():
-            print("❌ 토큰 인증 실패")
-            return None
-        
         # 날짜 설정
         if not base_date:
             base_date = datetime.now().strftime("%Y%m%d")
         
-        try:
-            print(f"📥 실현손익 조회 중... (기준일: {base_date})")
-            
-            url = f"{self.base_url}/api/dostk/acnt"
+        return self.get_realized_profit_range(base_date, base_date)
+    
+    def get_realized_profit_range(self, start_date, end_date, progress_callback=None):
+        """
+        기간별 실현손익 요청 (ka10073, 여러 날짜를 한 번에 조회)
+        
+        iter_realized_profit_pages가 돌려주는 페이지 조각을 모두 모아 하나의 DataFrame으로 합칩니다.
+        
+        Args:
+            start_date: 조회 시작일 (YYYYMMDD)
+            end_date: 조회 종료일 (YYYYMMDD)
+            progress_callback: 진행 상황 콜백 (처리한 거래일 수, 전체 거래일 수)
             
-            headers = {
-                "Content-Type": "application/json;charset=UTF-8",
-                "api-id": "ka10073",
-                "authorization": f"Bearer {self.access_token}"
-            }
+        Returns:
+            DataFrame: 날짜순으로 정렬된 실현손익 데이터 (실패 시 None)
+        """
+        try:
+            chunks = list(self.iter_realized_profit_pages(start_date, end_date, progress_callback))
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        except Exception as e:
+            print(f"❌ 데이터 조회 실패: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+        
+        return self._concat_chunks(chunks)
+    
+    def iter_realized_profit_pages(self, start_date, end_date, progress_callback=None):
+        """
+        기간별 실현손익을 응답 페이지 단위로 정리하여 차례로 반환 (ka10073)
+        
+        하루씩 조회하는 대신 strt_dt ~ end_dt 구간 단위로 연속조회하고,
+        한 구간의 페이지를 모두 받아 응답 형식을 확인한 뒤 그 구간의 조각들을 넘겨줍니다.
+        전체 결과를 메모리에 모아두지 않으므로, 호출하는 쪽은 다음 구간을
+        기다리는 동안 받은 조각을 먼저 저장할 수 있고, 중간에 형식이 다른 페이지가
+        오더라도 이미 넘겨받은 조각은 모두 끝까지 조회된 구간의 데이터입니다.
+        구간은 거래일 기준으로 나누며, 크기는 직전 구간의 페이지 수를 보고
+        자동으로 늘리거나 줄입니다. 캐시된 날짜는 구간 단위로 묶어 반환합니다.
+        
+        Args:
+            start_date: 조회 시작일 (YYYYMMDD)
+            end_date: 조회 종료일 (YYYYMMDD)
+            progress_callback: 진행 상황 콜백 (처리한 거래일 수, 전체 거래일 수)
             
-            # ka10073 파라미터 (일자별 조회)
-            body = {
-                "acnt_no": self.account_number,
-                "strt_dt": base_date,
-                "end_dt": base_date,
-                "sll_buy_dvsn_cd": "0", # 0:전체
-                "inqr_dvsn": "0",       # 0:일별
-                "stk_cd": ""            # 전체 종목
-            }
+        Yields:
+            DataFrame: 정리된 실현손익 조각 (구간 순서대로, 빈 조각은 생략)
             
-            # 연속조회 처리
-            all_data = []
-            cont_yn = ""
-            next_key = ""
+        Raises:
+            RuntimeError: 인증 또는 API 요청 실패
+        """
+        # 주말/휴장일은 조회하지 않음
+        days = trading_days(start_date, end_date)
+        if not days:
+            print(f"ℹ️ 조회 기간에 거래일이 없습니다. ({start_date} ~ {end_date})")
+            return
+        
+        # 정산이 끝난 날짜는 캐시에서 조회
+        cached = self._load_cached_days(start_date, end_date)
+        runs = self._missing_runs(days, cached)
+        
+        if runs and not self._check_token_validity():
+            raise RuntimeError("토큰 인증 실패")
+        
+        window_days = self.RANGE_WINDOW_DAYS
+        trading_day_set = set(days)
+        processed = 0
+        
+        for is_cached, segment in self._segments(days, cached):
+            if is_cached:
+                for i in range(0, len(segment), self.RANGE_MAX_WINDOW_DAYS):
+                    block = segment[i:i + self.RANGE_MAX_WINDOW_DAYS]
+                    chunk = self._clean_records([rec for day in block for rec in cached[day]])
+                    if not chunk.empty:
+                        yield chunk
+                processed += sum(1 for day in segment if day in trading_day_set)
+                if progress_callback:
+                    progress_callback(processed, len(days))
+                continue
             
-            while True:
-                # 연속조회 헤더 추가
-                if cont_yn == "Y":
-                    headers["cont-yn"] = cont_yn
-                    headers["next-key"] = next_key
+            run_processed = 0
+            while run_processed < len(segment):
+                window = segment[run_processed:run_processed + window_days]
+                strt_dt, window_end = window[0], window[-1]
                 
-                response = requests.post(url, json=body, headers=headers, timeout=10)
+                window_records = {day: [] for day in window}
+                window_chunks = []
+                pages = 0
+                missing_dt = False
                 
-                if response.status_code == 200:
-                    data = response.json()
+                for records in self._iter_ka10073_pages(strt_dt, window_end):
+                    pages += 1
                     
-                    if "dt_stk_rlzt_pl" in data:
-                        records = data["dt_stk_rlzt_pl"]
-                        if records:
-                            all_data.extend(records)
-                        
-                        cont_yn = response.headers.get("cont-yn", "")
-                        next_key = response.headers.get("next-key", "")
-                        
-                        if cont_yn != "Y":
-                            break
-                    else:
-                        if "msg_cd" in data and data["msg_cd"] != "OPW00001":
-                             print(f"ℹ️ 데이터가 없거나 다른 응답 형식 (ka10073): {data}")
+                    # dt 필드가 없는 레코드는 다일 구간에서 날짜를 알 수 없으므로 일별 조회로 전환
+                    # (구간 조각은 아직 넘기지 않았으므로 몇 번째 페이지에서 발견해도 다시 조회하면 됨)
+                    if strt_dt != window_end and any(not rec.get("dt") for rec in records):
+                        missing_dt = True
                         break
-                else:
-                    print(f"❌ API 요청 실패: {response.status_code}")
-                    print(f"응답: {response.text}")
-                    return None
-            
-            if not all_data:
-                print("⚠️ 조회된 실현손익 내역이 없습니다.")
-                return pd.DataFrame()
-            
-            # DataFrame 변환
-            df = pd.DataFrame(all_data)
-            df = self._clean_dataframe(df)
-            
-            print(f"✅ {len(df)}건의 실현손익 내역 조회 완료")
-            return df
+                    
+                    for day, day_records in self._split_by_date(records, window).items():
+                        window_records.setdefault(day, []).extend(day_records)
+                    
+                    chunk = self._clean_records(records)
+                    if not chunk.empty:
+                        window_chunks.append(chunk)
+                
+                if missing_dt:
+                    print("ℹ️ 응답에 dt 필드가 없어 일별 조회로 전환합니다.")
+                    window_days = 1
+                    continue
+                
+                # 구간 전체를 받은 뒤에만 조각을 넘김 (형식 오류로 구간을 다시 조회해도 중복/부분 저장 없음)
+                yield from window_chunks
+                
+                # 구간이 끝까지 조회된 뒤에만 캐시에 저장
+                self._store_cached_days(window_records)
+                
+                # 페이지 수 기반 구간 크기 조절
+                if pages > self.RANGE_TARGET_PAGES:
+                    window_days = max(self.RANGE_MIN_WINDOW_DAYS, window_days // 2)
+                elif pages <= 1:
+                    window_days = min(self.RANGE_MAX_WINDOW_DAYS, window_days * 2)
                 
+                run_processed += len(window)
+                processed += len(window)
+                
+                if progress_callback:
+                    progress_callback(processed, len(days))
+        
+        if runs:
+            self._print_rate_stats()
+    
+    def _load_cached_days(self, start_date, end_date):
+        """
+        응답 캐시에서 날짜별 레코드 조회 (캐시 미사용 시 빈 딕셔너리)
+        
+        휴장일 표에 없는 휴장일에 저장된 레코드도 돌려받도록 달력 기준 전체 날짜를 조회합니다.
+        """
+        if not self.response_cache:
+            return {}
+        
+        days = pd.date_range(start_date, end_date).strftime("%Y%m%d").tolist()
+        try:
+            cached = self.response_cache.get_many(self.account_number, "ka10073", days)
         except Exception as e:
-            print(f"❌ 데이터 조회 실패: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            print(f"⚠️ 응답 캐시 읽기 실패: {e}")
+            return {}
+        
+        if cached:
+            metrics.KIWOOM_CACHED_DAYS.inc(len(cached))
+            print(f"💾 캐시에서 {len(cached)}일치 응답 사용 (API 조회 생략)")
+        return cached
     
-    def _clean_dataframe(self, df):
-        """데이터프레임 정리 및 컬럼명 표준화"""
-        # 키움 REST API 응답 컬럼명 매핑
-        column_mapping = {
-            'dt': '날짜',
-            'stk_nm': '종목명',
-            'stk_cd': '종목코드',
+    def _store_cached_days(self, records_by_date):
+        """정산이 끝난 날짜의 레코드를 응답 캐시에 저장"""
+        if not self.response_cache:
+            return
+        
+        try:
+            self.response_cache.put_many(self.account_number, "ka10073", records_by_date)
+        except Exception as e:
+            print(f"⚠️ 응답 캐시 저장 실패: {e}")
+    
+    @staticmethod
+    def _missing_runs(days, records_by_date):
+        """캐시에 없는 거래일을 연속 구간 단위로 묶기"""
+        runs = []
+        current = []
+        for day in days:
+            if day in records_by_date:
+                if current:
+                    runs.append(current)
+                    current = []
+            else:
+                current.append(day)
+        if current:
+            runs.append(current)
+        return runs
+    
+    @staticmethod
+    def _segments(days, cached):
+        """
+        조회 기간을 캐시된 구간과 조회할 구간으로 날짜순으로 나누기
+        
+        Returns:
+            list: (캐시 여부, 날짜 목록) 튜플 리스트
+        """
+        segments = []
+        for day in sorted(set(days) | set(cached)):
+            is_cached = day in cached
+            if segments and segments[-1][0] == is_cached:
+                segments[-1][1].append(day)
+            else:
+                segments.append((is_cached, [day]))
+        return segments
+    
+    @staticmethod
+    def _split_by_date(records, window):
+        """
+        구간 응답을 dt 필드 기준으로 날짜별로 나누기
+        
+        Args:
+            records: 구간 응답 레코드
+            window: 구간에 속한 거래일 목록 (거래가 없는 날은 빈 리스트로 채움)
+        """
+        records_by_date = {day: [] for day in window}
+        for rec in records:
+            rec_date = rec.get("dt") or window[0]
+            rec["dt"] = rec_date
+            if rec_date not in records_by_date:
+                print(f"⚠️ 휴장일로 등록된 {rec_date}에 거래 내역이 있습니다. 휴장일 표를 확인하세요.")
+            records_by_date.setdefault(rec_date, []).append(rec)
+        return records_by_date
+    
+    def _build_dataframe(self, records_by_date):
+        """일자별 레코드를 날짜순으로 합쳐 정리된 DataFrame 생성"""
+        all_data = [rec for day in sorted(records_by_date) for rec in records_by_date[day]]
+        
+        if not all_data:
+            print("⚠️ 조회된 실현손익 내역이 없습니다.")
+            return pd.DataFrame()
+        
+        # DataFrame 변환
+        df = pd.DataFrame(all_data)
+        df = self._clean_dataframe(df)
+        
+        print(f"✅ {len(df)}건의 실현손익 내역 조회 완료")
+        return df
+    
+    def _clean_records(self, records):
+        """응답 레코드 리스트를 정리된 DataFrame으로 변환 (레코드가 없으면 빈 DataFrame)"""
+        if not records:
+            return pd.DataFrame()
+        return self._clean_dataframe(pd.DataFrame(records))
+    
+    @staticmethod
+    def _concat_chunks(chunks):
+        """페이지 조각을 날짜순으로 합치기 (조각마다 다른 category는 다시 통합)"""
+        chunks = [chunk for chunk in chunks if not chunk.empty]
+        if not chunks:
+            print("⚠️ 조회된 실현손익 내역이 없습니다.")
+            return pd.DataFrame()
+        
+        df = pd.concat(chunks, ignore_index=True)
+        for name, kind in KA10073_SCHEMA.values():
+            if kind in ('category', 'code') and name in df.columns:
+                df[name] = df[name].astype('category')
+        if '날짜' in df.columns:
+            df = df.sort_values('날짜', kind='stable', ignore_index=True)
+        
+        print(f"✅ {len(df)}건의 실현손익 내역 조회 완료")
+        return df
+    
+    def _print_rate_stats(self):
+        """요청 제한기 통계 출력"""
+        stats = self.rate_limiter.stats()
+        print(f"📶 유효 요청 속도: {stats['유효_속도']:.2f} req/s "
+              f"(현재 허용 {stats['현재_속도']:.2f} req/s, 제한 응답 {stats['제한_응답수']}회)")
+    
+    def _request_ka10073(self, strt_dt, end_dt):
+        """
+        ka10073 구간 조회 (연속조회 포함, 전체 페이지를 모아서 반환)
+        
+        Args:
+            strt_dt: 시작일자 (YYYYMMDD)
+            end_dt: 종료일자 (YYYYMMDD)
+            
+        Returns:
+            tuple: (응답 레코드 리스트, 요청한 페이지 수), 실패 시 레코드는 None
+        """
+        all_data = []
+        pages = 0
+        
+        try:
+            for records in self._iter_ka10073_pages(strt_dt, end_dt):
+                pages += 1
+                all_data.extend(records)
+        except RuntimeError:
+            return None, pages + 1
+        
+        return all_data, pages
+    
+    def _iter_ka10073_pages(self, strt_dt, end_dt):
+        """
+        ka10073 구간 조회 (연속조회 페이지를 받는 대로 반환)
+        
+        Args:
+            strt_dt: 시작일자 (YYYYMMDD)
+            end_dt: 종료일자 (YYYYMMDD)
             
-            # ka10073 Response Key Mapping
-            'buy_uv': '매수평균가',   # 매수단가
-            'cntr_pric': '매도평균가', # 체결가(매도단가)
-            'cntr_qty': '매도수량',    # 체결량
-            'tdy_sel_pl': '실현손익',
-            'pl_rt': '수익률',
-            'tdy_trde_cmsn': '수수료',
-            'tdy_trde_tax': '제세금'
-            # 매수수량, 매수금액, 매도금액은 계산 필요
+        Yields:
+            list: 페이지 하나의 응답 레코드 리스트
+            
+        Raises:
+            RuntimeError: API 요청 실패
+        """
+        if strt_dt == end_dt:
+            print(f"📥 실현손익 조회 중... (기준일: {strt_dt})")
+        else:
+            print(f"📥 실현손익 조회 중... (기간: {strt_dt} ~ {end_dt})")
+        
+        url = f"{self.base_url}/api/dostk/acnt"
+        
+        headers = {
+            "Content-Type": "application/json;charset=UTF-8",
+            "api-id": "ka10073",
+            "authorization": f"Bearer {self.access_token}"
+        }
+        
+        # ka10073 파라미터 (기간 조회)
+        body = {
+            "acnt_no": self.account_number,
+            "strt_dt": strt_dt,
+            "end_dt": end_dt,
+            "sll_buy_dvsn_cd": "0", # 0:전체
+            "inqr_dvsn": "0",       # 0:일별
+            "stk_cd": ""            # 전체 종목
         }
         
+        # 연속조회 처리
+        cont_yn = ""
+        next_key = ""
+        
+        while True:
+            # 연속조회 헤더 추가
+            if cont_yn == "Y":
+                headers["cont-yn"] = cont_yn
+                headers["next-key"] = next_key
+            
+            response = self._post(url, body, headers)
+            
+            if response.status_code != 200:
+                print(f"❌ API 요청 실패: {response.status_code}")
+                print(f"응답: {response.text}")
+                raise RuntimeError(f"ka10073 조회 실패 ({strt_dt} ~ {end_dt}, HTTP {response.status_code})")
+            
+            data = response.json()
+            
+            if "dt_stk_rlzt_pl" not in data:
+                if "msg_cd" in data and data["msg_cd"] != "OPW00001":
+                     print(f"ℹ️ 데이터가 없거나 다른 응답 형식 (ka10073): {data}")
+                return
+            
+            metrics.KIWOOM_PAGES.inc()
+            yield data["dt_stk_rlzt_pl"] or []
+            
+            cont_yn = response.headers.get("cont-yn", "")
+            next_key = response.headers.get("next-key", "")
+            
+            if cont_yn != "Y":
+                return
+    
+    def _clean_dataframe(self, df):
+        """데이터프레임 정리 및 컬럼명 표준화 (KA10073_SCHEMA 기준 일괄 변환)"""
+        started = time.perf_counter()
+        
         # 존재하는 컬럼만 선택
-        available_columns = [col for col in column_mapping.keys() if col in df.columns]
+        available_columns = [col for col in KA10073_SCHEMA if col in df.columns]
         
         if not available_columns:
             print("⚠️ 예상된 컬럼을 찾을 수 없습니다. 원본 데이터를 반환합니다.")
             print(f"실제 컬럼: {df.columns.tolist()}")
             return df
         
-        df = df[available_columns].copy()
-        df.rename(columns=column_mapping, inplace=True)
+        columns = {}
         
-        # 데이터 타입 변환
-        if '날짜' in df.columns:
-            df['날짜'] = pd.to_datetime(df['날짜'], format='%Y%m%d', errors='coerce')
+        # 숫자 컬럼: 모든 컬럼을 한 줄로 이어 붙여 콤마/부호/% 제거와 숫자 변환을 한 번에 처리
+        numeric_fields = [col for col in available_columns if KA10073_SCHEMA[col][1] in ('int', 'rate')]
+        if numeric_fields:
+            flat = pd.Series(np.concatenate([df[col].to_numpy(dtype=object) for col in numeric_fields]),
+                             dtype=object).astype(str).str.strip()
+            for token in (',', '+', '%'):
+                flat = flat.str.replace(token, '', regex=False)
+            values = pd.to_numeric(flat, errors='coerce').to_numpy(dtype='float64')
+            values = values.reshape(len(df), len(numeric_fields), order='F')
+            
+            for i, col in enumerate(numeric_fields):
+                name, kind = KA10073_SCHEMA[col]
+                if kind == 'int':
+                    columns[name] = pd.Series(values[:, i]).round().astype('Int64')
+                else:
+                    columns[name] = pd.Series(values[:, i])
         
-        # 숫자 변환 (콤마 제거 포함)
-        numeric_cols = ['매수평균가', '매도평균가', '매도수량', '실현손익', '수수료', '제세금']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace(',', '').apply(pd.to_numeric, errors='coerce')
-
-        # 수익률 처리
-        if '수익률' in df.columns:
-            df['수익률'] = df['수익률'].astype(str).str.replace('+', '').str.replace('%', '')
-            df['수익률'] = pd.to_numeric(df['수익률'], errors='coerce')
+        for col in available_columns:
+            name, kind = KA10073_SCHEMA[col]
+            series = df[col].reset_index(drop=True)
+            if kind == 'date':
+                columns[name] = pd.to_datetime(series, format='%Y%m%d', errors='coerce')
+            elif kind == 'code':
+                # A005930 형식에서 앞의 'A' 제거
+                columns[name] = series.fillna('').astype(str).str.removeprefix('A').astype('category')
+            elif kind == 'category':
+                columns[name] = series.fillna('').astype(str).astype('category')
+        
+        # 스키마 순서대로 컬럼 배치
+        df = pd.DataFrame({KA10073_SCHEMA[col][0]: columns[KA10073_SCHEMA[col][0]] for col in available_columns})
             
         # 파생 컬럼 계산
         if '매도수량' in df.columns:
-             df['매수수량'] = df['매도수량'] # 실현손익이므로 매수량=매도량
+            df['매수수량'] = df['매도수량'] # 실현손익이므로 매수량=매도량
              
-             if '매수평균가' in df.columns:
-                 df['매수금액'] = df['매수평균가'] * df['매수수량']
+            if '매수평균가' in df.columns:
+                df['매수금액'] = df['매수평균가'] * df['매수수량']
              
-             if '매도평균가' in df.columns:
-                 df['매도금액'] = df['매도평균가'] * df['매도수량']
+            if '매도평균가' in df.columns:
+                df['매도금액'] = df['매도평균가'] * df['매도수량']
                  
         if '수수료' in df.columns and '제세금' in df.columns:
             df['수수료_제세금'] = df['수수료'].fillna(0) + df['제세금'].fillna(0)
             
-        return df
-        
-        if '수익률' in df.columns:
-            # +61.28 형식에서 숫자만 추출
-            df['수익률'] = df['수익률'].astype(str).str.replace('+', '').str.replace('%', '')
-            df['수익률'] = pd.to_numeric(df['수익률'], errors='coerce')
-        
-        if '종목코드' in df.columns:
-            df['종목코드'] = df['종목코드'].astype(str).str.replace('A', '', regex=False)
-            
         # 매도수량이 0이거나 없는 데이터(순수 매수 내역) 필터링
         # 실현손익은 '매도'가 발생했을 때만 의미가 있음
         if '매도수량' in df.columns:
-            df = df[df['매도수량'] > 0].copy()
-            
+            df = df[(df['매도수량'] > 0).fillna(False)].reset_index(drop=True)
+        
+        metrics.KIWOOM_PARSE_SECONDS.observe(time.perf_counter() - started)
+        metrics.KIWOOM_ROWS_PARSED.inc(len(df))
         return df
     
     def get_sample_data(self):
@@ -327,10 +765,9 @@ def main():
             print("💡 config.py에 설정하거나 --app-key, --app-secret 옵션을 사용하세요.")
             return
         
-        print("\n🔐 키움 REST API 인증 중...")
         collector = KiwoomRestCollector(args.app_key, args.app_secret, args.account)
         
-        if not collector.authenticate():
+        if not collector._check_token_validity():
             print("❌ 인증 실패. 프로그램을 종료합니다.")
             return
         
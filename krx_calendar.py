@@ -0,0 +1,176 @@
+"""
+한국거래소(KRX) 거래일 달력 모듈
+
+주말과 거래소 휴장일에는 실현손익이 발생하지 않으므로
+수집기가 해당 날짜를 키움 API에 조회하지 않도록 거래일 여부를 제공합니다.
+
+휴장일 표는 확실한 날짜만 포함합니다.
+휴장일이 빠지면 빈 조회가 한 번 더 생길 뿐이지만,
+거래일을 휴장일로 잘못 넣으면 그날의 데이터가 누락되기 때문입니다.
+표 범위 밖의 날짜는 주말만 제외합니다.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+# KRX 휴장일 (주말 제외, 연말 휴장일 포함)
+KRX_HOLIDAYS = frozenset([
+    # 2022
+    "20220131", "20220201", "20220202",  # 설날
+    "20220301",                          # 삼일절
+    "20220309",                          # 대통령 선거
+    "20220505",                          # 어린이날
+    "20220601",                          # 지방 선거
+    "20220606",                          # 현충일
+    "20220815",                          # 광복절
+    "20220909", "20220912",              # 추석, 대체공휴일
+    "20221003",                          # 개천절
+    "20221010",                          # 한글날 대체공휴일
+    "20221230",                          # 연말 휴장일
+    # 2023
+    "20230123", "20230124",              # 설날, 대체공휴일
+    "20230301",                          # 삼일절
+    "20230501",                          # 근로자의 날
+    "20230505",                          # 어린이날
+    "20230529",                          # 부처님오신날 대체공휴일
+    "20230606",                          # 현충일
+    "20230815",                          # 광복절
+    "20230928", "20230929",              # 추석
+    "20231002",                          # 임시공휴일
+    "20231003",                          # 개천절
+    "20231009",                          # 한글날
+    "20231225",                          # 성탄절
+    "20231229",                          # 연말 휴장일
+    # 2024
+    "20240101",                          # 신정
+    "20240209", "20240212",              # 설날, 대체공휴일
+    "20240301",                          # 삼일절
+    "20240410",                          # 국회의원 선거
+    "20240501",                          # 근로자의 날
+    "20240506",                          # 어린이날 대체공휴일
+    "20240515",                          # 부처님오신날
+    "20240606",                          # 현충일
+    "20240815",                          # 광복절
+    "20240916", "20240917", "20240918",  # 추석
+    "20241001",                          # 국군의 날 임시공휴일
+    "20241003",                          # 개천절
+    "20241009",                          # 한글날
+    "20241225",                          # 성탄절
+    "20241231",                          # 연말 휴장일
+    # 2025
+    "20250101",                          # 신정
+    "20250127",                          # 임시공휴일
+    "20250128", "20250129", "20250130",  # 설날
+    "20250303",                          # 삼일절 대체공휴일
+    "20250501",                          # 근로자의 날
+    "20250505",                          # 어린이날, 부처님오신날
+    "20250506",                          # 대체공휴일
+    "20250603",                          # 대통령 선거
+    "20250606",                          # 현충일
+    "20250815",                          # 광복절
+    "20251003",                          # 개천절
+    "20251006", "20251007", "20251008",  # 추석, 대체공휴일
+    "20251009",                          # 한글날
+    "20251225",                          # 성탄절
+    "20251231",                          # 연말 휴장일
+    # 2026
+    "20260101",                          # 신정
+    "20260216", "20260217", "20260218",  # 설날
+    "20260302",                          # 삼일절 대체공휴일
+    "20260501",                          # 근로자의 날
+    "20260505",                          # 어린이날
+    "20260525",                          # 부처님오신날 대체공휴일
+    "20260603",                          # 지방 선거
+    "20260817",                          # 광복절 대체공휴일
+    "20260924", "20260925",              # 추석
+    "20261005",                          # 개천절 대체공휴일
+    "20261009",                          # 한글날
+    "20261225",                          # 성탄절
+    "20261231",                          # 연말 휴장일
+])
+
+# 휴장일 표가 적용되는 기간
+CALENDAR_START = date(2022, 1, 1)
+CALENDAR_END = date(2026, 12, 31)
+
+
+def _to_date(day):
+    """YYYYMMDD 문자열, date, datetime, Timestamp를 date로 변환"""
+    if isinstance(day, str):
+        return datetime.strptime(day, "%Y%m%d").date()
+    if isinstance(day, datetime):
+        return day.date()
+    return day
+
+
+def _build_trading_days():
+    """표 범위 안의 전체 거래일 목록 (YYYYMMDD, 오름차순)"""
+    days = []
+    current = CALENDAR_START
+    while current <= CALENDAR_END:
+        day_str = current.strftime("%Y%m%d")
+        if current.weekday() < 5 and day_str not in KRX_HOLIDAYS:
+            days.append(day_str)
+        current += timedelta(days=1)
+    return tuple(days)
+
+
+# 모듈 로드 시 한 번만 계산
+_TRADING_DAYS = _build_trading_days()
+_TRADING_DAY_SET = frozenset(_TRADING_DAYS)
+
+
+def is_trading_day(day):
+    """
+    거래일 여부
+
+    Args:
+        day: 날짜 (YYYYMMDD 문자열, date, datetime)
+
+    Returns:
+        bool: 거래일이면 True
+    """
+    day = _to_date(day)
+    if CALENDAR_START <= day <= CALENDAR_END:
+        return day.strftime("%Y%m%d") in _TRADING_DAY_SET
+    return day.weekday() < 5
+
+
+def trading_days(start, end):
+    """
+    기간 내 거래일 목록
+
+    Args:
+        start: 시작일 (YYYYMMDD 문자열, date, datetime)
+        end: 종료일 (YYYYMMDD 문자열, date, datetime)
+
+    Returns:
+        list: 거래일 목록 (YYYYMMDD 문자열, 오름차순)
+    """
+    start = _to_date(start)
+    end = _to_date(end)
+    if start > end:
+        return []
+
+    days = []
+
+    # 표 범위 이전 구간: 주말만 제외
+    current = start
+    while current <= end and current < CALENDAR_START:
+        if current.weekday() < 5:
+            days.append(current.strftime("%Y%m%d"))
+        current += timedelta(days=1)
+
+    # 표 범위 구간: 미리 계산된 목록에서 이진 탐색
+    lo = bisect_left(_TRADING_DAYS, max(start, CALENDAR_START).strftime("%Y%m%d"))
+    hi = bisect_right(_TRADING_DAYS, min(end, CALENDAR_END).strftime("%Y%m%d"))
+    days.extend(_TRADING_DAYS[lo:hi])
+
+    # 표 범위 이후 구간: 주말만 제외
+    current = max(start, CALENDAR_END + timedelta(days=1))
+    while current <= end:
+        if current.weekday() < 5:
+            days.append(current.strftime("%Y%m%d"))
+        current += timedelta(days=1)
+
+    return days
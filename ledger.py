@@ -0,0 +1,287 @@
+"""
+실현손익 원장 (SQLite)
+
+수집한 실현손익의 기준 사본을 로컬 SQLite 파일에 보관합니다.
+구글 시트는 이 원장을 옮겨 적는 사본이 되며, 시트에 쓰기 전에
+시트에만 있는 거래(다른 원장을 쓰는 대시보드/파이프라인이 추가한 행)를 먼저 합칩니다.
+
+- 스키마는 KiwoomRestCollector._clean_dataframe 결과 컬럼과 동일
+- 거래 고유 키: (날짜, 종목코드, 매도평균가, 매도수량, 순번)
+  순번은 같은 날 같은 가격/수량으로 여러 번 체결된 건을 구분하는 번호
+- WAL 모드 (대시보드가 읽는 동안 파이프라인이 쓸 수 있음)
+- executemany 일괄 쓰기, 거래 키가 같은 행만 교체 (새 행 수에 비례하는 비용)
+- 하루 전체를 다시 조회한 날짜는 그 날짜의 기존 행을 지우고 교체하며 수집 완료 날짜로 기록
+  (정정되거나 취소된 거래가 남지 않고, 시트의 옛 행도 다시 합치지 않음)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+import metrics
+from trade_index import NATURAL_KEY, assign_sequence, normalize_codes
+try:
+    from config import LEDGER_FILE
+except ImportError:
+    LEDGER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ledger.sqlite3")
+
+# 컬럼명 → SQLite 타입 (_clean_dataframe 결과 순서)
+LEDGER_COLUMNS = {
+    '날짜': 'TEXT NOT NULL',         # YYYY-MM-DD
+    '종목명': 'TEXT',
+    '종목코드': 'TEXT NOT NULL',
+    '매수평균가': 'INTEGER',
+    '매도평균가': 'INTEGER NOT NULL',
+    '매도수량': 'INTEGER NOT NULL',
+    '실현손익': 'INTEGER',
+    '수익률': 'REAL',
+    '수수료': 'INTEGER',
+    '제세금': 'INTEGER',
+    '매수수량': 'INTEGER',
+    '매수금액': 'INTEGER',
+    '매도금액': 'INTEGER',
+    '수수료_제세금': 'INTEGER',
+    '순번': 'INTEGER NOT NULL',
+}
+
+_INT_COLUMNS = [name for name, sql_type in LEDGER_COLUMNS.items() if sql_type.startswith('INTEGER')]
+_REQUIRED_COLUMNS = [name for name, sql_type in LEDGER_COLUMNS.items() if sql_type.endswith('NOT NULL')]
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _day_strings(dates):
+    """날짜 목록(YYYYMMDD 문자열, date, Timestamp 등)을 원장 형식(YYYY-MM-DD) 문자열 목록으로 변환"""
+    return pd.to_datetime(pd.Index(list(dates))).strftime('%Y-%m-%d').unique().tolist()
+
+
+def _rows(df):
+    """executemany용 행 튜플 (NaN/NA는 SQL NULL)"""
+    values = df.astype(object)
+    return list(values.where(values.notna(), None).itertuples(index=False, name=None))
+
+
+class TradeLedger:
+    """SQLite 실현손익 원장"""
+
+    def __init__(self, path=LEDGER_FILE):
+        """
+        초기화
+
+        Args:
+            path: SQLite 파일 경로
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ",\n    ".join(f"{_quote(name)} {sql_type}" for name, sql_type in LEDGER_COLUMNS.items())
+        key = ", ".join(_quote(name) for name in NATURAL_KEY)
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS trades (
+                    {columns},
+                    PRIMARY KEY ({key})
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_trades_date ON trades ("날짜")')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_trades_code ON trades ("종목코드", "날짜")')
+            # 하루 전체를 조회해 저장한 날짜 (이 날짜는 원장이 기준, 시트의 행을 합치지 않음)
+            self.conn.execute('CREATE TABLE IF NOT EXISTS fetched_dates ("날짜" TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def close(self):
+        """연결 종료"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _normalize(df):
+        """원장 스키마에 맞게 변환 (시트에서 읽은 데이터처럼 타입이 섞인 경우 포함)"""
+        df = df.copy()
+        df['날짜'] = pd.to_datetime(df['날짜']).dt.strftime('%Y-%m-%d')
+
+        # 시트에서 읽으면 005930이 5930(숫자)이 되므로 6자리로 복원
+        df['종목코드'] = normalize_codes(df['종목코드'])
+
+        # 거래 키 컬럼은 NOT NULL이므로 0으로 채우고, 나머지 값이 없는 칸은 NULL로 저장
+        for col in _INT_COLUMNS:
+            if col in df.columns and col != '순번':
+                values = pd.to_numeric(df[col], errors='coerce').round()
+                if col in _REQUIRED_COLUMNS:
+                    df[col] = values.fillna(0).astype('int64')
+                else:
+                    df[col] = values.astype('Int64')
+        if '수익률' in df.columns:
+            df['수익률'] = pd.to_numeric(df['수익률'], errors='coerce').astype('float64')
+        if '종목명' in df.columns:
+            df['종목명'] = df['종목명'].astype(object).where(df['종목명'].notna(), '')
+
+        if '순번' not in df.columns:
+            df = assign_sequence(df)
+
+        return df[[col for col in LEDGER_COLUMNS if col in df.columns]]
+
+    def upsert(self, df, replace_dates=False):
+        """
+        실현손익 Upsert
+
+        Args:
+            df: 실현손익 DataFrame (_clean_dataframe 결과 또는 시트에서 읽은 데이터)
+            replace_dates: False면 거래 키가 같은 행만 교체 (하루 중 일부만 다시 조회해도 안전),
+                           True면 df에 포함된 날짜, 날짜 목록이면 그 날짜(df에 행이 없는 날짜 포함)의
+                           기존 행을 모두 지우고 새로 저장 (하루 전체를 다시 조회한 경우, 수집 완료 날짜로 기록)
+
+        Returns:
+            int: 저장한 행 수
+        """
+        has_rows = df is not None and not df.empty
+        if replace_dates is True:
+            replace_dates = df['날짜'] if has_rows else ()
+        days = [] if replace_dates is False else _day_strings(replace_dates)
+        if not has_rows and not days:
+            return 0
+
+        started = time.perf_counter()
+        rows = []
+        if has_rows:
+            df = self._normalize(df)
+            columns = list(df.columns)
+            placeholders = ", ".join("?" for _ in columns)
+            sql = (f"INSERT OR REPLACE INTO trades ({', '.join(_quote(col) for col in columns)}) "
+                   f"VALUES ({placeholders})")
+            rows = _rows(df)
+
+        with self._lock, self.conn:
+            if days:
+                self.conn.executemany('DELETE FROM trades WHERE "날짜" = ?', [(day,) for day in days])
+                self.conn.executemany('INSERT OR IGNORE INTO fetched_dates VALUES (?)', [(day,) for day in days])
+            if rows:
+                self.conn.executemany(sql, rows)
+
+        metrics.LEDGER_SECONDS.observe(time.perf_counter() - started, operation="upsert")
+        metrics.LEDGER_ROWS.inc(len(rows), operation="upsert")
+        return len(rows)
+
+    def insert_missing(self, df):
+        """
+        원장에 없는 거래 키의 행만 추가 (이미 있는 행은 교체하지 않음)
+
+        Args:
+            df: 실현손익 DataFrame (시트에서 읽은 데이터 등)
+
+        Returns:
+            int: 추가한 행 수
+        """
+        if df is None or df.empty:
+            return 0
+
+        started = time.perf_counter()
+        df = self._normalize(df)
+        columns = list(df.columns)
+        placeholders = ", ".join("?" for _ in columns)
+        sql = (f"INSERT OR IGNORE INTO trades ({', '.join(_quote(col) for col in columns)}) "
+               f"VALUES ({placeholders})")
+
+        rows = _rows(df)
+
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(sql, rows)
+            added = self.conn.total_changes - before
+
+        metrics.LEDGER_SECONDS.observe(time.perf_counter() - started, operation="insert_missing")
+        metrics.LEDGER_ROWS.inc(added, operation="insert_missing")
+        return added
+
+    def read(self, start_date=None, end_date=None, columns=None, stock_code=None):
+        """
+        원장 조회
+
+        Args:
+            start_date: 시작일 (포함, None이면 처음부터)
+            end_date: 종료일 (포함, None이면 끝까지)
+            columns: 조회할 컬럼 (None이면 순번을 제외한 전체)
+            stock_code: 종목코드 (None이면 전체)
+
+        Returns:
+            DataFrame: 날짜순으로 정렬된 데이터
+        """
+        started = time.perf_counter()
+        columns = list(columns or [col for col in LEDGER_COLUMNS if col != '순번'])
+
+        conditions = []
+        params = []
+        if start_date is not None:
+            conditions.append('"날짜" >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            conditions.append('"날짜" <= ?')
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        if stock_code is not None:
+            conditions.append('"종목코드" = ?')
+            params.append(stock_code)
+
+        sql = f"SELECT {', '.join(_quote(col) for col in columns)} FROM trades"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += ' ORDER BY "날짜", "종목코드", "순번"'
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        for col in _INT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('Int64')
+        if '날짜' in df.columns:
+            df['날짜'] = pd.to_datetime(df['날짜'], format='%Y-%m-%d')
+        for col in ('종목명', '종목코드'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+
+        metrics.LEDGER_SECONDS.observe(time.perf_counter() - started, operation="read")
+        metrics.LEDGER_ROWS.inc(len(df), operation="read")
+        return df
+
+    def fetched_dates(self):
+        """
+        하루 전체를 조회해 저장한 날짜 (upsert의 replace_dates 참고)
+
+        Returns:
+            set: YYYY-MM-DD 문자열 집합
+        """
+        with self._lock:
+            return {row[0] for row in self.conn.execute('SELECT "날짜" FROM fetched_dates')}
+
+    def count(self):
+        """저장된 행 수"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def is_empty(self):
+        """저장된 행이 없으면 True"""
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone() is None
+
+    def last_date(self):
+        """
+        저장된 마지막 날짜
+
+        Returns:
+            Timestamp: 마지막 날짜 (데이터가 없으면 None)
+        """
+        with self._lock:
+            value = self.conn.execute('SELECT MAX("날짜") FROM trades').fetchone()[0]
+        return pd.Timestamp(value) if value else None
@@ -0,0 +1,131 @@
+"""
+키움 수집기 부하 테스트
+
+로컬 모의 서버(mock_kiwoom_server.py)를 띄운 뒤 순차 수집기와 비동기 수집기로
+같은 기간을 조회하여 초당 요청 수, 응답 지연(p50/p99), 초당 처리 레코드 수를 비교합니다.
+
+사용법:
+    python load_test.py --start-date 20240101 --end-date 20241231 --trades-per-day 50
+    python load_test.py --latency-ms 30 --throttle-rate 0.05 --concurrency 8
+    python load_test.py --url http://127.0.0.1:8080  # 이미 실행 중인 모의 서버 사용
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from http_pool import PooledSession
+from kiwoom_async_collector import AsyncKiwoomCollector
+from kiwoom_collector import KiwoomRestCollector
+from mock_kiwoom_server import MockKiwoomServer
+from rate_limiter import AdaptiveRateLimiter
+from token_store import TokenStore
+
+
+def _run_mode(name, collector_cls, base_url, args, **kwargs):
+    """수집기 하나로 전체 기간을 조회하고 측정 결과 반환"""
+    latencies = []
+    session = PooledSession(pool_maxsize=max(8, args.concurrency))
+
+    # 응답마다 서버 응답 시간 기록 (요청 전송 ~ 응답 헤더 수신)
+    session.hooks["response"].append(lambda response, *a, **kw: latencies.append(response.elapsed.total_seconds()))
+
+    rate_limiter = AdaptiveRateLimiter(rate=args.rate, burst=max(2, args.concurrency),
+                                       max_rate=args.rate, min_rate=min(0.5, args.rate))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        collector = collector_cls(
+            "load-test", "load-test", "0000000000", session=session, rate_limiter=rate_limiter,
+            token_store=TokenStore(os.path.join(tmp, "token.json")), response_cache=False,
+            base_url=base_url, **kwargs
+        )
+
+        started = time.perf_counter()
+        df = collector.get_realized_profit_range(args.start_date, args.end_date)
+        elapsed = time.perf_counter() - started
+
+    session.close()
+
+    rows = 0 if df is None else len(df)
+    latency_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        '모드': name,
+        '성공': df is not None,
+        '요청수': len(latencies),
+        '레코드수': rows,
+        '소요시간': elapsed,
+        '초당_요청수': len(latencies) / elapsed,
+        '초당_레코드수': rows / elapsed,
+        'p50_ms': float(np.percentile(latency_ms, 50)),
+        'p99_ms': float(np.percentile(latency_ms, 99)),
+        '제한_응답수': rate_limiter.stats()['제한_응답수'],
+    }
+
+
+def print_report(results):
+    """측정 결과 표 출력"""
+    print(f"\n{'='*88}")
+    print(f"{'모드':<16}{'요청':>8}{'레코드':>10}{'시간(s)':>10}{'req/s':>10}"
+          f"{'rows/s':>12}{'p50(ms)':>10}{'p99(ms)':>10}")
+    print(f"{'-'*88}")
+    for r in results:
+        status = "" if r['성공'] else " ❌"
+        print(f"{r['모드'] + status:<16}{r['요청수']:>8,}{r['레코드수']:>10,}{r['소요시간']:>10.2f}"
+              f"{r['초당_요청수']:>10.1f}{r['초당_레코드수']:>12,.0f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    print(f"{'='*88}")
+    for r in results:
+        if r['제한_응답수']:
+            print(f"⏳ {r['모드']}: 요청 제한 응답 {r['제한_응답수']}회")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='키움 수집기 부하 테스트 (로컬 모의 서버)')
+    parser.add_argument('--url', type=str, default=None, help='모의 서버 주소 (기본: 내장 서버 실행)')
+    parser.add_argument('--start-date', type=str, default='20240101', help='조회 시작일 (YYYYMMDD)')
+    parser.add_argument('--end-date', type=str, default='20241231', help='조회 종료일 (YYYYMMDD)')
+    parser.add_argument('--mode', choices=['sequential', 'async', 'both'], default='both', help='측정할 수집 방식')
+    parser.add_argument('--concurrency', type=int, default=4, help='비동기 수집 동시 구간 수')
+    parser.add_argument('--rate', type=float, default=200.0, help='수집기 요청 제한 (초당 요청 수)')
+    parser.add_argument('--page-size', type=int, default=20, help='ka10073 페이지당 레코드 수')
+    parser.add_argument('--trades-per-day', type=int, default=20, help='거래일당 체결 건수')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='서버 응답 지연 (밀리초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='서버 500 오류 확률 (0~1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='서버 429 응답 확률 (0~1)')
+    parser.add_argument('--max-rps', type=float, default=None, help='서버 초당 허용 요청 수')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = MockKiwoomServer(
+            page_size=args.page_size, trades_per_day=args.trades_per_day,
+            latency_ms=args.latency_ms, error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate, max_rps=args.max_rps
+        ).start()
+        base_url = server.url
+        print(f"🧪 모의 서버 실행: {base_url}")
+
+    results = []
+    try:
+        if args.mode in ('sequential', 'both'):
+            results.append(_run_mode("순차", KiwoomRestCollector, base_url, args))
+        if args.mode in ('async', 'both'):
+            results.append(_run_mode(
+                f"비동기 x{args.concurrency}", AsyncKiwoomCollector, base_url, args,
+                concurrency=args.concurrency
+            ))
+    finally:
+        if server:
+            server.stop()
+
+    print_report(results)
+    if server:
+        print(f"📊 서버 통계: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
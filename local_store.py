@@ -0,0 +1,271 @@
+"""
+실현손익 로컬 저장소 (연/월 단위로 나눈 Parquet 파일)
+
+수집한 데이터를 data_store/year=YYYY/month=MM/part.parquet 형태로 누적 저장합니다.
+- 파티션 단위 원자적 교체 (쓰다 만 파일을 읽지 않음)
+- 거래 고유 키(또는 지정한 컬럼) 기준 Upsert (trade_index.py)
+- 기간/컬럼을 지정하면 해당 파티션과 컬럼만 읽음 (Parquet 통계 기반 행 그룹 필터링)
+
+구글 시트를 거치지 않고 전체 이력을 빠르게 불러올 수 있어
+파이프라인과 대시보드가 함께 사용합니다.
+"""
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from file_lock import FileLock, atomic_write
+from trade_index import TradeIndex, has_trade_key, trade_keys
+try:
+    from config import LOCAL_STORE_DIR
+except ImportError:
+    LOCAL_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_store")
+
+
+class LocalStore:
+    """연/월 파티션 Parquet 저장소"""
+
+    def __init__(self, root=LOCAL_STORE_DIR, date_column='날짜'):
+        """
+        초기화
+
+        Args:
+            root: 저장소 디렉터리
+            date_column: 파티션 기준 날짜 컬럼
+        """
+        self.root = root
+        self.date_column = date_column
+        self.lock = FileLock(os.path.join(root, ".lock"))
+
+    def _partition_path(self, year, month):
+        return os.path.join(self.root, f"year={year:04d}", f"month={month:02d}", "part.parquet")
+
+    def partitions(self):
+        """
+        저장된 파티션 목록
+
+        Returns:
+            list: (연, 월) 튜플 리스트 (오름차순)
+        """
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+
+        for year_dir in os.listdir(self.root):
+            if not year_dir.startswith("year="):
+                continue
+            for month_dir in os.listdir(os.path.join(self.root, year_dir)):
+                path = os.path.join(self.root, year_dir, month_dir, "part.parquet")
+                if month_dir.startswith("month=") and os.path.exists(path):
+                    result.append((int(year_dir[5:]), int(month_dir[6:])))
+        return sorted(result)
+
+    def _read_partition(self, year, month, columns=None, filters=None):
+        """파티션 하나 읽기 (없으면 None)"""
+        path = self._partition_path(year, month)
+        try:
+            table = pq.read_table(path, columns=columns, filters=filters)
+        except FileNotFoundError:
+            return None
+        return table.to_pandas()
+
+    def _write_partition(self, year, month, df):
+        """파티션 하나를 원자적으로 교체 (빈 DataFrame이면 삭제)"""
+        path = self._partition_path(year, month)
+        if df.empty:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression="zstd")
+        atomic_write(path, sink.getvalue().to_pybytes(), mode=0o644)
+
+    def _split_by_month(self, df):
+        """DataFrame을 (연, 월) 파티션별로 나누기 (date_column은 datetime이어야 함)"""
+        dates = df[self.date_column]
+        return df.groupby([dates.dt.year, dates.dt.month], sort=True)
+
+    def upsert(self, df, key_column=None):
+        """
+        키 기준 Upsert
+
+        Args:
+            df: 저장할 DataFrame (date_column 필수)
+            key_column: None이면 거래 고유 키가 같은 행만 교체 (거래 키 컬럼이 없으면 날짜 기준),
+                        컬럼명을 지정하면 그 값이 같은 기존 행을 모두 교체 (예: '날짜' → 해당 날짜 전체 교체)
+
+        Returns:
+            int: 저장한 행 수
+        """
+        return self.open_writer(key_column).write(df)
+
+    def append(self, df):
+        """
+        중복 확인 없이 행 추가
+
+        Returns:
+            int: 저장한 행 수
+        """
+        return _UpsertWriter(self, key_column=None, append_only=True).write(df)
+
+    def open_writer(self, key_column=None):
+        """
+        여러 조각을 차례로 Upsert하는 쓰기 세션
+
+        같은 날짜의 행이 여러 조각(페이지)에 나뉘어 도착해도, 세션 안에서
+        거래 순번을 이어서 매기고 (거래 키 기준), 이미 교체한 키는 다시 지우지 않습니다 (컬럼 기준).
+
+        Args:
+            key_column: 교체 기준 (upsert 참고)
+        """
+        return _UpsertWriter(self, key_column)
+
+    def read(self, start_date=None, end_date=None, columns=None, filters=None):
+        """
+        데이터 읽기
+
+        Args:
+            start_date: 시작일 (포함, YYYYMMDD/날짜, None이면 처음부터)
+            end_date: 종료일 (포함, None이면 끝까지)
+            columns: 읽을 컬럼 목록 (None이면 전체)
+            filters: 추가 조건 (pyarrow filters 형식, 예: [('종목코드', '==', '005930')])
+
+        Returns:
+            DataFrame: 날짜순으로 정렬된 데이터 (저장된 데이터가 없으면 빈 DataFrame)
+        """
+        start = pd.Timestamp(start_date) if start_date is not None else None
+        end = pd.Timestamp(end_date) if end_date is not None else None
+
+        predicates = list(filters or [])
+        if start is not None:
+            predicates.append((self.date_column, ">=", start))
+        if end is not None:
+            predicates.append((self.date_column, "<", end.normalize() + pd.Timedelta(days=1)))
+
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys([self.date_column, *columns]))
+
+        # 기간 밖의 파티션은 열지 않음
+        paths = [
+            self._partition_path(year, month) for year, month in self.partitions()
+            if (start is None or (year, month) >= (start.year, start.month))
+            and (end is None or (year, month) <= (end.year, end.month))
+        ]
+        if not paths:
+            return pd.DataFrame()
+
+        # 파티션마다 컬럼 구성이 달라도 읽을 수 있도록 스키마 통합
+        schema = pa.unify_schemas([pq.read_schema(path) for path in paths])
+        dataset = ds.dataset(paths, schema=schema, format="parquet")
+        expression = pq.filters_to_expression(predicates) if predicates else None
+        df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+
+        for col in ('종목명', '종목코드'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+
+        df = df.sort_values(self.date_column, kind='stable', ignore_index=True)
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    def revision(self):
+        """
+        저장소 리비전 (파티션 목록과 파일 수정 시각, 데이터를 읽지 않고 확인)
+
+        Returns:
+            tuple: 파티션별 (연, 월, 수정 시각 ns, 크기) 튜플
+        """
+        result = []
+        for year, month in self.partitions():
+            try:
+                stat = os.stat(self._partition_path(year, month))
+            except FileNotFoundError:
+                continue
+            result.append((year, month, stat.st_mtime_ns, stat.st_size))
+        return tuple(result)
+
+    def last_date(self):
+        """
+        저장된 마지막 날짜
+
+        Returns:
+            Timestamp: 마지막 날짜 (데이터가 없으면 None)
+        """
+        for year, month in reversed(self.partitions()):
+            part = self._read_partition(year, month, columns=[self.date_column])
+            if part is not None and not part.empty:
+                return part[self.date_column].max()
+        return None
+
+
+class _UpsertWriter:
+    """LocalStore 쓰기 세션 (open_writer 참고)"""
+
+    def __init__(self, store, key_column, append_only=False):
+        self.store = store
+        self.key_column = key_column
+        self.append_only = append_only
+        self._replaced = set()
+        self._sequence_offsets = {}
+
+    def write(self, df):
+        """
+        조각 하나 저장
+
+        Returns:
+            int: 저장한 행 수
+        """
+        if df is None or df.empty:
+            return 0
+
+        store = self.store
+        df = df.assign(**{store.date_column: pd.to_datetime(df[store.date_column])})
+        key_column = self.key_column
+        if key_column is None and not has_trade_key(df.columns):
+            key_column = store.date_column
+        by_trade = key_column is None and not self.append_only
+
+        os.makedirs(store.root, exist_ok=True)
+        with store.lock:
+            for (year, month), part in store._split_by_month(df):
+                existing = store._read_partition(year, month)
+                part = _uncategorize(part)
+                # 순번은 세션 안의 이전 조각에 이어서 매김
+                part_keys = trade_keys(part, offsets=self._sequence_offsets) if by_trade else None
+
+                if existing is None or existing.empty:
+                    merged = part.reset_index(drop=True)
+                elif self.append_only:
+                    merged = pd.concat([_uncategorize(existing), part], ignore_index=True)
+                elif by_trade:
+                    # 파티션의 거래 키 해시 인덱스로 같은 거래만 제자리 교체, 새 거래는 추가
+                    existing = _uncategorize(existing)
+                    merged, _, _ = TradeIndex.from_frame(existing).upsert_frame(existing, part, part_keys)
+                else:
+                    # 이번 세션에서 처음 보는 키만 기존 행을 교체
+                    new_keys = set(part[key_column].unique()) - self._replaced
+                    existing = existing[~existing[key_column].isin(new_keys)]
+                    merged = pd.concat([_uncategorize(existing), part], ignore_index=True)
+
+                merged = merged.sort_values(store.date_column, kind='stable', ignore_index=True)
+                store._write_partition(year, month, merged)
+
+            if not by_trade and not self.append_only:
+                self._replaced.update(df[key_column].unique())
+
+        return len(df)
+
+
+def _uncategorize(df):
+    """category 컬럼을 일반 컬럼으로 변환 (파티션마다 범주가 달라도 합칠 수 있도록)"""
+    category_cols = df.select_dtypes(include='category').columns
+    if len(category_cols) == 0:
+        return df
+    return df.astype({col: object for col in category_cols})
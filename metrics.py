@@ -0,0 +1,306 @@
+"""
+수집 파이프라인 성능 지표 모듈
+
+키움 API 요청/페이지/응답 크기, 파싱 건수, 구글 시트 읽기/쓰기 시간 등을
+카운터와 히스토그램으로 기록하고, 실행이 끝날 때 Prometheus 텍스트 파일
+(node_exporter textfile collector 형식) 또는 JSON으로 내보냅니다.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from file_lock import atomic_write
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    """Prometheus 라벨 값 이스케이프"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    """라벨 튜플을 {a="1",b="2"} 형식으로 변환"""
+    items = list(labels) + list(extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _format_value(value):
+    """Prometheus 숫자 표기"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """지표 공통 기능 (라벨별 값 보관)"""
+
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def samples(self):
+        """(라벨 튜플, 값) 목록"""
+        with self._lock:
+            return sorted(self._values.items())
+
+    def reset(self):
+        """기록된 값 모두 삭제"""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 지표 (요청 수, 바이트 수 등)"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        값 증가
+
+        Args:
+            amount: 증가량 (0 이상)
+            **labels: 라벨 (예: api="ka10073")
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """현재 값"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """임의로 설정하는 지표 (마지막 실행 시각 등)"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        """값 설정"""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        """현재 값"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """분포 지표 (소요 시간 등, 누적 버킷 + 합계 + 건수)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        관측값 기록
+
+        Args:
+            value: 관측값 (초 단위 시간 등)
+            **labels: 라벨
+        """
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 소요 시간(초) 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            return sorted(
+                (key, {"buckets": list(entry["buckets"]), "sum": entry["sum"], "count": entry["count"]})
+                for key, entry in self._values.items()
+            )
+
+
+class MetricsRegistry:
+    """지표 모음 및 내보내기"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"이미 다른 종류로 등록된 지표입니다: {name}")
+            return metric
+
+    def counter(self, name, help_text):
+        """카운터 조회 또는 등록"""
+        return self._register(Counter, name, help_text)
+
+    def gauge(self, name, help_text):
+        """게이지 조회 또는 등록"""
+        return self._register(Gauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        """히스토그램 조회 또는 등록"""
+        return self._register(Histogram, name, help_text, buckets=buckets)
+
+    def reset(self):
+        """모든 지표 값 초기화 (등록 정보는 유지)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_prometheus(self):
+        """
+        Prometheus 텍스트 형식으로 변환
+
+        Returns:
+            str: exposition format 텍스트
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            for labels, value in metric.samples():
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+
+                for bound, count in zip(metric.buckets, value["buckets"]):
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{metric.name}_bucket{_format_labels(labels, le)} {count}")
+                lines.append(f"{metric.name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {value['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        """
+        JSON 직렬화용 딕셔너리로 변환
+
+        Returns:
+            dict: 지표 이름 → {type, help, samples: [{labels, value}]}
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        result = {}
+        for metric in metrics:
+            samples = []
+            for labels, value in metric.samples():
+                sample = {"labels": dict(labels)}
+                if metric.kind == "histogram":
+                    sample.update({
+                        "count": value["count"],
+                        "sum": value["sum"],
+                        "buckets": dict(zip((_format_value(b) for b in metric.buckets), value["buckets"])),
+                    })
+                else:
+                    sample["value"] = value
+                samples.append(sample)
+            result[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+        return result
+
+    def write(self, path):
+        """
+        지표 파일 저장 (.json이면 JSON, 그 외에는 Prometheus 텍스트)
+
+        Args:
+            path: 저장할 파일 경로
+        """
+        if path.endswith(".json"):
+            data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        else:
+            data = self.to_prometheus()
+        atomic_write(path, data, mode=0o644)
+
+
+# 프로세스 전체에서 공유하는 기본 레지스트리
+REGISTRY = MetricsRegistry()
+
+# 키움 REST API
+KIWOOM_REQUESTS = REGISTRY.counter(
+    "kiwoom_requests_total", "Kiwoom REST API requests by api id and HTTP status")
+KIWOOM_REQUEST_SECONDS = REGISTRY.histogram(
+    "kiwoom_request_duration_seconds", "Kiwoom REST API request latency (excluding rate limiter wait)")
+KIWOOM_RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "kiwoom_rate_limit_wait_seconds", "Time spent waiting for the request rate limiter")
+KIWOOM_RESPONSE_BYTES = REGISTRY.counter(
+    "kiwoom_response_bytes_total", "Kiwoom REST API response body bytes")
+KIWOOM_RETRIES = REGISTRY.counter(
+    "kiwoom_retries_total", "Kiwoom REST API requests retried after a throttle response")
+KIWOOM_AUTH_SECONDS = REGISTRY.histogram(
+    "kiwoom_auth_duration_seconds", "Kiwoom OAuth token issue latency")
+KIWOOM_PAGES = REGISTRY.counter(
+    "kiwoom_pages_total", "ka10073 continuation pages received")
+KIWOOM_CACHED_DAYS = REGISTRY.counter(
+    "kiwoom_cached_days_total", "Trading days served from the response cache")
+KIWOOM_ROWS_PARSED = REGISTRY.counter(
+    "kiwoom_rows_parsed_total", "Realized profit rows produced by _clean_dataframe")
+KIWOOM_PARSE_SECONDS = REGISTRY.histogram(
+    "kiwoom_parse_duration_seconds", "_clean_dataframe latency")
+
+# 구글 시트
+SHEETS_SECONDS = REGISTRY.histogram(
+    "sheets_operation_duration_seconds", "Google Sheets operation latency by operation")
+SHEETS_ROWS = REGISTRY.counter(
+    "sheets_rows_total", "Rows read from or written to Google Sheets by operation")
+SHEETS_CELLS = REGISTRY.counter(
+    "sheets_cells_total", "Cells read from or written to Google Sheets by operation")
+SHEETS_ERRORS = REGISTRY.counter(
+    "sheets_errors_total", "Failed Google Sheets operations by operation")
+
+# SQLite 원장
+LEDGER_SECONDS = REGISTRY.histogram(
+    "ledger_operation_duration_seconds", "SQLite ledger operation latency by operation")
+LEDGER_ROWS = REGISTRY.counter(
+    "ledger_rows_total", "Rows read from or written to the SQLite ledger by operation")
+
+# 파이프라인 실행
+PIPELINE_RUN_SECONDS = REGISTRY.gauge(
+    "pipeline_last_run_duration_seconds", "Duration of the last run_pipeline.py run")
+PIPELINE_LAST_RUN = REGISTRY.gauge(
+    "pipeline_last_run_timestamp_seconds", "Unix time when the last run_pipeline.py run finished")
+PIPELINE_SUCCESS = REGISTRY.gauge(
+    "pipeline_last_run_success", "1 if the last run_pipeline.py run succeeded, 0 otherwise")
+PIPELINE_ROWS = REGISTRY.gauge(
+    "pipeline_last_run_rows", "Rows collected by the last run_pipeline.py run")
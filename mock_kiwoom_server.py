@@ -0,0 +1,318 @@
+"""
+키움 REST API 로컬 모의 서버
+
+실제 api.kiwoom.com 없이 수집기를 테스트하고 처리량을 측정하기 위한 서버입니다.
+/oauth2/token(au10001)과 /api/dostk/acnt(ka10073)만 구현합니다.
+
+- 거래일마다 일정 건수의 합성 실현손익 데이터 생성 (같은 날짜는 항상 같은 데이터)
+- cont-yn/next-key 헤더 기반 연속조회 (페이지 크기 설정 가능)
+- 응답 지연, 5xx 오류, 요청 제한(429 / 초당 요청 수 초과) 주입
+
+사용법:
+    python mock_kiwoom_server.py --port 8080 --page-size 20 --latency-ms 30
+    python run_pipeline.py --app-key test --app-secret test  # config의 KIWOOM_REST_API_BASE_URL을 http://127.0.0.1:8080으로 설정
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from krx_calendar import trading_days
+
+MOCK_TOKEN = "mock-kiwoom-token"
+
+_STOCKS = [
+    ("삼성전자", "005930", 70000),
+    ("SK하이닉스", "000660", 120000),
+    ("NAVER", "035420", 180000),
+    ("카카오", "035720", 50000),
+    ("LG에너지솔루션", "373220", 450000),
+    ("현대차", "005380", 200000),
+    ("셀트리온", "068270", 170000),
+]
+
+
+class MockKiwoomServer:
+    """키움 REST API 모의 서버 (별도 스레드에서 실행)"""
+
+    def __init__(self, host="127.0.0.1", port=0, page_size=20, trades_per_day=5, latency_ms=0.0,
+                 error_rate=0.0, throttle_rate=0.0, max_rps=None, seed=0):
+        """
+        초기화
+
+        Args:
+            host: 바인드 주소
+            port: 포트 (0이면 빈 포트 자동 선택)
+            page_size: ka10073 한 페이지의 레코드 수
+            trades_per_day: 거래일마다 생성할 매도 체결 건수
+            latency_ms: 응답마다 추가할 지연 시간 (밀리초)
+            error_rate: 500 오류를 돌려줄 확률 (0~1)
+            throttle_rate: 요청 제한(429) 응답을 돌려줄 확률 (0~1)
+            max_rps: 초당 허용 요청 수 (초과 시 429, None이면 제한 없음)
+            seed: 합성 데이터 시드
+        """
+        self.page_size = max(1, page_size)
+        self.trades_per_day = trades_per_day
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.seed = seed
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._day_cache = {}
+
+        # 통계
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.rows_served = 0
+
+        handler = type("_BoundHandler", (_MockHandler,), {"server_state": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """서버 주소 (예: http://127.0.0.1:54321)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """서버 종료"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def stats(self):
+        """요청 통계"""
+        with self._lock:
+            return {
+                '요청수': self.requests,
+                '오류_응답수': self.errors,
+                '제한_응답수': self.throttled,
+                '응답_레코드수': self.rows_served,
+            }
+
+    def _inject_fault(self):
+        """
+        요청 1건에 주입할 장애 결정
+
+        Returns:
+            str: 'error', 'throttle' 또는 None
+        """
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+
+            if self.max_rps:
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.max_rps:
+                    self.throttled += 1
+                    return "throttle"
+                self._recent.append(now)
+
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.errors += 1
+                return "error"
+            if roll < self.error_rate + self.throttle_rate:
+                self.throttled += 1
+                return "throttle"
+            return None
+
+    def records_for_day(self, day):
+        """
+        거래일 하나의 합성 ka10073 레코드 (같은 날짜는 항상 같은 내용)
+
+        Args:
+            day: 날짜 (YYYYMMDD)
+        """
+        with self._lock:
+            cached = self._day_cache.get(day)
+        if cached is not None:
+            return cached
+
+        rng = random.Random(f"{self.seed}|{day}")
+        records = []
+        for _ in range(self.trades_per_day):
+            name, code, base_price = rng.choice(_STOCKS)
+            buy = int(base_price * rng.uniform(0.9, 1.1))
+            sell = int(buy * rng.uniform(0.85, 1.15))
+            qty = rng.randint(1, 100)
+            records.append({
+                "dt": day,
+                "stk_nm": name,
+                "stk_cd": f"A{code}",
+                "buy_uv": f"{buy:,}",
+                "cntr_pric": f"{sell:,}",
+                "cntr_qty": f"{qty:,}",
+                "tdy_sel_pl": f"{(sell - buy) * qty:+,}",
+                "pl_rt": f"{(sell - buy) / buy * 100:+.2f}",
+                "tdy_trde_cmsn": f"{(buy + sell) * qty * 15 // 100000:,}",
+                "tdy_trde_tax": f"{sell * qty * 18 // 10000:,}",
+            })
+
+        with self._lock:
+            self._day_cache[day] = records
+        return records
+
+    def ka10073_page(self, strt_dt, end_dt, offset):
+        """
+        구간 조회 결과 중 한 페이지
+
+        Returns:
+            tuple: (레코드 리스트, 다음 페이지 offset 또는 None)
+        """
+        rows = []
+        for day in trading_days(strt_dt, end_dt):
+            rows.extend(self.records_for_day(day))
+
+        page = rows[offset:offset + self.page_size]
+        next_offset = offset + self.page_size
+        with self._lock:
+            self.rows_served += len(page)
+        return page, (next_offset if next_offset < len(rows) else None)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """모의 서버 요청 처리기"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_state = None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        state = self.server_state
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        if state.latency_ms:
+            time.sleep(state.latency_ms / 1000)
+
+        fault = state._inject_fault()
+        if fault == "error":
+            self._send_json(500, {"return_code": 1, "return_msg": "모의 서버 오류"})
+            return
+        if fault == "throttle":
+            self._send_json(429, {"return_code": 5, "return_msg": "허용된 요청 개수를 초과하였습니다[1700]"})
+            return
+
+        if self.path == "/oauth2/token":
+            self._handle_token(body)
+        elif self.path == "/api/dostk/acnt":
+            self._handle_acnt(body)
+        else:
+            self._send_json(404, {"return_code": 1, "return_msg": f"알 수 없는 경로: {self.path}"})
+
+    def _handle_token(self, body):
+        """au10001 토큰 발급"""
+        if not body.get("appkey") or not body.get("secretkey"):
+            self._send_json(200, {"return_code": 3, "return_msg": "appkey/secretkey가 없습니다."})
+            return
+
+        expires_dt = (datetime.now() + timedelta(hours=24)).strftime("%Y%m%d%H%M%S")
+        self._send_json(200, {
+            "return_code": 0,
+            "return_msg": "정상적으로 처리되었습니다",
+            "token_type": "bearer",
+            "token": MOCK_TOKEN,
+            "expires_dt": expires_dt,
+        })
+
+    def _handle_acnt(self, body):
+        """ka10073 일자별종목별실현손익요청"""
+        if self.headers.get("authorization") != f"Bearer {MOCK_TOKEN}":
+            self._send_json(200, {"return_code": 3, "return_msg": "유효하지 않은 토큰입니다."})
+            return
+        if self.headers.get("api-id") != "ka10073":
+            self._send_json(200, {"return_code": 1, "return_msg": "지원하지 않는 api-id입니다."})
+            return
+
+        strt_dt = body.get("strt_dt", "")
+        end_dt = body.get("end_dt", strt_dt)
+        try:
+            offset = int(self.headers.get("next-key") or 0) if self.headers.get("cont-yn") == "Y" else 0
+            records, next_offset = self.server_state.ka10073_page(strt_dt, end_dt, offset)
+        except ValueError:
+            self._send_json(200, {"return_code": 1, "return_msg": "잘못된 조회 조건입니다."})
+            return
+
+        headers = {"api-id": "ka10073"}
+        if next_offset is not None:
+            headers.update({"cont-yn": "Y", "next-key": str(next_offset)})
+        else:
+            headers["cont-yn"] = "N"
+
+        self._send_json(200, {
+            "return_code": 0,
+            "return_msg": "조회가 완료되었습니다",
+            "dt_stk_rlzt_pl": records,
+        }, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    """모의 서버 단독 실행"""
+    parser = argparse.ArgumentParser(description='키움 REST API 로컬 모의 서버')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='바인드 주소')
+    parser.add_argument('--port', type=int, default=8080, help='포트')
+    parser.add_argument('--page-size', type=int, default=20, help='ka10073 페이지당 레코드 수')
+    parser.add_argument('--trades-per-day', type=int, default=5, help='거래일당 체결 건수')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='응답 지연 (밀리초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500 오류 확률 (0~1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='429 응답 확률 (0~1)')
+    parser.add_argument('--max-rps', type=float, default=None, help='초당 허용 요청 수')
+    args = parser.parse_args()
+
+    server = MockKiwoomServer(
+        host=args.host, port=args.port, page_size=args.page_size,
+        trades_per_day=args.trades_per_day, latency_ms=args.latency_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, max_rps=args.max_rps
+    )
+    print(f"🧪 키움 모의 서버 실행 중: {server.url} (Ctrl+C로 종료)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"📊 {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+적응형 요청 제한 모듈
+
+토큰 버킷 방식으로 키움 REST API 요청 속도를 제한합니다.
+제한 응답(429/5xx, return_code 오류)을 받으면 속도를 낮추고,
+연속으로 성공하면 다시 조금씩 높입니다.
+"""
+
+import threading
+import time
+try:
+    from config import RATE_LIMIT_RATE, RATE_LIMIT_BURST, RATE_LIMIT_MIN_RATE, RATE_LIMIT_MAX_RATE
+except ImportError:
+    RATE_LIMIT_RATE = 4.0       # 시작 속도 (초당 요청 수)
+    RATE_LIMIT_BURST = 2        # 한 번에 몰아서 보낼 수 있는 요청 수
+    RATE_LIMIT_MIN_RATE = 0.5   # 최저 속도
+    RATE_LIMIT_MAX_RATE = 5.0   # 최고 속도 (키움 조회 제한 기준)
+
+
+class AdaptiveRateLimiter:
+    """적응형 토큰 버킷 요청 제한 클래스"""
+
+    def __init__(self, rate=RATE_LIMIT_RATE, burst=RATE_LIMIT_BURST, min_rate=RATE_LIMIT_MIN_RATE,
+                 max_rate=RATE_LIMIT_MAX_RATE, decrease_factor=0.5, increase_step=0.5,
+                 success_threshold=10):
+        """
+        초기화
+
+        Args:
+            rate: 시작 속도 (초당 요청 수)
+            burst: 버킷 크기 (연속으로 보낼 수 있는 최대 요청 수)
+            min_rate: 최저 속도
+            max_rate: 최고 속도
+            decrease_factor: 제한 응답 시 속도에 곱할 비율
+            increase_step: 연속 성공 시 높일 속도
+            success_threshold: 속도를 높이기 위해 필요한 연속 성공 횟수
+        """
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.success_threshold = success_threshold
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+        # 통계
+        self._started_at = None
+        self._granted = 0
+        self._throttled = 0
+
+    def _refill(self, now):
+        """경과 시간만큼 토큰 채우기 (lock 안에서 호출)"""
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """요청 1회분 토큰을 받을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._started_at is None:
+                    self._started_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._granted += 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def on_success(self):
+        """성공 응답 반영 (연속 성공 시 속도 증가)"""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.success_threshold:
+                self._successes = 0
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self):
+        """제한/오류 응답 반영 (속도 감소 및 남은 토큰 비움)"""
+        with self._lock:
+            self._successes = 0
+            self._throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+
+    @property
+    def effective_rate(self):
+        """첫 요청 이후 실제로 허용된 초당 요청 수 (1초 미만 구간은 1초로 계산)"""
+        with self._lock:
+            if self._started_at is None or self._granted == 0:
+                return 0.0
+            elapsed = max(time.monotonic() - self._started_at, 1.0)
+            return self._granted / elapsed
+
+    def stats(self):
+        """요청 제한 통계"""
+        return {
+            '허용_요청수': self._granted,
+            '제한_응답수': self._throttled,
+            '현재_속도': self.rate,
+            '유효_속도': self.effective_rate,
+        }
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter():
+    """프로세스 전체에서 공유하는 요청 제한기 반환 (최초 호출 시 생성)"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
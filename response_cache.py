@@ -0,0 +1,183 @@
+"""
+키움 API 원본 응답 캐시 모듈
+
+정산이 끝난 거래일의 ka10073 응답은 바뀌지 않으므로
+(계좌, API ID, 날짜)별 원본 레코드를 디스크에 저장해 두고 재실행 시 그대로 사용합니다.
+
+- 레코드 내용은 SHA-256 해시 이름의 파일로 저장 (같은 내용은 한 번만 저장)
+- index.json이 (계좌, API ID, 날짜) → 해시를 연결
+- 최근 N일(mutable window)은 정정 가능성이 있어 캐시하지 않고 항상 다시 조회
+- 전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+  (마지막 사용 시각은 ACCESS_TIME_RESOLUTION보다 오래된 항목만 갱신하므로 캐시 적중마다 index.json을 다시 쓰지 않음)
+- 디렉터리는 처음 저장할 때 생성 (수집기를 만들기만 해서는 아무것도 생기지 않음)
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from file_lock import FileLock, atomic_write
+try:
+    from config import RESPONSE_CACHE_DIR, RESPONSE_CACHE_MUTABLE_DAYS, RESPONSE_CACHE_MAX_MB
+except ImportError:
+    RESPONSE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".kiwoom_cache")
+    RESPONSE_CACHE_MUTABLE_DAYS = 7     # 최근 N일은 항상 다시 조회
+    RESPONSE_CACHE_MAX_MB = 200         # 캐시 최대 크기 (MB)
+
+# 마지막 사용 시각 갱신 단위 (초, 이보다 최근에 갱신된 항목은 조회해도 index.json을 다시 쓰지 않음)
+ACCESS_TIME_RESOLUTION = 24 * 60 * 60
+
+
+class ResponseCache:
+    """거래일별 원본 응답 캐시 클래스"""
+
+    def __init__(self, cache_dir=RESPONSE_CACHE_DIR, mutable_days=RESPONSE_CACHE_MUTABLE_DAYS,
+                 max_bytes=RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        """
+        초기화
+
+        Args:
+            cache_dir: 캐시 디렉터리
+            mutable_days: 캐시하지 않을 최근 일수 (오늘 포함)
+            max_bytes: 캐시 최대 크기 (바이트)
+        """
+        self.cache_dir = cache_dir
+        self.mutable_days = mutable_days
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.lock = FileLock(os.path.join(cache_dir, "index.lock"))
+
+    @staticmethod
+    def _key(account, api_id, day):
+        return f"{account or ''}|{api_id}|{day}"
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json")
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        atomic_write(self.index_path, json.dumps(index, ensure_ascii=False))
+
+    def is_settled(self, day):
+        """
+        캐시 가능한(정산이 끝난) 날짜인지 여부
+
+        Args:
+            day: 날짜 (YYYYMMDD)
+        """
+        cutoff = (datetime.now() - timedelta(days=self.mutable_days)).strftime("%Y%m%d")
+        return day <= cutoff
+
+    def get_many(self, account, api_id, days):
+        """
+        캐시된 레코드 조회
+
+        Args:
+            account: 계좌번호
+            api_id: API ID (예: ka10073)
+            days: 날짜 목록 (YYYYMMDD)
+
+        Returns:
+            dict: 캐시에 있는 날짜별 레코드 리스트
+        """
+        days = [day for day in days if self.is_settled(day)]
+        if not days or not os.path.exists(self.index_path):
+            return {}
+
+        hits = {}
+        with self.lock:
+            index = self._read_index()
+            now = time.time()
+            touched = False
+
+            for day in days:
+                entry = index.get(self._key(account, api_id, day))
+                if not entry:
+                    continue
+
+                try:
+                    with open(self._object_path(entry["hash"]), "rb") as f:
+                        payload = f.read()
+                except FileNotFoundError:
+                    continue
+
+                # 내용 검증 (손상된 파일은 캐시 미스로 처리)
+                if hashlib.sha256(payload).hexdigest() != entry["hash"]:
+                    continue
+
+                hits[day] = json.loads(payload)
+                if now - entry["last_access"] >= ACCESS_TIME_RESOLUTION:
+                    entry["last_access"] = now
+                    touched = True
+
+            if touched:
+                self._write_index(index)
+
+        return hits
+
+    def put_many(self, account, api_id, records_by_date):
+        """
+        정산이 끝난 날짜의 레코드 저장 (최근 N일은 무시)
+
+        Args:
+            account: 계좌번호
+            api_id: API ID (예: ka10073)
+            records_by_date: 날짜(YYYYMMDD)별 레코드 리스트 (거래가 없는 날은 빈 리스트)
+        """
+        settled = {day: records for day, records in records_by_date.items() if self.is_settled(day)}
+        if not settled:
+            return
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self.lock:
+            index = self._read_index()
+            now = time.time()
+
+            for day, records in settled.items():
+                payload = json.dumps(records, ensure_ascii=False, sort_keys=True).encode("utf-8")
+                digest = hashlib.sha256(payload).hexdigest()
+                path = self._object_path(digest)
+
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    atomic_write(path, payload, mode=0o644)
+
+                index[self._key(account, api_id, day)] = {
+                    "hash": digest,
+                    "size": len(payload),
+                    "last_access": now,
+                }
+
+            self._evict(index)
+            self._write_index(index)
+
+    def _evict(self, index):
+        """최대 크기를 넘으면 오래 사용하지 않은 항목부터 삭제 (lock 안에서 호출)"""
+        sizes = {entry["hash"]: entry["size"] for entry in index.values()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        refs = Counter(entry["hash"] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            del index[key]
+
+            # 다른 날짜가 같은 내용을 참조하지 않을 때만 파일 삭제
+            refs[entry["hash"]] -= 1
+            if refs[entry["hash"]] == 0:
+                total -= entry["size"]
+                try:
+                    os.remove(self._object_path(entry["hash"]))
+                except FileNotFoundError:
+                    pass
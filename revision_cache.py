@@ -0,0 +1,217 @@
+"""
+리비전 기반 데이터 캐시
+
+데이터 원본의 리비전(구글 시트는 Drive modifiedTime, 로컬 저장소는 파일 수정 시각)을
+먼저 가볍게 확인하고, 리비전이 바뀌었을 때만 데이터를 다시 읽습니다.
+refresh()를 제공하는 원본(SheetSource)은 최근 날짜 구간만 읽어 캐시에 합치고,
+컬럼 구성이 바뀌었거나 invalidate()로 캐시를 비운 경우에만 전체를 다시 읽습니다.
+
+데이터 원본은 revision()과 load() 두 메서드만 있으면 되므로,
+구글 시트 없이도 LocalSource로 같은 동작을 확인할 수 있습니다.
+
+읽은 DataFrame은 프로세스 전체에서 한 벌만 보관하고, 조회할 때마다 데이터 버퍼를
+공유하는 얕은 복사본을 돌려줍니다. Copy-on-Write가 켜져 있으면 (pandas 3 이상은 항상,
+2.x는 앱이 mode.copy_on_write를 켠 경우) 한 세션이 컬럼을 추가하거나 값을 바꿔도
+그 세션의 복사본만 바뀌고 공유 데이터는 그대로입니다. 꺼져 있으면 깊은 복사본을 돌려줍니다.
+DataFrame.attrs['data_version']에는 (캐시 키, 읽을 때마다 증가하는 번호)가 기록되어
+같은 데이터에서 만든 집계를 세션 간에 재사용할 수 있습니다.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+
+def _copy_on_write():
+    """pandas Copy-on-Write 사용 여부 (pandas 3부터는 항상 사용)"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.get_option('mode.copy_on_write') is True
+
+
+def _view(value):
+    """
+    공유 데이터의 세션별 사본 (DataFrame이면 Copy-on-Write일 때 버퍼를 공유하는 얕은 복사본,
+    아니면 공유 데이터가 바뀌지 않도록 깊은 복사본)
+    """
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=not _copy_on_write())
+    return value
+
+
+def _sort_by_date(df):
+    """날짜 오름차순 정렬 (같은 날짜는 시트 순서 유지)"""
+    return df.sort_values('날짜', kind='stable', ignore_index=True)
+
+
+class SheetSource:
+    """구글 시트 데이터 원본 (리비전: Drive modifiedTime)"""
+
+    def __init__(self, manager, overlap_days=7):
+        """
+        초기화
+
+        Args:
+            manager: 시트가 열린 GoogleSheetManager
+            overlap_days: 증분 갱신 시 캐시의 마지막 날짜보다 며칠 앞부터 다시 읽을지 (정정 반영용)
+        """
+        self.manager = manager
+        self.overlap_days = overlap_days
+
+    def revision(self):
+        """스프레드시트 마지막 수정 시각 (확인 실패 시 None)"""
+        return self.manager.get_revision()
+
+    def load(self):
+        """시트 전체 읽기 (날짜순 정렬)"""
+        df = self.manager.read_data()
+        if df is not None and '날짜' in df.columns:
+            df = _sort_by_date(df)
+        return df
+
+    def refresh(self, cached):
+        """
+        증분 갱신 (캐시의 마지막 날짜 - overlap_days 이후 행만 읽어 교체)
+
+        그보다 오래된 행은 캐시를 그대로 쓰므로, 컬럼 구성이 바뀌었거나
+        오래된 구간의 행 수가 시트와 맞지 않으면 None을 돌려 전체 읽기로 넘깁니다.
+
+        Args:
+            cached: 이전에 읽은 DataFrame (날짜 오름차순)
+
+        Returns:
+            DataFrame: 갱신된 데이터 (증분으로 처리할 수 없으면 None)
+        """
+        if cached is None or cached.empty or '날짜' not in cached.columns:
+            return None
+
+        since = cached['날짜'].max() - pd.Timedelta(days=self.overlap_days)
+        result = self.manager.read_since(since)
+        if result is None:
+            return None
+        recent, header, total_rows = result
+
+        if list(header) != list(cached.columns):
+            print("ℹ️ 시트 컬럼 구성이 바뀌어 전체를 다시 읽습니다.")
+            return None
+
+        kept = cached[cached['날짜'] < since]
+        if len(kept) + len(recent) != total_rows:
+            print("ℹ️ 이전 구간의 행이 바뀌어 전체를 다시 읽습니다.")
+            return None
+
+        if recent.empty:
+            return kept.reset_index(drop=True)
+
+        merged = pd.concat([kept, _sort_by_date(recent)], ignore_index=True)
+        for col in cached.columns:
+            if isinstance(cached[col].dtype, pd.CategoricalDtype):
+                merged[col] = merged[col].astype('category')
+        print(f"✅ 증분 갱신: {since:%Y-%m-%d} 이후 {len(recent)}건 교체 (유지 {len(kept)}건)")
+        return merged
+
+
+class LocalSource:
+    """로컬 저장소 데이터 원본 (리비전: 파티션 파일 목록과 수정 시각)"""
+
+    def __init__(self, store):
+        """
+        초기화
+
+        Args:
+            store: LocalStore
+        """
+        self.store = store
+
+    def revision(self):
+        """저장소 리비전"""
+        return self.store.revision()
+
+    def load(self):
+        """저장소 전체 읽기 (비어 있으면 None)"""
+        df = self.store.read()
+        return df if not df.empty else None
+
+
+class RevisionCache:
+    """리비전이 바뀔 때만 다시 읽는 데이터 캐시 (스레드 안전)"""
+
+    def __init__(self, probe_interval=0.0):
+        """
+        초기화
+
+        Args:
+            probe_interval: 리비전을 다시 확인하기까지의 최소 간격 (초, 0이면 매번 확인)
+        """
+        self.probe_interval = probe_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stats = {'확인': 0, '재사용': 0, '증분': 0, '읽기': 0}
+        self._version = 0
+
+    def get(self, key, source):
+        """
+        데이터 조회
+
+        Args:
+            key: 캐시 키 (예: ("sheet", 시트 이름, 워크시트 이름))
+            source: revision()과 load()를 제공하는 데이터 원본
+
+        Returns:
+            로드한 데이터의 읽기 전용 뷰 (리비전이 그대로면 이전에 읽은 데이터, load 실패 시 None)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+
+            if entry is not None and now - entry['probed_at'] < self.probe_interval:
+                self._stats['재사용'] += 1
+                return _view(entry['value'])
+
+            try:
+                revision = source.revision()
+            except Exception as e:
+                print(f"⚠️ 리비전 확인 실패: {e}")
+                revision = None
+            self._stats['확인'] += 1
+
+            if entry is not None and revision is not None and entry['revision'] == revision:
+                entry['probed_at'] = now
+                self._stats['재사용'] += 1
+                return _view(entry['value'])
+
+            # 리비전이 바뀌었으면 원본이 지원하는 경우 최근 구간만 다시 읽고, 안 되면 전체 읽기
+            value = None
+            if entry is not None and hasattr(source, 'refresh'):
+                value = source.refresh(entry['value'])
+                if value is not None:
+                    self._stats['증분'] += 1
+            if value is None:
+                value = source.load()
+                self._stats['읽기'] += 1
+            if value is not None:
+                # 데이터 버전 표시 (집계 등 파생 데이터를 버전별로 한 번만 만들 때 사용)
+                self._version += 1
+                if isinstance(value, pd.DataFrame):
+                    value.attrs['data_version'] = (key, self._version)
+                self._entries[key] = {'revision': revision, 'value': value, 'probed_at': now}
+            return _view(value)
+
+    def invalidate(self, key=None):
+        """
+        캐시 삭제
+
+        Args:
+            key: 삭제할 키 (None이면 전체)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """확인/재사용/증분/읽기 횟수"""
+        with self._lock:
+            return dict(self._stats)
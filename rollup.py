@@ -0,0 +1,89 @@
+"""
+실현손익 집계 큐브
+
+거래 내역을 (연도, 월, 일, 종목명) 단위로 한 번만 집계해 두고,
+대시보드의 연도별/월별/일별 표와 차트, 종목별 차트는 이 결과를 잘라서 사용합니다.
+버튼을 누를 때마다 전체 거래 내역을 다시 그룹화하지 않아도 됩니다.
+"""
+
+import pandas as pd
+
+# 집계 단위 (큰 단위부터)
+LEVELS = ['연도', '월', '일', '종목명']
+
+
+class RollupCube:
+    """연도/월/일/종목별 실현손익 합계와 거래건수"""
+
+    def __init__(self, df):
+        """
+        초기화 (전체 거래 내역을 한 번 집계)
+
+        Args:
+            df: 날짜, 종목명, 실현손익 컬럼이 있는 실현손익 DataFrame
+        """
+        dates = df['날짜']
+        keys = pd.DataFrame({
+            '연도': dates.dt.year.to_numpy(),
+            '월': dates.dt.month.to_numpy(),
+            '일': dates.dt.day.to_numpy(),
+            '종목명': df['종목명'].to_numpy(),
+            '실현손익': df['실현손익'].to_numpy(),
+        })
+
+        # 종목명이 비어 있는 거래도 손익 합계에는 포함 (거래건수는 종목명 기준)
+        self.base = keys.groupby(LEVELS, dropna=False, observed=True, sort=True).agg(
+            실현손익=('실현손익', 'sum'),
+            거래건수=('종목명', 'count'),
+        )
+        self._years = self.base.groupby(level='연도').sum()
+        self._months = self.base.groupby(level=['연도', '월']).sum()
+        self._days = self.base.groupby(level=['연도', '월', '일']).sum()
+        self._stocks = self.base.groupby(level='종목명', observed=True).sum()
+
+    def years(self):
+        """
+        연도별 집계
+
+        Returns:
+            DataFrame: 연도, 실현손익, 거래건수 (거래가 있는 연도만, 연도순)
+        """
+        return self._years.reset_index()
+
+    def months(self, year):
+        """
+        월별 집계
+
+        Args:
+            year: 연도
+
+        Returns:
+            DataFrame: 월, 실현손익, 거래건수 (거래가 있는 월만, 월순)
+        """
+        if year not in self._years.index:
+            return pd.DataFrame({'월': [], '실현손익': [], '거래건수': []})
+        return self._months.xs(year, level='연도').reset_index()
+
+    def days(self, year, month):
+        """
+        일별 집계
+
+        Args:
+            year: 연도
+            month: 월
+
+        Returns:
+            DataFrame: 일, 실현손익, 거래건수 (거래가 있는 날만, 날짜순)
+        """
+        if (year, month) not in self._months.index:
+            return pd.DataFrame({'일': [], '실현손익': [], '거래건수': []})
+        return self._days.xs((year, month), level=['연도', '월']).reset_index()
+
+    def stocks(self):
+        """
+        종목별 집계 (전체 기간)
+
+        Returns:
+            DataFrame: 종목명, 실현손익, 거래건수
+        """
+        return self._stocks.reset_index()
@@ -5,9 +5,17 @@
 """
 
 import sys
-import requests # 텔레그램 전송용
+import time
+import metrics
+from http_pool import get_shared_session, close_shared_session
 from kiwoom_collector import KiwoomRestCollector
+from kiwoom_async_collector import AsyncKiwoomCollector
 from google_sheet_manager import GoogleSheetManager
+from backfill import run_resumable_backfill, print_backfill_summary
+from backfill_journal import BackfillJournal
+from local_store import LocalStore
+from ledger import TradeLedger
+from krx_calendar import trading_days
 try:
     from config import GOOGLE_SHEET_NAME, WORKSHEET_NAME
     from config import KIWOOM_APP_KEY, KIWOOM_APP_SECRET, KIWOOM_ACCOUNT
@@ -37,6 +45,10 @@ except ImportError:
     except:
         pass
 import argparse
+try:
+    from config import METRICS_FILE
+except ImportError:
+    METRICS_FILE = "pipeline_metrics.prom"
 
 
 def send_telegram_alert(message):
@@ -47,13 +59,118 @@ def send_telegram_alert(message):
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
         data = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
-        response = requests.post(url, data=data, timeout=5)
+        # 키움 API와 같은 커넥션 풀 세션 사용
+        response = get_shared_session().post(url, data=data, timeout=5)
         if response.status_code != 200:
             print(f"⚠️ 텔레그램 전송 실패: {response.text}")
     except Exception as e:
         print(f"⚠️ 텔레그램 전송 오류: {e}")
 
 
+def collect_streaming(collector, start_date, end_date, store):
+    """
+    페이지 단위로 수집하면서 조각이 도착하는 대로 로컬 저장소에 기록
+    
+    Args:
+        collector: 키움 수집기
+        start_date: 조회 시작일 (YYYYMMDD)
+        end_date: 조회 종료일 (YYYYMMDD)
+        store: LocalStore
+        
+    Returns:
+        DataFrame: 전체 수집 데이터 (실패 시 None)
+    """
+    chunks = []
+    writer = store.open_writer()
+    store_ok = True
+    
+    try:
+        for chunk in collector.iter_realized_profit_pages(start_date, end_date):
+            if store_ok:
+                try:
+                    writer.write(chunk)
+                except Exception as e:
+                    print(f"⚠️ 로컬 저장소 저장 실패: {e}")
+                    store_ok = False
+            chunks.append(chunk)
+    except Exception as e:
+        print(f"❌ 데이터 조회 실패: {e}")
+        return None
+    
+    if chunks and store_ok:
+        print(f"💾 로컬 저장소 저장 완료: {store.root}")
+    return collector._concat_chunks(chunks)
+
+
+def save_to_store(store, df):
+    """수집 데이터를 로컬 저장소에 Upsert (실패해도 파이프라인은 계속 진행)"""
+    try:
+        store.upsert(df)
+        print(f"💾 로컬 저장소 저장 완료: {store.root}")
+    except Exception as e:
+        print(f"⚠️ 로컬 저장소 저장 실패: {e}")
+
+
+def resume_pipeline(collector, credentials_file, start_date, end_date, store, ledger):
+    """
+    월 단위로 수집 → 시트 저장 → 진행 기록을 반복 (--resume)
+    
+    중간에 실패해도 다시 실행하면 진행 기록에 있는 날짜는 건너뛰고 이어서 수집합니다.
+    
+    Returns:
+        tuple: (성공 여부, 저장한 건수)
+    """
+    manager = GoogleSheetManager(credentials_file=credentials_file)
+    if not manager.open_sheet(GOOGLE_SHEET_NAME, WORKSHEET_NAME):
+        error_msg = "❌ 구글 시트를 열 수 없습니다."
+        print(error_msg)
+        send_telegram_alert(error_msg)
+        return False, 0
+    
+    journal = BackfillJournal()
+    print(f"📒 진행 기록 파일: {journal.path}")
+    
+    shard_stats = run_resumable_backfill(
+        collector, start_date, end_date, manager, journal,
+        on_flush=lambda df, stats: save_to_store(store, df), ledger=ledger
+    )
+    print_backfill_summary(shard_stats)
+    
+    total_rows = sum(stats['건수'] for stats in shard_stats)
+    failed = [stats for stats in shard_stats if stats['상태'] == '실패']
+    if failed:
+        send_telegram_alert(
+            f"❌ [키움 실현손익 수집 중단]\n"
+            f"- 중단 구간: {failed[0]['시작일']} ~ {failed[0]['종료일']} ({failed[0]['오류']})\n"
+            f"- 저장 완료: {total_rows}건\n"
+            f"- --resume으로 다시 실행하면 이어서 수집합니다."
+        )
+    else:
+        send_telegram_alert(
+            f"✅ [키움 실현손익 수집 완료]\n"
+            f"- 날짜: {start_date} ~ {end_date}\n"
+            f"- 건수: {total_rows}건 (이전 실행 완료분 제외)"
+        )
+    return not failed, total_rows
+
+
+def write_metrics(path, succeeded, rows, elapsed):
+    """실행 결과 지표를 파일로 저장 (Prometheus 텍스트 또는 .json)"""
+    if not path:
+        return
+    
+    metrics.PIPELINE_RUN_SECONDS.set(elapsed)
+    metrics.PIPELINE_LAST_RUN.set(time.time())
+    metrics.PIPELINE_SUCCESS.set(1 if succeeded else 0)
+    metrics.PIPELINE_ROWS.set(rows)
+    
+    try:
+        metrics.REGISTRY.write(path)
+        print(f"📈 실행 지표 저장 완료: {path}")
+    except Exception as e:
+        print(f"⚠️ 실행 지표 저장 실패: {e}")
+
+
 def main():
     """메인 실행 함수"""
     parser = argparse.ArgumentParser(description='키움 REST API 데이터 수집 및 구글 시트 저장')
@@ -65,18 +182,44 @@ def main():
     parser.add_argument('--account', type=str, default=KIWOOM_ACCOUNT, help='계좌번호')
     parser.add_argument('--start-date', type=str, default=None, help='조회 시작일 (YYYYMMDD)')
     parser.add_argument('--end-date', type=str, default=None, help='조회 종료일 (YYYYMMDD)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='동시에 조회할 날짜 구간 수 (2 이상이면 비동기 수집)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='응답 캐시를 사용하지 않고 전체 기간을 다시 조회')
+    parser.add_argument('--resume', action='store_true',
+                        help='월 단위로 저장하며 수집하고, 진행 기록에 있는 날짜는 건너뜀 (중단된 수집 이어하기)')
+    parser.add_argument('--metrics-file', type=str, default=METRICS_FILE,
+                        help='실행 지표 저장 경로 (.prom: Prometheus 텍스트, .json: JSON, 빈 값이면 저장 안 함)')
     args = parser.parse_args()
     
     print("=" * 60)
     print("키움 REST API → 구글 시트 데이터 파이프라인")
     print("=" * 60)
     
+    run_started = time.monotonic()
+    succeeded = False
+    collected_rows = 0
+    ledger = None
+    
     try:
         # 1단계: 키움 REST API 데이터 수집
         print("\n[1단계] 키움 REST API 데이터 수집")
         print("-" * 60)
         
-        collector = KiwoomRestCollector(args.app_key, args.app_secret, args.account)
+        store = LocalStore()
+        ledger = TradeLedger()
+        streamed = False
+        
+        response_cache = False if args.no_cache else None
+        if args.concurrency > 1:
+            collector = AsyncKiwoomCollector(
+                args.app_key, args.app_secret, args.account,
+                response_cache=response_cache, concurrency=args.concurrency
+            )
+        else:
+            collector = KiwoomRestCollector(
+                args.app_key, args.app_secret, args.account, response_cache=response_cache
+            )
         
         if args.test:
             print("🧪 테스트 모드: 샘플 데이터 사용")
@@ -88,54 +231,48 @@ def main():
                 send_telegram_alert(error_msg)
                 return
             
-            print("🔐 키움 REST API 인증 중...")
-            if not collector.authenticate():
+            # 토큰 캐시에 유효한 토큰이 있으면 인증 요청 생략
+            if not collector._check_token_validity():
                 error_msg = "❌ 인증 실패. 프로그램을 종료합니다."
                 print(error_msg)
                 send_telegram_alert(error_msg)
                 return
             
             # 날짜 범위 설정
-            from datetime import datetime, timedelta
-            import pandas as pd
-            import time
+            from datetime import datetime
 
             end_date_str = args.end_date if args.end_date else datetime.now().strftime("%Y%m%d")
             start_date_str = args.start_date if args.start_date else end_date_str
             
-            # 반복 수집
+            # 기간 단위 수집 (ka10073 구간 조회)
             print(f"📥 데이터 수집 기간: {start_date_str} ~ {end_date_str}")
             
-            start_dt = datetime.strptime(start_date_str, "%Y%m%d")
-            end_dt = datetime.strptime(end_date_str, "%Y%m%d")
+            if args.resume:
+                succeeded, collected_rows = resume_pipeline(
+                    collector, args.credentials, start_date_str, end_date_str, store, ledger
+                )
+                return
             
-            all_dfs = []
-            current_dt = start_dt
+            if args.concurrency > 1:
+                df = collector.get_realized_profit_range(start_date_str, end_date_str)
+            else:
+                # 페이지가 도착하는 대로 로컬 저장소에 기록 (마지막 페이지를 기다리지 않음)
+                df = collect_streaming(collector, start_date_str, end_date_str, store)
+                streamed = True
             
-            while current_dt <= end_dt:
-                base_date = current_dt.strftime("%Y%m%d")
-                
-                # 주말/휴일 체크 로직은 없지만, API가 빈 데이터를 반환하므로 그대로 진행
-                # 너무 빠른 요청 방지를 위해 약간의 딜레이
-                if len(all_dfs) > 0:
-                    time.sleep(0.5) 
-                    
-                df_daily = collector.get_realized_profit(base_date=base_date)
-                
-                if df_daily is not None and not df_daily.empty:
-                    all_dfs.append(df_daily)
-                
-                current_dt += timedelta(days=1)
+            if df is None:
+                error_msg = "❌ 키움 API 데이터 수집 실패"
+                print(error_msg)
+                send_telegram_alert(error_msg)
+                return
                 
-            if not all_dfs:
+            if df.empty:
                  msg = "ℹ️ 수집된 데이터가 없습니다. (휴일이거나 거래 없음)"
                  print(msg)
                  # 데이터 없음도 알림을 받을지 여부는 선택적이나, 일단 전송
                  # send_telegram_alert(msg) 
+                 succeeded = True
                  return
-                 
-            # 전체 데이터 병합
-            df = pd.concat(all_dfs, ignore_index=True)
              
         
         if df is None or df.empty:
@@ -147,15 +284,12 @@ def main():
         if '실현손익' in df.columns:
              total_profit = df['실현손익'].sum()
 
+        collected_rows = len(df)
         print(f"✅ 총 {len(df)}건의 데이터 수집 완료 (기간 합계)")
         
-        # CSV 파일로 저장 (백업용)
-        csv_filename = "collected_data.csv"
-        try:
-            df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-            print(f"💾 로컬 파일 저장 완료: {csv_filename}")
-        except Exception as e:
-            print(f"⚠️ 로컬 파일 저장 실패: {e}")
+        # 로컬 저장소에 누적 저장 (스트리밍 수집 시 이미 기록됨, 테스트 모드는 저장 안 함)
+        if not streamed and not args.test:
+            save_to_store(store, df)
         
         # 2단계: 구글 시트에 저장
         print("\n[2단계] 구글 시트에 저장")
@@ -171,8 +305,14 @@ def main():
             send_telegram_alert(error_msg)
             return
         
-        # 데이터 Upsert
-        if manager.upsert_data(df, key_column='날짜'):
+        # 원장에 Upsert 후 원장 내용으로 시트 갱신 (테스트 모드는 원장에 저장하지 않음)
+        if args.test:
+            saved = manager.upsert_data(df)
+        else:
+            saved = manager.upsert_via_ledger(
+                df, ledger, fetched_dates=trading_days(start_date_str, end_date_str)
+            )
+        if saved:
             print("✅ 구글 시트 저장 완료")
             print(f"\n📊 시트 URL: https://docs.google.com/spreadsheets/d/{manager.sheet.id}")
             
@@ -184,6 +324,7 @@ def main():
                 f"- 손익합계: {total_profit:,.0f}원"
             )
             send_telegram_alert(success_msg)
+            succeeded = True
             
         else:
             error_msg = "❌ 구글 시트 저장 실패"
@@ -201,6 +342,11 @@ def main():
         error_msg = f"❌ 파이프라인 오류 발생: {str(e)}"
         print(error_msg)
         send_telegram_alert(error_msg)
+    finally:
+        if ledger is not None:
+            ledger.close()
+        close_shared_session()
+        write_metrics(args.metrics_file, succeeded, collected_rows, time.monotonic() - run_started)
     
     print("\n" + "=" * 60)
     print("작업 완료")
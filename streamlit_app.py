@@ -9,11 +9,21 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from google_sheet_manager import GoogleSheetManager
+from local_store import LocalStore
+from ledger import TradeLedger
+from revision_cache import RevisionCache, SheetSource, LocalSource
+from rollup import RollupCube
 from kiwoom_collector import KiwoomRestCollector
+from krx_calendar import trading_days
 from datetime import datetime, timedelta
 import time
 import requests
 
+# 세션 간에 공유하는 DataFrame을 복사 없이 나눠 쓰기 위해 Copy-on-Write 사용
+# (pandas 3부터는 항상 켜져 있음, 2.x에서만 설정)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 
 # 페이지 설정
 st.set_page_config(
@@ -268,36 +278,121 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)  # 5분 캐시
+# 데이터 원본의 리비전(수정 시각)을 다시 확인하기까지의 최소 간격 (초)
+REVISION_PROBE_SECONDS = 30
+
+# 증분 갱신 시 캐시의 마지막 날짜보다 며칠 앞부터 다시 읽을지 (최근 거래 정정 반영)
+REFRESH_OVERLAP_DAYS = 7
+
+
+@st.cache_resource
+def get_revision_cache():
+    """모든 세션이 함께 쓰는 리비전 캐시 (리비전이 바뀔 때만 전체 데이터를 다시 읽음)"""
+    return RevisionCache(probe_interval=REVISION_PROBE_SECONDS)
+
+
+@st.cache_resource
+def get_sheet_client():
+    """모든 세션이 함께 쓰는 인증된 gspread 클라이언트 (서비스 계정 인증은 프로세스당 한 번)"""
+    credentials_dict = dict(st.secrets["gcp_service_account"])
+    return GoogleSheetManager(credentials_dict=credentials_dict).gc
+
+
+@st.cache_resource
+def get_sheet_reader(sheet_name, worksheet_name):
+    """
+    모든 세션이 함께 쓰는 읽기용 시트 매니저 (리비전 확인과 전체 읽기에만 사용)
+    
+    Args:
+        sheet_name: 스프레드시트 이름
+        worksheet_name: 워크시트 이름
+    
+    Returns:
+        GoogleSheetManager: 시트가 열린 매니저 (열기 실패 시 예외를 던져 캐시되지 않음)
+    """
+    manager = GoogleSheetManager(client=get_sheet_client())
+    if not manager.open_sheet(sheet_name, worksheet_name):
+        raise RuntimeError(f"구글 시트를 열 수 없습니다: {sheet_name}/{worksheet_name}")
+    return manager
+
+
+@st.cache_resource(max_entries=4)
+def _cached_rollup(data_version, _df):
+    """데이터 버전별 집계 큐브 (모든 세션 공유)"""
+    return RollupCube(_df)
+
+
+def get_rollup(df):
+    """
+    연도/월/일/종목별 집계 큐브 조회 (데이터 버전이 바뀔 때만 다시 집계)
+    
+    Args:
+        df: load_data()가 돌려준 DataFrame
+    
+    Returns:
+        RollupCube: 집계 큐브 (날짜/종목명/실현손익 컬럼이 없으면 None)
+    """
+    if not all(col in df.columns for col in ('날짜', '종목명', '실현손익')):
+        return None
+    
+    data_version = df.attrs.get('data_version')
+    if data_version is None:
+        return RollupCube(df)
+    return _cached_rollup(data_version, df)
+
+
+def load_local_data():
+    """
+    로컬 저장소(Parquet)에서 데이터 로드
+    
+    Returns:
+        DataFrame: 저장된 데이터 (저장소가 비어 있거나 읽을 수 없으면 None)
+    """
+    try:
+        store = LocalStore()
+        return get_revision_cache().get(("local", store.root), LocalSource(store))
+    except Exception as e:
+        print(f"⚠️ 로컬 저장소 읽기 실패: {e}")
+        return None
+
+
 def load_data():
-    """구글 시트에서 데이터 로드"""
+    """
+    구글 시트에서 데이터 로드
+    
+    스프레드시트 수정 시각(Drive modifiedTime)을 먼저 확인하고,
+    마지막으로 읽은 뒤 바뀌지 않았으면 전체 데이터를 다시 받지 않고 이전 데이터를 사용합니다.
+    Secrets의 data_source가 "local"이면 로컬 저장소를 먼저 읽고,
+    구글 시트를 사용할 수 없을 때도 로컬 저장소로 대체합니다.
+    """
+    try:
+        prefer_local = st.secrets.get("data_source", "sheet") == "local"
+    except Exception:
+        prefer_local = False
+    
+    if prefer_local:
+        df = load_local_data()
+        if df is not None:
+            return df
+    
     try:
-        # Streamlit Secrets에서 인증 정보 가져오기
-        credentials_dict = dict(st.secrets["gcp_service_account"])
-        
-        # 구글 시트 매니저 초기화
-        manager = GoogleSheetManager(credentials_dict=credentials_dict)
-        
-        # 시트 열기
         sheet_name = st.secrets.get("sheet_name", "키움_실현손익_데이터")
         worksheet_name = st.secrets.get("worksheet_name", "실현손익")
         
-        if manager.open_sheet(sheet_name, worksheet_name):
-            df = manager.read_data()
-            
-            if df is not None and not df.empty:
-                # 날짜 컬럼 확인 및 변환
-                if '날짜' in df.columns:
-                    df['날짜'] = pd.to_datetime(df['날짜'])
-                    df = df.sort_values('날짜')
-                
-                return df
-            else:
-                return pd.DataFrame()
+        # 공유 클라이언트로 열어 둔 시트에서 읽기 (리비전이 바뀌었을 때만 전체 읽기)
+        manager = get_sheet_reader(sheet_name, worksheet_name)
+        df = get_revision_cache().get(("sheet", sheet_name, worksheet_name), SheetSource(manager, overlap_days=REFRESH_OVERLAP_DAYS))
+        
+        if df is not None and not df.empty:
+            return df
         else:
-            return None
+            return pd.DataFrame()
             
     except Exception as e:
+        local_df = load_local_data()
+        if local_df is not None:
+            st.warning(f"구글 시트를 읽을 수 없어 로컬 저장소 데이터를 표시합니다: {e}")
+            return local_df
         st.error(f"데이터 로드 실패: {e}")
         return None
 
@@ -331,7 +426,7 @@ def sync_with_kiwoom():
             # 2. 키움 API 인증
             status.write("🔐 키움 REST API 인증 중...")
             collector = KiwoomRestCollector(app_key, app_secret, account)
-            if not collector.authenticate():
+            if not collector._check_token_validity():
                 status.update(label="❌ 키움 API 인증 실패", state="error")
                 return False
                 
@@ -368,58 +463,53 @@ def sync_with_kiwoom():
             
             status.write(f"📥 데이터 수집 중... ({start_date_str} ~ {end_date_str})")
             
-            all_new_dfs = []
-            current_dt = start_dt
-            
             # 진행률 바
             progress_bar = status_placeholder.progress(0)
-            total_days = (end_dt - start_dt).days + 1
-            processed_days = 0
             
-            while current_dt <= end_dt:
-                base_date = current_dt.strftime("%Y%m%d")
-                
-                # 진행 상황 업데이트 (너무 빈번하지 않게)
-                if processed_days % 5 == 0:
-                     status.write(f"📥 수집 중... {base_date}")
-                
-                df_daily = collector.get_realized_profit(base_date=base_date)
-                
-                if df_daily is not None and not df_daily.empty:
-                    all_new_dfs.append(df_daily)
-                
-                current_dt += timedelta(days=1)
-                processed_days += 1
+            def on_progress(processed_days, total_days):
                 progress_bar.progress(processed_days / total_days)
-                
-                # API 부하 조절
-                time.sleep(0.2)
+            
+            # 기간 단위 수집 (ka10073 구간 조회)
+            new_df = collector.get_realized_profit_range(
+                start_date_str, end_date_str, progress_callback=on_progress
+            )
             
             progress_bar.empty()
             
-            if not all_new_dfs:
+            if new_df is None:
+                status.update(label="❌ 키움 API 데이터 수집 실패", state="error")
+                return False
+            
+            if new_df.empty:
                 status.update(label="⚠️ 해당 기간에 새로운 거래 내역이 없습니다.", state="complete")
                 time.sleep(2)
                 status_placeholder.empty()
                 return True
-                
-            # 전체 병합
-            new_df = pd.concat(all_new_dfs, ignore_index=True)
 
             status.write(f"✅ {len(new_df)}건의 새로운 데이터 수집 완료")
             
             # 4. 구글 시트 저장
             status.write("💾 구글 시트에 데이터 업로드 중...")
-            credentials_dict = dict(st.secrets["gcp_service_account"])
-            sheet_manager = GoogleSheetManager(credentials_dict=credentials_dict)
+            sheet_manager = GoogleSheetManager(client=get_sheet_client())
             
             sheet_name = st.secrets.get("sheet_name", "키움_실현손익_데이터")
             worksheet_name = st.secrets.get("worksheet_name", "실현손익")
             
+            # 로컬 저장소에도 누적 저장 (대시보드 빠른 로드 및 시트 장애 대비)
+            try:
+                LocalStore().upsert(new_df)
+            except Exception as e:
+                print(f"⚠️ 로컬 저장소 저장 실패: {e}")
+            
             if sheet_manager.open_sheet(sheet_name, worksheet_name):
-                if sheet_manager.upsert_data(new_df, key_column='날짜'):
+                # 원장에 저장한 뒤 원장 내용으로 시트 갱신 (조회한 날짜는 원장에서 통째로 교체)
+                with TradeLedger() as ledger:
+                    saved = sheet_manager.upsert_via_ledger(
+                        new_df, ledger, fetched_dates=trading_days(start_date_str, end_date_str)
+                    )
+                if saved:
                     status.update(label=f"🎉 {len(new_df)}건 동기화 성공! 대시보드를 갱신합니다.", state="complete")
-                    st.cache_data.clear()
+                    get_revision_cache().invalidate()
                     time.sleep(2)
                     status_placeholder.empty()
                     return True
@@ -486,30 +576,30 @@ def get_date_range(period, df):
         return None, None
 
 
-def plot_performance_chart(df, view_type='연도별', title='실현손익 추이'):
-    """연도별/월별/일별 실현손익 막대 차트"""
-    if df is None or df.empty or '실현손익' not in df.columns:
+def plot_performance_chart(summary, view_type='연도별', title='실현손익 추이'):
+    """
+    연도별/월별/일별 실현손익 막대 차트
+    
+    Args:
+        summary: RollupCube.years()/months()/days() 집계 결과
+        view_type: '연도별', '월별', '일별'
+        title: 차트 제목
+    """
+    if summary is None or summary.empty or '실현손익' not in summary.columns:
         return None
     
-    # 뷰 타입에 따른 데이터 집계 (정렬 키 포함)
-    plot_df = df.copy()
+    # 뷰 타입에 따른 축 라벨 (집계 결과는 이미 정렬되어 있음)
     if view_type == '연도별':
-        plot_df['sort_key'] = plot_df['날짜'].dt.year
-        plot_df['group'] = plot_df['sort_key'].astype(str) + "년"
-        x_label = '연도'
+        x_label, suffix = '연도', "년"
     elif view_type == '월별':
-        plot_df['sort_key'] = plot_df['날짜'].dt.month
-        plot_df['group'] = plot_df['sort_key'].astype(str) + "월"
-        x_label = '월'
+        x_label, suffix = '월', "월"
     else:  # 일별
-        plot_df['sort_key'] = plot_df['날짜'].dt.day
-        plot_df['group'] = plot_df['sort_key'].astype(str) + "일"
-        x_label = '일'
-        
-    # group과 x_label 매핑을 유지하며 sort_key로 정렬
-    chart_data = plot_df.groupby(['sort_key', 'group'])['실현손익'].sum().reset_index().sort_values('sort_key')
-    chart_data = chart_data[['group', '실현손익']]
-    chart_data.columns = [x_label, '실현손익']
+        x_label, suffix = '일', "일"
+    
+    chart_data = pd.DataFrame({
+        x_label: summary[x_label].astype(int).astype(str) + suffix,
+        '실현손익': summary['실현손익'],
+    })
     chart_data['실현손익_만원'] = chart_data['실현손익'] / 10000
     
     # Plotly 차트 생성
@@ -613,14 +703,18 @@ def plot_cumulative_profit(df):
     return fig
 
 
-def plot_stock_performance(df, top_n=None):
-    """종목별 수익 현황"""
-    if df is None or df.empty or '종목명' not in df.columns or '실현손익' not in df.columns:
+def plot_stock_performance(summary, top_n=None):
+    """
+    종목별 수익 현황
+    
+    Args:
+        summary: RollupCube.stocks() 집계 결과
+        top_n: 상위 N개 종목만 표시 (None이면 전체)
+    """
+    if summary is None or summary.empty:
         return None
     
-    # 종목별 집계
-    stock_summary = df.groupby('종목명')['실현손익'].agg(['sum', 'count']).reset_index()
-    stock_summary.columns = ['종목명', '총수익', '거래횟수']
+    stock_summary = summary.rename(columns={'실현손익': '총수익', '거래건수': '거래횟수'})
     stock_summary['총수익_만원'] = stock_summary['총수익'] / 10000  # 만원 단위로 변환
     stock_summary = stock_summary.sort_values('총수익_만원', ascending=True)
     
@@ -687,128 +781,54 @@ def plot_stock_performance(df, top_n=None):
     return fig
 
 
-def main():
-    """메인 앱"""
-    
-    # 헤더
-    # 헤더 섹션
-    st.markdown('<div class="main-header">Realized Profit Dashboard</div>', unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; color: var(--text-dim); margin-top: -0.5rem; margin-bottom: 2.5rem; font-size: 1.1rem;">키움증권 실현손익 프리미엄 대시보드</p>', unsafe_allow_html=True)
-    
-    # 데이터 로드
-    with st.spinner("데이터 로딩 중..."):
-        df = load_data()
+def show_render_time(section, started):
+    """
+    섹션 렌더링 시간 표시
     
-    if df is None:
-        st.error("❌ 데이터를 불러올 수 없습니다. Streamlit Secrets 설정을 확인하세요.")
-        st.stop()
+    fragment 섹션은 단독으로 다시 실행될 때도 이 값이 갱신되므로
+    전체 실행과 섹션 실행의 지연 시간을 비교할 수 있습니다.
     
-    if df.empty:
-        st.warning("⚠️ 아직 데이터가 없습니다. 키움 API에서 데이터를 수집해주세요.")
-        st.stop()
+    Args:
+        section: 섹션 이름
+        started: time.perf_counter()로 잰 렌더링 시작 시각
+    """
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.session_state.setdefault('render_times', {})[section] = elapsed_ms
+    st.caption(f"⏱️ {section} 렌더링 {elapsed_ms:,.0f}ms")
+
+
+def set_drilldown(year=None, month=None):
+    """
+    주요 지표 드릴다운 위치 변경 (버튼 on_click 콜백)
     
-    # Session state 초기화
-    if 'selected_year' not in st.session_state:
-        st.session_state.selected_year = None
-    if 'selected_month' not in st.session_state:
-        st.session_state.selected_month = None
+    콜백은 섹션이 다시 실행되기 전에 호출되므로 별도의 st.rerun() 없이
+    주요 지표 섹션만 한 번 다시 그려집니다.
     
-    # 사이드바 리뉴얼
-    with st.sidebar:
-        st.markdown('<h2 style="color: var(--primary); font-weight: 700;">Settings</h2>', unsafe_allow_html=True)
-        
-        # 1. 화면 새로고침 버튼
-        if st.button("🔄 Refresh Dashboard", use_container_width=True):
-            st.cache_data.clear()
-            st.rerun()
-        st.caption("구글 시트의 최신 데이터를 화면에 즉시 다시 불러옵니다.")
-        
-        st.markdown('<div style="margin: 0.8rem 0;"></div>', unsafe_allow_html=True)
-        
-        # 2. 키움 API 동기화 버튼
-        sync_btn = st.button("🚀 Sync Kiwoom API", use_container_width=True)
-        st.caption("키움증권에서 최근 15일간의 실현손익을 수집하여 시트와 동기화합니다.")
-            
-        if sync_btn:
-            if sync_with_kiwoom():
-                st.rerun()
-        
-        st.markdown('<div style="margin: 1.5rem 0; border-bottom: 1px solid rgba(0,0,0,0.05);"></div>', unsafe_allow_html=True)
+    Args:
+        year: 선택할 연도 (None이면 연도별 보기)
+        month: 선택할 월 (None이면 월별 보기)
+    """
+    st.session_state.selected_year = year
+    st.session_state.selected_month = month
 
-        # 3. 임시 IP 확인 (화이트리스트 설정용)
-        with st.expander("🌐 Cloud IP 확인", expanded=False):
-            try:
-                current_ip = requests.get('https://api.ipify.org', timeout=5).text
-                st.code(current_ip, language="bash")
-                st.caption("위 IP를 키움 API 설정의 '허용 IP'에 등록해 주세요. (주의: 배포 시마다 바뀔 수 있음)")
-            except:
-                st.error("IP 정보를 가져올 수 없습니다.")
-        
-        # 프리미엄 네비게이션 메뉴
-        st.markdown('<p style="font-weight: 600; color: var(--text-dim); margin-bottom: 0.5rem; font-size: 0.85rem; text-transform: uppercase; letter-spacing: 0.05em;">Navigation</p>', unsafe_allow_html=True)
-        
-        st.components.v1.html("""
-        <div id="nav-menu">
-            <button class="nav-item" onclick="scrollApp(0)">
-                <span class="icon">📈</span> Metrics
-            </button>
-            <button class="nav-item" onclick="scrollApp(1)">
-                <span class="icon">📋</span> Transactions
-            </button>
-            <button class="nav-item" onclick="scrollApp(2)">
-                <span class="icon">📊</span> Stocks
-            </button>
-        </div>
-        
-        <script>
-            function scrollApp(index) {
-                try {
-                    const mainSection = window.parent.document.querySelector('section.stMain');
-                    const expanders = window.parent.document.querySelectorAll('[data-testid="stExpander"]');
-                    if (expanders && expanders.length > index) {
-                        const target = expanders[index];
-                        const rect = target.getBoundingClientRect();
-                        const scrollTop = mainSection.scrollTop + rect.top - 100; // 100px 여백으로 타이틀바 확보
-                        
-                        mainSection.scrollTo({
-                            top: Math.max(0, scrollTop),
-                            behavior: 'smooth'
-                        });
-                    }
-                } catch (e) { console.error(e); }
-            }
-        </script>
-        
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@500&display=swap');
-            #nav-menu { display: flex; flex-direction: column; gap: 8px; font-family: 'Outfit', sans-serif; }
-            .nav-item {
-                display: flex; align-items: center; padding: 12px 16px; width: 100%;
-                background: rgba(79, 70, 229, 0.03); border: 1px solid transparent;
-                border-radius: 12px; color: #1E293B; cursor: pointer; font-size: 14px;
-                font-weight: 500; transition: all 0.2s; text-align: left;
-            }
-            .nav-item:hover {
-                background: rgba(79, 70, 229, 0.08); color: #4F46E5;
-                border: 1px solid rgba(79, 70, 229, 0.1); transform: translateX(4px);
-            }
-            .icon { margin-right: 12px; font-size: 16px; }
-        </style>
-        """, height=220)
-        
-        st.markdown('<div style="margin: 1rem 0; border-bottom: 1px solid rgba(0,0,0,0.05);"></div>', unsafe_allow_html=True)
-        
-        st.info("실시간 데이터 분석 시스템 v2.0")
+
+@st.fragment
+def render_metrics(df, cube):
+    """
+    주요 지표 섹션 (연도/월 드릴다운, 버튼 클릭 시 이 섹션만 다시 실행)
     
-    # 통계 계산
-    stats = calculate_statistics(df)
+    Args:
+        df: 전체 실현손익 DataFrame
+        cube: get_rollup()이 돌려준 집계 큐브 (없으면 None)
+    """
+    started = time.perf_counter()
     
     # 주요 지표 (접힘/펼침)
     metrics_container = st.container()
     with metrics_container:
         with st.expander("📈 주요 지표", expanded=True):
             # 연도별/월별/일별 통계 표시
-            if not df.empty and '날짜' in df.columns and '실현손익' in df.columns:
+            if cube is not None:
                 # 기간 및 네비게이션 행 (통합 - 수직 정렬 최적화)
                 p_col1, p_col2 = st.columns([7, 3], vertical_alignment="center")
                 with p_col1:
@@ -818,14 +838,11 @@ def main():
                 
                 with p_col2:
                     if st.session_state.selected_month is not None:
-                        if st.button("← 월별 보기", key="back_to_month", use_container_width=True):
-                            st.session_state.selected_month = None
-                            st.rerun()
+                        st.button("← 월별 보기", key="back_to_month", use_container_width=True,
+                                  on_click=set_drilldown, args=(st.session_state.selected_year,))
                     elif st.session_state.selected_year is not None:
-                        if st.button("← 연도별 보기", key="back_to_year", use_container_width=True):
-                            st.session_state.selected_year = None
-                            st.session_state.selected_month = None
-                            st.rerun()
+                        st.button("← 연도별 보기", key="back_to_year", use_container_width=True,
+                                  on_click=set_drilldown)
                 
                 # 정보 텍스트 (더 컴팩트하게)
                 if st.session_state.selected_month is not None:
@@ -835,15 +852,8 @@ def main():
                 
                 # 연도별 뷰
                 if st.session_state.selected_year is None:
-                    df_with_year = df.copy()
-                    df_with_year['연도'] = df_with_year['날짜'].dt.year
-                    
-                    # 연도별 그룹화
-                    yearly_stats = df_with_year.groupby('연도').agg({
-                        '실현손익': 'sum',
-                        '종목명': 'count'
-                    }).reset_index()
-                    yearly_stats.columns = ['연도', '실현손익', '거래건수']
+                    # 연도별 집계 (집계 큐브에서 조회)
+                    yearly_stats = cube.years()
                     
                     # 첫 거래 연도부터 현재 연도까지 모든 연도 생성
                     first_year = int(df['날짜'].min().year)
@@ -859,9 +869,8 @@ def main():
                     for idx, (col, (_, row)) in enumerate(zip(cols, yearly_stats.iterrows())):
                         year = int(row['연도'])
                         with col:
-                            if st.button(f"{year}", key=f"year_{year}", use_container_width=True):
-                                st.session_state.selected_year = year
-                                st.rerun()
+                            st.button(f"{year}", key=f"year_{year}", use_container_width=True,
+                                      on_click=set_drilldown, args=(year,))
                     
                     # HTML 테이블 생성
                     metrics_html = """<table class="metric-table">
@@ -901,7 +910,7 @@ def main():
                     st.markdown(metrics_html, unsafe_allow_html=True)
                     
                     # 연도별 차트 추가
-                    fig_yearly = plot_performance_chart(df_with_year, view_type='연도별', title='연도별 실현손익 현황')
+                    fig_yearly = plot_performance_chart(cube.years(), view_type='연도별', title='연도별 실현손익 현황')
                     if fig_yearly:
                         st.plotly_chart(fig_yearly, use_container_width=True)
                 
@@ -911,16 +920,8 @@ def main():
                     
                     if st.session_state.selected_month is None:
                         # --- 월별 뷰 ---
-                        # 선택된 연도의 데이터만 필터링
-                        year_df = df[df['날짜'].dt.year == selected_year].copy()
-                        year_df['월'] = year_df['날짜'].dt.month
-                        
-                        # 월별 그룹화
-                        monthly_stats = year_df.groupby('월').agg({
-                            '실현손익': 'sum',
-                            '종목명': 'count'
-                        }).reset_index()
-                        monthly_stats.columns = ['월', '실현손익', '거래건수']
+                        # 선택된 연도의 월별 집계 (집계 큐브에서 조회)
+                        monthly_stats = cube.months(selected_year)
                         
                         # 1월부터 12월까지 (또는 현재월까지) 모든 월 생성
                         current_year = pd.Timestamp.now().year
@@ -950,13 +951,13 @@ def main():
                                 for (_, row), col in zip(chunk.iterrows(), cols):
                                     m_val = int(row['월'])
                                     with col:
-                                        if st.button(
+                                        st.button(
                                             f"{m_val}월", 
                                             key=f"month_{m_val}", 
-                                            use_container_width=True
-                                        ):
-                                            st.session_state.selected_month = m_val
-                                            st.rerun()
+                                            use_container_width=True,
+                                            on_click=set_drilldown,
+                                            args=(selected_year, m_val)
+                                        )
                         
                         # HTML 테이블 생성
                         metrics_html = """<table class="metric-table">
@@ -995,7 +996,7 @@ def main():
                         st.markdown(metrics_html, unsafe_allow_html=True)
                         
                         # 월별 차트 추가
-                        fig_monthly = plot_performance_chart(year_df, view_type='월별', title=f'{selected_year}년 월별 실현손익 현황')
+                        fig_monthly = plot_performance_chart(cube.months(selected_year), view_type='월별', title=f'{selected_year}년 월별 실현손익 현황')
                         if fig_monthly:
                             st.plotly_chart(fig_monthly, use_container_width=True)
                     
@@ -1003,16 +1004,8 @@ def main():
                         # --- 일별 뷰 ---
                         selected_month = st.session_state.selected_month
                         
-                        # 해당 연도/월 데이터 필터링
-                        month_df = df[(df['날짜'].dt.year == selected_year) & (df['날짜'].dt.month == selected_month)].copy()
-                        month_df['일'] = month_df['날짜'].dt.day
-                        
-                        # 일별 그룹화
-                        daily_stats = month_df.groupby('일').agg({
-                            '실현손익': 'sum',
-                            '종목명': 'count'
-                        }).reset_index().sort_values('일')
-                        daily_stats.columns = ['일', '실현손익', '거래건수']
+                        # 해당 연도/월의 일별 집계 (집계 큐브에서 조회)
+                        daily_stats = cube.days(selected_year, selected_month)
                         
                         # HTML 테이블 생성
                         metrics_html = """<table class="metric-table">
@@ -1051,15 +1044,26 @@ def main():
                         st.markdown(metrics_html, unsafe_allow_html=True)
                         
                         # 일별 차트 추가
-                        fig_daily = plot_performance_chart(month_df, view_type='일별', title=f'{selected_year}년 {selected_month}월 일별 실현손익 현황')
+                        fig_daily = plot_performance_chart(daily_stats, view_type='일별', title=f'{selected_year}년 {selected_month}월 일별 실현손익 현황')
                         if fig_daily:
                             st.plotly_chart(fig_daily, use_container_width=True)
             else:
                 st.info("데이터가 없습니다.")
+    
+    show_render_time("주요 지표", started)
 
 
-
-    # 종목별 수익 (접힘/펼침)
+@st.fragment
+def render_transactions(df):
+    """
+    거래 내역 섹션 (기간/종목 선택 시 이 섹션만 다시 실행)
+    
+    Args:
+        df: 전체 실현손익 DataFrame
+    """
+    started = time.perf_counter()
+    
+    # 거래 내역 (접힘/펼침)
     transactions_container = st.container()
     with transactions_container:
         with st.expander("📋 거래 내역", expanded=True):
@@ -1164,18 +1168,147 @@ def main():
                 filtered_stats = calculate_statistics(filtered_df)
                 st.caption(f"필터링된 데이터: {filtered_stats['총_거래건수']}건 | 총 실현손익: {filtered_stats['총_실현손익']:,.0f}원")
     
+    show_render_time("거래 내역", started)
+
+
+def main():
+    """메인 앱"""
+    started = time.perf_counter()
+    
+    # 헤더
+    # 헤더 섹션
+    st.markdown('<div class="main-header">Realized Profit Dashboard</div>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: var(--text-dim); margin-top: -0.5rem; margin-bottom: 2.5rem; font-size: 1.1rem;">키움증권 실현손익 프리미엄 대시보드</p>', unsafe_allow_html=True)
+    
+    # 데이터 로드
+    with st.spinner("데이터 로딩 중..."):
+        df = load_data()
+    
+    if df is None:
+        st.error("❌ 데이터를 불러올 수 없습니다. Streamlit Secrets 설정을 확인하세요.")
+        st.stop()
+    
+    if df.empty:
+        st.warning("⚠️ 아직 데이터가 없습니다. 키움 API에서 데이터를 수집해주세요.")
+        st.stop()
+    
+    # Session state 초기화
+    if 'selected_year' not in st.session_state:
+        st.session_state.selected_year = None
+    if 'selected_month' not in st.session_state:
+        st.session_state.selected_month = None
+    
+    # 사이드바 리뉴얼
+    with st.sidebar:
+        st.markdown('<h2 style="color: var(--primary); font-weight: 700;">Settings</h2>', unsafe_allow_html=True)
+        
+        # 1. 화면 새로고침 버튼
+        if st.button("🔄 Refresh Dashboard", use_container_width=True):
+            get_revision_cache().invalidate()
+            st.rerun()
+        st.caption("구글 시트의 최신 데이터를 화면에 즉시 다시 불러옵니다.")
+        
+        st.markdown('<div style="margin: 0.8rem 0;"></div>', unsafe_allow_html=True)
+        
+        # 2. 키움 API 동기화 버튼
+        sync_btn = st.button("🚀 Sync Kiwoom API", use_container_width=True)
+        st.caption("키움증권에서 최근 15일간의 실현손익을 수집하여 시트와 동기화합니다.")
+            
+        if sync_btn:
+            if sync_with_kiwoom():
+                st.rerun()
+        
+        st.markdown('<div style="margin: 1.5rem 0; border-bottom: 1px solid rgba(0,0,0,0.05);"></div>', unsafe_allow_html=True)
+
+        # 3. 임시 IP 확인 (화이트리스트 설정용)
+        with st.expander("🌐 Cloud IP 확인", expanded=False):
+            try:
+                current_ip = requests.get('https://api.ipify.org', timeout=5).text
+                st.code(current_ip, language="bash")
+                st.caption("위 IP를 키움 API 설정의 '허용 IP'에 등록해 주세요. (주의: 배포 시마다 바뀔 수 있음)")
+            except:
+                st.error("IP 정보를 가져올 수 없습니다.")
+        
+        # 프리미엄 네비게이션 메뉴
+        st.markdown('<p style="font-weight: 600; color: var(--text-dim); margin-bottom: 0.5rem; font-size: 0.85rem; text-transform: uppercase; letter-spacing: 0.05em;">Navigation</p>', unsafe_allow_html=True)
+        
+        st.components.v1.html("""
+        <div id="nav-menu">
+            <button class="nav-item" onclick="scrollApp(0)">
+                <span class="icon">📈</span> Metrics
+            </button>
+            <button class="nav-item" onclick="scrollApp(1)">
+                <span class="icon">📋</span> Transactions
+            </button>
+            <button class="nav-item" onclick="scrollApp(2)">
+                <span class="icon">📊</span> Stocks
+            </button>
+        </div>
+        
+        <script>
+            function scrollApp(index) {
+                try {
+                    const mainSection = window.parent.document.querySelector('section.stMain');
+                    const expanders = window.parent.document.querySelectorAll('[data-testid="stExpander"]');
+                    if (expanders && expanders.length > index) {
+                        const target = expanders[index];
+                        const rect = target.getBoundingClientRect();
+                        const scrollTop = mainSection.scrollTop + rect.top - 100; // 100px 여백으로 타이틀바 확보
+                        
+                        mainSection.scrollTo({
+                            top: Math.max(0, scrollTop),
+                            behavior: 'smooth'
+                        });
+                    }
+                } catch (e) { console.error(e); }
+            }
+        </script>
+        
+        <style>
+            @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@500&display=swap');
+            #nav-menu { display: flex; flex-direction: column; gap: 8px; font-family: 'Outfit', sans-serif; }
+            .nav-item {
+                display: flex; align-items: center; padding: 12px 16px; width: 100%;
+                background: rgba(79, 70, 229, 0.03); border: 1px solid transparent;
+                border-radius: 12px; color: #1E293B; cursor: pointer; font-size: 14px;
+                font-weight: 500; transition: all 0.2s; text-align: left;
+            }
+            .nav-item:hover {
+                background: rgba(79, 70, 229, 0.08); color: #4F46E5;
+                border: 1px solid rgba(79, 70, 229, 0.1); transform: translateX(4px);
+            }
+            .icon { margin-right: 12px; font-size: 16px; }
+        </style>
+        """, height=220)
+        
+        st.markdown('<div style="margin: 1rem 0; border-bottom: 1px solid rgba(0,0,0,0.05);"></div>', unsafe_allow_html=True)
+        
+        st.info("실시간 데이터 분석 시스템 v2.0")
+    
+    # 통계 계산
+    stats = calculate_statistics(df)
+    
+    # 연도/월/일/종목별 집계 (데이터 버전당 한 번만 계산해 모든 세션이 공유)
+    cube = get_rollup(df)
+    
+    # 주요 지표 (연도/월 버튼은 이 섹션만 다시 실행)
+    render_metrics(df, cube)
+    
+    # 거래 내역 (기간/종목 선택은 이 섹션만 다시 실행)
+    render_transactions(df)
     
     # 종목별 수익 (접힘/펼침)
     stocks_container = st.container()
     with stocks_container:
         with st.expander("📊 종목별 실현손익", expanded=True):
             # Top 10 종목 고정 표시
-            fig_stock = plot_stock_performance(df, top_n=10)
+            fig_stock = plot_stock_performance(cube.stocks() if cube is not None else None, top_n=10)
             if fig_stock:
                 st.plotly_chart(fig_stock, use_container_width=True)
     
-    # 푸터
+    # 푸터 (전체 실행 시간은 섹션만 다시 실행될 때는 갱신되지 않음)
     st.caption(f"마지막 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    show_render_time("전체", started)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""
+테스트 공용 설정
+
+모듈이 저장소 최상위에 있으므로 경로를 추가하고,
+구글 시트 API 대신 메모리에서 동작하는 가짜 워크시트를 제공합니다.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeWorksheet:
+    """셀 값을 2차원 리스트로 보관하는 워크시트 (upsert/diff 경로에서 쓰는 메서드만 구현)"""
+
+    id = 0
+
+    def __init__(self, rows=()):
+        self.grid = [list(row) for row in rows]
+
+    def get_all_values(self, value_render_option=None):
+        return [list(row) for row in self.grid]
+
+    def clear(self):
+        self.grid = []
+
+    def update(self, values):
+        self.grid = [list(row) for row in values]
+
+    def format(self, range_name, fmt):
+        pass
+
+
+class FakeSpreadsheet:
+    """batch_update의 행 삽입/삭제/셀 갱신 요청을 FakeWorksheet에 적용"""
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def batch_update(self, body):
+        grid = self.worksheet.grid
+        for request in body['requests']:
+            if 'insertDimension' in request:
+                rng = request['insertDimension']['range']
+                grid[rng['startIndex']:rng['startIndex']] = [[] for _ in range(rng['endIndex'] - rng['startIndex'])]
+            elif 'deleteDimension' in request:
+                rng = request['deleteDimension']['range']
+                del grid[rng['startIndex']:rng['endIndex']]
+            elif 'updateCells' in request:
+                update = request['updateCells']
+                start = update['start']['rowIndex']
+                for offset, row in enumerate(update['rows']):
+                    grid[start + offset] = [
+                        next(iter(cell['userEnteredValue'].values())) if cell else '' for cell in row['values']
+                    ]
+
+
+@pytest.fixture
+def sheet_manager():
+    """가짜 워크시트가 열린 GoogleSheetManager (연도별 요약 시트 갱신은 기록만 함)"""
+    from google_sheet_manager import GoogleSheetManager
+
+    def make(rows=()):
+        manager = GoogleSheetManager(client=object())
+        manager.worksheet = FakeWorksheet(rows)
+        manager.sheet = FakeSpreadsheet(manager.worksheet)
+        manager.summary_calls = []
+        manager.update_yearly_summaries = lambda df, years=None: manager.summary_calls.append((len(df), years))
+        return manager
+
+    return make
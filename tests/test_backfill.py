@@ -0,0 +1,57 @@
+"""run_resumable_backfill 테스트 (진행 기록된 날짜를 다시 조회하지 않는지)"""
+
+import pandas as pd
+
+from backfill import pending_runs, run_resumable_backfill
+
+
+class FakeCollector:
+    account_number = "1234"
+
+    def __init__(self):
+        self.requests = []
+
+    def get_realized_profit_range(self, start_date, end_date):
+        self.requests.append((start_date, end_date))
+        return pd.DataFrame({'날짜': [pd.Timestamp(start_date)], '실현손익': [100]})
+
+
+class FakeJournal:
+    def __init__(self, done):
+        self.done = {day: {} for day in done}
+        self.recorded = []
+
+    def completed(self, account):
+        return dict(self.done)
+
+    def record(self, account, days, df):
+        self.recorded.extend(days)
+
+
+class FakeManager:
+    def __init__(self):
+        self.saved = []
+
+    def upsert_data(self, df):
+        self.saved.append(df)
+        return True
+
+
+def test_pending_runs_split_around_done_days():
+    days = ['20240102', '20240103', '20240104', '20240105', '20240108']
+
+    assert pending_runs(days, {'20240104'}) == [['20240102', '20240103'], ['20240105', '20240108']]
+    assert pending_runs(days, set(days)) == []
+
+
+def test_journaled_days_between_pending_days_are_not_fetched():
+    collector = FakeCollector()
+    journal = FakeJournal(done=['20240103', '20240104'])
+    manager = FakeManager()
+
+    stats = run_resumable_backfill(collector, '20240102', '20240105', manager, journal, shard_months=1)
+
+    assert collector.requests == [('20240102', '20240102'), ('20240105', '20240105')]
+    assert stats[0]['상태'] == '성공' and stats[0]['건수'] == 2
+    assert journal.recorded == ['20240102', '20240105']
+    assert len(manager.saved) == 1
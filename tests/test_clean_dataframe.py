@@ -0,0 +1,42 @@
+"""KiwoomRestCollector._clean_dataframe 타입 변환 테스트"""
+
+import pandas as pd
+
+from google_sheet_manager import _to_sheet_rows
+from kiwoom_collector import KiwoomRestCollector
+
+
+def _raw(**overrides):
+    row = {
+        'dt': '20240102', 'stk_nm': '삼성전자', 'stk_cd': 'A005930', 'buy_uv': '70,000',
+        'cntr_pric': '71,000', 'cntr_qty': '10', 'tdy_sel_pl': '+10,000', 'pl_rt': '+12.21%',
+        'tdy_trde_cmsn': '150', 'tdy_trde_tax': '1,500',
+    }
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+def _clean(raw):
+    return KiwoomRestCollector("", "", response_cache=False)._clean_dataframe(raw)
+
+
+def test_rate_keeps_written_precision():
+    df = _clean(_raw())
+
+    assert df['수익률'].dtype == 'float64'
+    header, rows = _to_sheet_rows(df)
+    assert rows[0][header.index('수익률')] == 12.21
+
+
+def test_missing_amount_stays_missing():
+    df = _clean(_raw(tdy_trde_cmsn=''))
+
+    assert df['수수료'].isna().all()
+    assert df['수수료_제세금'].tolist() == [1500]
+    assert df['실현손익'].tolist() == [10000]
+
+
+def test_rows_without_sell_quantity_are_dropped():
+    raw = pd.concat([_raw(), _raw(cntr_qty=''), _raw(cntr_qty='0')], ignore_index=True)
+
+    assert len(_clean(raw)) == 1
@@ -0,0 +1,108 @@
+"""GoogleSheetManager.upsert_data 회귀 테스트 (기존 행이 사라지지 않는지)"""
+
+import pandas as pd
+
+HISTORY_HEADER = ['날짜', '종목명', '종목코드', '매도평균가', '매도수량', '실현손익', '수익률']
+HISTORY_ROWS = [
+    ['2023-12-28', '삼성전자', '005930', 71000, 10, 12000, 1.72],
+    ['2023-12-27', 'NAVER', '035420', 200000, 2, -5000, -1.23],
+]
+
+
+def _sample_data():
+    """run_pipeline.py --test 샘플 데이터와 같은 컬럼 구성 (매도평균가/매도수량 없음)"""
+    return pd.DataFrame({
+        '날짜': pd.date_range(start='2024-01-01', periods=3, freq='D'),
+        '종목명': ['삼성전자', 'SK하이닉스', 'NAVER'],
+        '종목코드': ['005930', '000660', '035420'],
+        '체결가': [70000, 120000, 180000],
+        '체결량': [10, 5, 3],
+        '실현손익': [50000, -20000, 30000],
+        '수익률': [7.14, -1.64, 2.00],
+    })
+
+
+def _sheet_frame(manager):
+    grid = manager.worksheet.grid
+    return pd.DataFrame([row + [''] * (len(grid[0]) - len(row)) for row in grid[1:]], columns=grid[0])
+
+
+def test_different_columns_keep_existing_rows(sheet_manager):
+    manager = sheet_manager([HISTORY_HEADER] + HISTORY_ROWS)
+
+    assert manager.upsert_data(_sample_data())
+
+    sheet = _sheet_frame(manager)
+    assert len(sheet) == 5
+    assert set(HISTORY_HEADER) | {'체결가', '체결량'} == set(sheet.columns)
+    assert {'2023-12-28', '2023-12-27'} <= set(sheet['날짜'])
+    assert sheet['날짜'].tolist() == sorted(sheet['날짜'], reverse=True)
+
+
+def test_different_columns_replace_same_date(sheet_manager):
+    history = [HISTORY_HEADER, ['2024-01-01', '카카오', '035720', 50000, 1, 100, 0.5]] + HISTORY_ROWS
+    manager = sheet_manager(history)
+
+    assert manager.upsert_data(_sample_data())
+
+    sheet = _sheet_frame(manager)
+    assert len(sheet) == 5
+    assert '카카오' not in set(sheet['종목명'])
+
+
+def test_empty_sheet_writes_new_rows(sheet_manager):
+    manager = sheet_manager()
+
+    assert manager.upsert_data(_sample_data())
+
+    assert len(manager.worksheet.grid) == 4
+
+
+def test_same_columns_keep_rest_of_day(sheet_manager):
+    manager = sheet_manager([HISTORY_HEADER] + HISTORY_ROWS)
+    new = pd.DataFrame([['2023-12-28', '카카오', '035720', 50000, 3, 700, 0.47]], columns=HISTORY_HEADER)
+    new['날짜'] = pd.to_datetime(new['날짜'])
+
+    assert manager.upsert_data(new)
+
+    sheet = _sheet_frame(manager)
+    assert len(sheet) == 3
+    assert sheet['종목명'].tolist()[:2] == ['삼성전자', '카카오']
+
+
+def test_blank_interior_row_does_not_shift_writes(sheet_manager):
+    manager = sheet_manager([HISTORY_HEADER, HISTORY_ROWS[0], ['', '', '', '', '', '', ''], HISTORY_ROWS[1]])
+    corrected = pd.DataFrame([['2023-12-27', 'NAVER', '035420', 200000, 2, -4000, -0.98]], columns=HISTORY_HEADER)
+    corrected['날짜'] = pd.to_datetime(corrected['날짜'])
+
+    assert manager.upsert_data(corrected)
+
+    sheet = _sheet_frame(manager)
+    assert sheet['종목명'].tolist() == ['삼성전자', 'NAVER']
+    assert sheet['실현손익'].tolist() == [12000, -4000]
+
+
+def test_row_diff_reproduces_target_rows():
+    import random
+
+    from google_sheet_manager import _row_diff_requests, _row_ids
+    from conftest import FakeSpreadsheet, FakeWorksheet
+
+    rng = random.Random(0)
+    pool = [['2024-01-%02d' % day, name, code, price, qty, rng.randint(-9, 9) * 1000, 0.5]
+            for day in range(1, 10) for name, code, price, qty in
+            [('삼성전자', '005930', 71000, 10), ('NAVER', '035420', 200000, 2)]]
+    for _ in range(100):
+        old = [list(row) for row in rng.sample(pool, rng.randint(0, 12))]
+        for _ in range(rng.randint(0, 2)):
+            old.insert(rng.randint(0, len(old)), [''] * 7)
+        new = [list(row) for row in rng.sample(pool, rng.randint(0, 12))]
+        for row in new:
+            if rng.random() < 0.2:
+                row[5] += 1
+
+        worksheet = FakeWorksheet([HISTORY_HEADER] + old)
+        requests, _ = _row_diff_requests(0, old, new, 0, _row_ids(HISTORY_HEADER, old), _row_ids(HISTORY_HEADER, new))
+        FakeSpreadsheet(worksheet).batch_update({"requests": requests})
+
+        assert worksheet.grid == [HISTORY_HEADER] + new
@@ -0,0 +1,51 @@
+"""KiwoomRestCollector.iter_realized_profit_pages 테스트 (구간 단위로 완성된 조각만 넘기는지)"""
+
+from kiwoom_collector import KiwoomRestCollector
+
+
+def _record(day, qty, with_dt=True):
+    record = {'stk_nm': '삼성전자', 'stk_cd': 'A005930', 'buy_uv': '70000', 'cntr_pric': '71000',
+              'cntr_qty': str(qty), 'tdy_sel_pl': '10000', 'pl_rt': '1.43', 'tdy_trde_cmsn': '10',
+              'tdy_trde_tax': '100'}
+    if with_dt:
+        record['dt'] = day
+    return record
+
+
+class PagedCollector(KiwoomRestCollector):
+    """다일 구간 조회 시 두 번째 페이지에만 dt 필드가 빠지는 응답"""
+
+    def __init__(self):
+        super().__init__("", "", response_cache=False)
+        self.requests = []
+
+    def _check_token_validity(self):
+        return True
+
+    def _load_cached_days(self, start_date, end_date):
+        return {}
+
+    def _store_cached_days(self, records_by_date):
+        pass
+
+    def _print_rate_stats(self):
+        pass
+
+    def _iter_ka10073_pages(self, strt_dt, end_dt):
+        self.requests.append((strt_dt, end_dt))
+        if strt_dt != end_dt:
+            yield [_record(strt_dt, 1)]
+            yield [_record(end_dt, 2, with_dt=False)]
+        else:
+            yield [_record(strt_dt, 1)]
+
+
+def test_missing_dt_on_later_page_falls_back_without_partial_chunks():
+    collector = PagedCollector()
+
+    chunks = list(collector.iter_realized_profit_pages('20240102', '20240105'))
+
+    dates = sorted(str(day.date()) for chunk in chunks for day in chunk['날짜'])
+    assert dates == ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+    assert collector.requests[0] == ('20240102', '20240105')
+    assert collector.requests[1] == ('20240102', '20240102')
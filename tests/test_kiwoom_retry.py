@@ -0,0 +1,93 @@
+"""KiwoomRestCollector._post 재시도 대기 테스트"""
+
+import pytest
+
+import kiwoom_collector
+from kiwoom_collector import KiwoomRestCollector
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, payload=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"{}"
+        self._payload = payload or {"return_code": 0}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def post(self, url, json=None, headers=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class FakeLimiter:
+    rate = 5.0
+
+    def __init__(self):
+        self.events = []
+
+    def acquire(self):
+        pass
+
+    def on_throttle(self):
+        self.events.append('throttle')
+
+    def on_success(self):
+        self.events.append('success')
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(kiwoom_collector.time, "sleep", recorded.append)
+    return recorded
+
+
+def _collector(responses):
+    return KiwoomRestCollector("", "", session=FakeSession(responses), rate_limiter=FakeLimiter(),
+                               response_cache=False)
+
+
+def test_backoff_grows_between_retries(sleeps):
+    collector = _collector([FakeResponse(429), FakeResponse(503), FakeResponse(429), FakeResponse(200)])
+
+    response = collector._post("https://example.invalid/api/dostk/acnt", {}, {"api-id": "ka10073"})
+
+    assert response.status_code == 200
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        base = collector.RETRY_BASE_DELAY * 2 ** attempt
+        assert base / 2 <= delay <= base
+
+
+def test_retry_after_header_is_honoured(sleeps):
+    collector = _collector([FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(200)])
+
+    collector._post("https://example.invalid/api/dostk/acnt", {}, {"api-id": "ka10073"})
+
+    assert sleeps == [7.0]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    collector = _collector([FakeResponse(429)] * (KiwoomRestCollector.MAX_RETRIES + 1))
+
+    response = collector._post("https://example.invalid/api/dostk/acnt", {}, {"api-id": "ka10073"})
+
+    assert response.status_code == 429
+    assert len(sleeps) == KiwoomRestCollector.MAX_RETRIES
+
+
+def test_client_errors_do_not_raise_rate(sleeps):
+    collector = _collector([FakeResponse(401), FakeResponse(400), FakeResponse(200)])
+    url = "https://example.invalid/api/dostk/acnt"
+
+    assert [collector._post(url, {}, {"api-id": "ka10073"}).status_code for _ in range(3)] == [401, 400, 200]
+
+    assert collector.rate_limiter.events == ['success']
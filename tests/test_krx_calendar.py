@@ -0,0 +1,20 @@
+"""KRX 휴장일 달력 테스트"""
+
+from datetime import date
+
+from krx_calendar import is_trading_day, trading_days
+
+
+def test_weekends_and_holidays_are_skipped():
+    # 2024-02-09 ~ 12 설날 연휴, 10~11일은 주말
+    assert trading_days('20240207', '20240214') == ['20240207', '20240208', '20240213', '20240214']
+
+
+def test_is_trading_day_accepts_dates():
+    assert is_trading_day(date(2024, 1, 2))
+    assert not is_trading_day('20240101')
+    assert not is_trading_day('20240106')
+
+
+def test_empty_range():
+    assert trading_days('20240105', '20240102') == []
@@ -0,0 +1,87 @@
+"""원장 기반 시트 동기화 회귀 테스트 (다른 원장이 쓴 행을 지우지 않는지)"""
+
+import pandas as pd
+import pytest
+
+from ledger import TradeLedger
+
+HEADER = ['날짜', '종목명', '종목코드', '매수평균가', '매도평균가', '매도수량', '실현손익', '수익률',
+          '수수료', '제세금', '매수수량', '매수금액', '매도금액', '수수료_제세금']
+
+
+def _trade(date, name, code, price, qty, profit):
+    return [date, name, code, price - 100, price, qty, profit, 1.5, 10, 20, qty, (price - 100) * qty, price * qty, 30]
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with TradeLedger(str(tmp_path / "ledger.sqlite3")) as ledger:
+        yield ledger
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows, columns=HEADER)
+    df['날짜'] = pd.to_datetime(df['날짜'])
+    return df
+
+
+def test_rows_from_other_writer_survive(sheet_manager, ledger):
+    # 이 원장에는 1/2 거래만 있고, 시트에는 다른 쪽에서 추가한 1/3 거래가 있음
+    ledger.upsert(_frame([_trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)]))
+    manager = sheet_manager([HEADER,
+                             _trade('2024-01-03', 'NAVER', '035420', 180000, 2, 7000),
+                             _trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)])
+
+    assert manager.upsert_via_ledger(_frame([_trade('2024-01-04', '카카오', '035720', 50000, 3, 900)]), ledger)
+
+    dates = [row[0] for row in manager.worksheet.grid[1:]]
+    assert dates == ['2024-01-04', '2024-01-03', '2024-01-02']
+    assert ledger.count() == 3
+
+
+def test_duplicate_fills_are_not_doubled(sheet_manager, ledger):
+    fill = _trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)
+    ledger.upsert(_frame([fill, fill]))
+    manager = sheet_manager([HEADER, fill, fill])
+
+    assert manager.sync_from_ledger(ledger)
+
+    assert ledger.count() == 2
+    assert len(manager.worksheet.grid) == 3
+
+
+def test_sheet_with_other_columns_keeps_rows(sheet_manager, ledger):
+    manager = sheet_manager([['날짜', '종목명', '실현손익'], ['2023-12-01', 'NAVER', 100]])
+
+    assert manager.upsert_via_ledger(_frame([_trade('2024-01-04', '카카오', '035720', 50000, 3, 900)]), ledger)
+
+    dates = [row[0] for row in manager.worksheet.grid[1:]]
+    assert dates == ['2024-01-04', '2023-12-01']
+
+
+def test_corrected_trade_replaces_stale_row(sheet_manager, ledger):
+    # 1/2 매도 체결가가 정정되어 거래 키가 바뀐 경우 (옛 행은 원장과 시트 모두에서 사라져야 함)
+    stale = _trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)
+    other_day = _trade('2024-01-03', 'NAVER', '035420', 180000, 2, 7000)
+    ledger.upsert(_frame([stale]), replace_dates=['20240102'])
+    manager = sheet_manager([HEADER, other_day, stale])
+
+    corrected = _trade('2024-01-02', '삼성전자', '005930', 70500, 10, 5500)
+    assert manager.upsert_via_ledger(_frame([corrected]), ledger, fetched_dates=['20240102'])
+
+    assert [row[4] for row in manager.worksheet.grid[1:]] == [180000, 70500]
+    assert ledger.read()['매도평균가'].tolist() == [70500, 180000]
+
+    # 다음 동기화에서도 옛 행이 시트에서 다시 합쳐지지 않음
+    assert manager.sync_from_ledger(ledger)
+    assert ledger.count() == 2
+
+
+def test_refetched_day_without_trades_is_cleared(sheet_manager, ledger):
+    ledger.upsert(_frame([_trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)]))
+    manager = sheet_manager([HEADER, _trade('2024-01-02', '삼성전자', '005930', 70000, 10, 5000)])
+
+    new = _frame([_trade('2024-01-03', 'NAVER', '035420', 180000, 2, 7000)])
+    assert manager.upsert_via_ledger(new, ledger, fetched_dates=['20240102', '20240103'])
+
+    assert [row[0] for row in manager.worksheet.grid[1:]] == ['2024-01-03']
@@ -0,0 +1,63 @@
+"""LocalStore Upsert 회귀 테스트 (같은 날 다른 거래와 중복 체결이 사라지지 않는지)"""
+
+import os
+
+import pandas as pd
+
+from local_store import LocalStore
+
+
+def _trades(rows):
+    return pd.DataFrame({
+        '날짜': pd.to_datetime([row[0] for row in rows]),
+        '종목명': [row[1] for row in rows],
+        '종목코드': [row[2] for row in rows],
+        '매도평균가': [row[3] for row in rows],
+        '매도수량': [row[4] for row in rows],
+        '실현손익': [row[5] for row in rows],
+    })
+
+
+def test_first_write_creates_store(tmp_path):
+    store = LocalStore(root=str(tmp_path / "store"))
+
+    store.upsert(_trades([('2024-01-02', '삼성전자', '005930', 71000, 10, 100)]))
+
+    assert os.path.isdir(store.root)
+    assert len(store.read()) == 1
+
+
+def test_partial_day_upsert_keeps_other_trades(tmp_path):
+    store = LocalStore(root=str(tmp_path / "store"))
+    store.upsert(_trades([
+        ('2024-01-02', '삼성전자', '005930', 71000, 10, 100),
+        ('2024-01-02', 'NAVER', '035420', 180000, 2, 200),
+    ]))
+
+    # 같은 날 한 거래만 다시 조회 (손익 정정)
+    store.upsert(_trades([('2024-01-02', 'NAVER', '035420', 180000, 2, 250)]))
+
+    df = store.read().sort_values('종목명', ignore_index=True)
+    assert df['종목명'].astype(str).tolist() == ['NAVER', '삼성전자']
+    assert df['실현손익'].tolist() == [250, 100]
+
+
+def test_duplicate_fills_are_kept_and_not_doubled(tmp_path):
+    store = LocalStore(root=str(tmp_path / "store"))
+    fills = _trades([('2024-01-02', '삼성전자', '005930', 71000, 10, 100)] * 2)
+
+    store.upsert(fills)
+    store.upsert(fills)
+
+    assert len(store.read()) == 2
+
+
+def test_streaming_writer_matches_single_upsert(tmp_path):
+    store = LocalStore(root=str(tmp_path / "store"))
+    fills = _trades([('2024-01-02', '삼성전자', '005930', 71000, 10, 100)] * 3)
+
+    writer = store.open_writer()
+    writer.write(fills.iloc[:2])
+    writer.write(fills.iloc[2:])
+
+    assert len(store.read()) == 3
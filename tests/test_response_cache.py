@@ -0,0 +1,40 @@
+"""키움 응답 캐시 테스트 (디렉터리 지연 생성, 캐시 적중 시 index.json 재기록 생략)"""
+
+import os
+
+import response_cache
+from response_cache import ResponseCache
+
+RECORDS = {'20200102': [{'dt': '20200102', 'stk_cd': '005930'}], '20200103': []}
+
+
+def test_constructing_cache_creates_nothing(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ResponseCache(cache_dir=str(cache_dir))
+
+    assert cache.get_many('acct', 'ka10073', list(RECORDS)) == {}
+    assert not cache_dir.exists()
+
+
+def test_put_then_get(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path / "cache"))
+
+    cache.put_many('acct', 'ka10073', RECORDS)
+
+    assert cache.get_many('acct', 'ka10073', list(RECORDS)) == RECORDS
+
+
+def test_warm_hits_do_not_rewrite_index(tmp_path, monkeypatch):
+    cache = ResponseCache(cache_dir=str(tmp_path / "cache"))
+    cache.put_many('acct', 'ka10073', RECORDS)
+    writes = []
+    monkeypatch.setattr(cache, '_write_index', writes.append)
+
+    cache.get_many('acct', 'ka10073', list(RECORDS))
+    assert writes == []
+
+    # 갱신 단위보다 오래된 항목은 마지막 사용 시각을 갱신
+    monkeypatch.setattr(response_cache, 'ACCESS_TIME_RESOLUTION', 0)
+    cache.get_many('acct', 'ka10073', list(RECORDS))
+    assert len(writes) == 1
+    assert os.path.exists(cache.index_path)
@@ -0,0 +1,55 @@
+"""RevisionCache 테스트 (리비전 기반 재사용, 세션별 사본)"""
+
+import pandas as pd
+
+from revision_cache import RevisionCache
+
+
+class CountingSource:
+    def __init__(self):
+        self.rev = 1
+        self.loads = 0
+
+    def revision(self):
+        return self.rev
+
+    def load(self):
+        self.loads += 1
+        return pd.DataFrame({'날짜': pd.to_datetime(['2024-01-02', '2024-01-03']), '실현손익': [100, 200]})
+
+
+def test_reloads_only_when_revision_changes():
+    cache = RevisionCache()
+    source = CountingSource()
+
+    cache.get('k', source)
+    cache.get('k', source)
+    assert source.loads == 1
+
+    source.rev = 2
+    cache.get('k', source)
+    assert source.loads == 2
+
+
+def test_session_changes_do_not_leak_into_shared_frame():
+    cache = RevisionCache()
+    source = CountingSource()
+
+    first = cache.get('k', source)
+    first['연도'] = first['날짜'].dt.year
+    first.loc[0, '실현손익'] = -1
+
+    second = cache.get('k', source)
+    assert list(second.columns) == ['날짜', '실현손익']
+    assert second['실현손익'].tolist() == [100, 200]
+
+
+def test_data_version_changes_with_reload():
+    cache = RevisionCache()
+    source = CountingSource()
+
+    version = cache.get('k', source).attrs['data_version']
+    assert cache.get('k', source).attrs['data_version'] == version
+
+    source.rev = 2
+    assert cache.get('k', source).attrs['data_version'] != version
@@ -0,0 +1,45 @@
+"""거래 고유 키와 TradeIndex 테스트"""
+
+import pandas as pd
+
+from trade_index import TradeIndex, normalize_codes, trade_keys
+
+
+def _frame(codes, qty):
+    return pd.DataFrame({
+        '날짜': pd.to_datetime(['2024-01-02'] * len(codes)),
+        '종목코드': codes,
+        '매도평균가': [71000] * len(codes),
+        '매도수량': qty,
+    })
+
+
+def test_codes_are_normalized():
+    assert normalize_codes(pd.Series(['A005930', 5930, '035420'])).tolist() == ['005930', '005930', '035420']
+
+
+def test_duplicate_fills_get_sequence_numbers():
+    keys = trade_keys(_frame(['005930', 'A005930', '005930'], [10, 10, 5]))
+
+    assert [key[-1] for key in keys] == [0, 1, 0]
+    assert keys[0][:4] == keys[1][:4]
+
+
+def test_sequence_continues_across_chunks():
+    offsets = {}
+    first = trade_keys(_frame(['005930'], [10]), offsets=offsets)
+    second = trade_keys(_frame(['005930'], [10]), offsets=offsets)
+
+    assert first[0][-1] == 0 and second[0][-1] == 1
+
+
+def test_upsert_frame_replaces_in_place_and_appends():
+    existing = _frame(['005930', '035420'], [10, 2]).assign(실현손익=[100, 200])
+    index = TradeIndex.from_frame(existing)
+    new = _frame(['035420', '000660'], [2, 1]).assign(실현손익=[250, 300])
+
+    merged, replaced, inserted = index.upsert_frame(existing, new, trade_keys(new))
+
+    assert (replaced, inserted) == (1, 1)
+    assert merged['실현손익'].tolist() == [100, 250, 300]
+    assert len(index) == 3
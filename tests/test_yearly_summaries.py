@@ -0,0 +1,63 @@
+"""연도별 요약 시트 갱신 테스트 (행이 모두 삭제된 연도의 옛 합계가 남지 않는지)"""
+
+import pandas as pd
+
+from google_sheet_manager import GoogleSheetManager
+
+
+class RecordingWorksheet:
+    def __init__(self, title, sheet_id):
+        self.title = title
+        self.id = sheet_id
+        self.row_count = 1000
+
+
+class RecordingSpreadsheet:
+    """연도 시트 목록을 돌려주고 batch_update 요청을 기록"""
+
+    def __init__(self, titles):
+        self._worksheets = [RecordingWorksheet(title, sheet_id) for sheet_id, title in enumerate(titles, start=1)]
+        self.requests = []
+
+    def worksheets(self):
+        return self._worksheets
+
+    def batch_update(self, body):
+        self.requests.extend(body['requests'])
+
+
+def _manager(titles):
+    manager = GoogleSheetManager(client=object())
+    manager.sheet = RecordingSpreadsheet(titles)
+    return manager
+
+
+def _written_sheets(requests):
+    """값을 쓴 시트 ID (updateCells start)와 값을 비운 시트 ID (updateCells range)"""
+    written = {r['updateCells']['start']['sheetId'] for r in requests if 'start' in r.get('updateCells', {})}
+    cleared = {r['updateCells']['range']['sheetId'] for r in requests if 'range' in r.get('updateCells', {})}
+    return written, cleared
+
+
+def _profit(dates):
+    return pd.DataFrame({'날짜': pd.to_datetime(dates), '실현손익': [1000] * len(dates)})
+
+
+def test_year_without_rows_is_cleared():
+    manager = _manager(['실현손익', '2024', '2023'])
+
+    manager.update_yearly_summaries(_profit(['2024-01-02']), years={2023, 2024})
+
+    written, cleared = _written_sheets(manager.sheet.requests)
+    assert written == {2}
+    assert cleared == {2, 3}
+
+
+def test_full_rewrite_clears_orphan_year_tabs():
+    manager = _manager(['실현손익', '2024', '2023'])
+
+    manager.update_yearly_summaries(_profit(['2024-01-02']))
+
+    written, cleared = _written_sheets(manager.sheet.requests)
+    assert written == {2}
+    assert 3 in cleared and 1 not in cleared
@@ -0,0 +1,86 @@
+"""
+키움 REST API OAuth 토큰 캐시 모듈
+
+발급받은 토큰을 App Key별로 파일에 저장하여, 같은 날 실행되는
+스케줄러/대시보드/일괄 수집 프로세스가 하나의 토큰을 함께 사용하도록 합니다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from file_lock import FileLock, atomic_write
+try:
+    from config import TOKEN_CACHE_FILE
+except ImportError:
+    TOKEN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".kiwoom_token.json")
+
+
+class TokenStore:
+    """파일 기반 토큰 저장소 (여러 프로세스 동시 사용 가능)"""
+
+    def __init__(self, path=TOKEN_CACHE_FILE):
+        """
+        초기화
+
+        Args:
+            path: 토큰 캐시 파일 경로
+        """
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+
+    @staticmethod
+    def _key(app_key, base_url):
+        """캐시 키 (App Key 원문은 파일에 남기지 않음)"""
+        return hashlib.sha256(f"{base_url}|{app_key}".encode("utf-8")).hexdigest()
+
+    def _read_all(self):
+        """캐시 파일 전체 읽기 (없거나 손상된 경우 빈 딕셔너리)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def load(self, app_key, base_url=""):
+        """
+        저장된 토큰 조회
+
+        Returns:
+            tuple: (토큰, 만료일시), 없거나 만료된 경우 (None, None)
+        """
+        entry = self._read_all().get(self._key(app_key, base_url))
+        if not entry:
+            return None, None
+
+        try:
+            expires_at = datetime.strptime(entry["expires_at"], "%Y%m%d%H%M%S")
+        except (KeyError, ValueError):
+            return None, None
+
+        if expires_at <= datetime.now():
+            return None, None
+
+        return entry.get("token"), expires_at
+
+    def save(self, app_key, token, expires_at, base_url=""):
+        """토큰 저장"""
+        with self.lock:
+            entries = self._read_all()
+
+            # 만료된 항목 정리
+            now = datetime.now().strftime("%Y%m%d%H%M%S")
+            entries = {k: v for k, v in entries.items() if v.get("expires_at", "") > now}
+
+            entries[self._key(app_key, base_url)] = {
+                "token": token,
+                "expires_at": expires_at.strftime("%Y%m%d%H%M%S"),
+            }
+            atomic_write(self.path, json.dumps(entries, indent=2))
+
+    def delete(self, app_key, base_url=""):
+        """저장된 토큰 삭제"""
+        with self.lock:
+            entries = self._read_all()
+            if entries.pop(self._key(app_key, base_url), None) is not None:
+                atomic_write(self.path, json.dumps(entries, indent=2))
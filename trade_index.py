@@ -0,0 +1,193 @@
+"""
+거래 고유 키 해시 인덱스
+
+실현손익 한 건을 (날짜, 종목코드, 매도평균가, 매도수량, 순번)으로 식별합니다.
+순번은 같은 날 같은 종목을 같은 가격/수량으로 여러 번 매도한 건을 구분하는 번호로,
+입력 순서대로 0부터 매깁니다.
+
+날짜 단위로 기존 행을 지우는 대신, 새로 들어온 거래와 키가 같은 행만 교체하고
+나머지는 그대로 두므로 하루 중 일부만 다시 조회해도 거래가 사라지지 않습니다.
+구글 시트(google_sheet_manager.py), 로컬 저장소(local_store.py), 원장(ledger.py)이 함께 사용합니다.
+"""
+
+import pandas as pd
+
+# 거래 고유 키 (순번 제외 컬럼이 같으면 같은 그룹)
+NATURAL_KEY = ['날짜', '종목코드', '매도평균가', '매도수량', '순번']
+GROUP_KEY = NATURAL_KEY[:-1]
+
+
+def normalize_codes(codes):
+    """
+    종목코드를 6자리 문자열로 통일 ('A005930' → '005930', 시트에서 읽은 5930 → '005930')
+
+    Args:
+        codes: 종목코드 Series
+
+    Returns:
+        Series: 정규화된 종목코드
+    """
+    codes = codes.astype(str).str.strip().str.removeprefix('A')
+    return codes.where(~codes.str.fullmatch(r'\d{1,5}'), codes.str.zfill(6))
+
+
+def _group_frame(df):
+    """순번 계산과 키 생성에 쓰는 정규화된 (날짜, 종목코드, 매도평균가, 매도수량) 컬럼"""
+    return pd.DataFrame({
+        '날짜': pd.to_datetime(df['날짜']).dt.strftime('%Y-%m-%d').to_numpy(),
+        '종목코드': normalize_codes(df['종목코드']).to_numpy(),
+        '매도평균가': pd.to_numeric(df['매도평균가'], errors='coerce').fillna(0).round().astype('int64').to_numpy(),
+        '매도수량': pd.to_numeric(df['매도수량'], errors='coerce').fillna(0).round().astype('int64').to_numpy(),
+    })
+
+
+def _sequence(groups, offsets=None):
+    """그룹별 순번 (offsets가 있으면 이전 조각에서 센 건수부터 이어서 매기고 갱신)"""
+    sequence = groups.groupby(GROUP_KEY, sort=False).cumcount().to_numpy()
+    if offsets is None:
+        return sequence
+
+    group_keys = list(zip(*(groups[col].tolist() for col in GROUP_KEY)))
+    if offsets:
+        sequence = sequence + [offsets.get(key, 0) for key in group_keys]
+    for key in group_keys:
+        offsets[key] = offsets.get(key, 0) + 1
+    return sequence
+
+
+def has_trade_key(columns):
+    """순번을 제외한 거래 키 컬럼이 모두 있으면 True"""
+    return all(col in columns for col in GROUP_KEY)
+
+
+def assign_sequence(df, offsets=None):
+    """
+    순번 컬럼 추가 (입력 순서 유지)
+
+    Args:
+        df: 실현손익 DataFrame
+        offsets: 여러 조각에 나뉘어 도착하는 경우 조각 사이에서 공유하는 그룹별 건수 딕셔너리
+
+    Returns:
+        DataFrame: 순번 컬럼이 추가된 DataFrame
+    """
+    return df.assign(순번=_sequence(_group_frame(df), offsets).astype('int64'))
+
+
+def trade_keys(df, offsets=None):
+    """
+    행별 거래 고유 키 목록
+
+    Args:
+        df: 실현손익 DataFrame (순번 컬럼이 없으면 입력 순서대로 매김)
+        offsets: assign_sequence 참고
+
+    Returns:
+        list: (날짜 'YYYY-MM-DD', 종목코드, 매도평균가, 매도수량, 순번) 튜플 리스트
+    """
+    if df.empty:
+        return []
+
+    groups = _group_frame(df)
+    if '순번' in df.columns:
+        sequence = pd.to_numeric(df['순번']).astype('int64').to_numpy()
+    else:
+        sequence = _sequence(groups, offsets)
+
+    return list(zip(*(groups[col].tolist() for col in GROUP_KEY), sequence.tolist()))
+
+
+class TradeIndex:
+    """거래 고유 키 → 행 위치 해시 인덱스"""
+
+    def __init__(self, keys=()):
+        """
+        초기화
+
+        Args:
+            keys: 행 순서대로의 거래 키 목록
+        """
+        self._positions = {}
+        for position, key in enumerate(keys):
+            self._positions[key] = position
+
+    @classmethod
+    def from_frame(cls, df):
+        """DataFrame 행 순서대로 인덱스 생성"""
+        return cls(trade_keys(df))
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def get(self, key, default=None):
+        """키의 행 위치 (없으면 default)"""
+        return self._positions.get(key, default)
+
+    def lookup(self, keys):
+        """
+        여러 키의 행 위치 조회
+
+        Returns:
+            list: 키별 행 위치 (없는 키는 None)
+        """
+        positions = self._positions
+        return [positions.get(key) for key in keys]
+
+    def upsert_rows(self, rows, new_rows, new_keys):
+        """
+        행 리스트에 Upsert (키가 같은 행은 제자리에서 교체, 새 키는 끝에 추가)
+
+        새 행 수에 비례하는 시간에 처리하며 인덱스도 함께 갱신합니다.
+
+        Args:
+            rows: 기존 행 리스트 (직접 수정됨)
+            new_rows: 새 행 리스트
+            new_keys: 새 행의 거래 키 목록
+
+        Returns:
+            tuple: (교체한 행 수, 추가한 행 수)
+        """
+        replaced = 0
+        inserted = 0
+        for row, key in zip(new_rows, new_keys):
+            position = self._positions.get(key)
+            if position is None:
+                self._positions[key] = len(rows)
+                rows.append(row)
+                inserted += 1
+            else:
+                rows[position] = row
+                replaced += 1
+        return replaced, inserted
+
+    def upsert_frame(self, existing, new_df, new_keys):
+        """
+        DataFrame에 Upsert (키가 같은 행은 제자리에서 교체, 새 키는 끝에 추가)
+
+        Args:
+            existing: 이 인덱스를 만든 DataFrame
+            new_df: 새 DataFrame
+            new_keys: 새 행의 거래 키 목록
+
+        Returns:
+            tuple: (병합된 DataFrame, 교체한 행 수, 추가한 행 수)
+        """
+        positions = self.lookup(new_keys)
+        replace_mask = [position is not None for position in positions]
+        replaced_at = [position for position in positions if position is not None]
+
+        inserted = len(positions) - len(replaced_at)
+        insert_mask = [not hit for hit in replace_mask]
+        replacements = new_df[replace_mask].set_axis(replaced_at)
+        additions = new_df[insert_mask].set_axis(range(len(existing), len(existing) + inserted))
+
+        existing = existing.reset_index(drop=True)
+        merged = pd.concat([existing.drop(index=replaced_at), replacements, additions])
+        merged = merged.sort_index(kind='stable').reset_index(drop=True)
+
+        for key, position in zip((key for key, hit in zip(new_keys, replace_mask) if not hit), additions.index):
+            self._positions[key] = position
+        return merged, len(replaced_at), inserted